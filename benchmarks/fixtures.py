@@ -0,0 +1,110 @@
+"""
+Benchmark fixtures: recorded DexScreener pairs, synthetic universes and a stub API.
+
+The recorded pairs in fixtures/dexscreener_pairs.jsonl use the TickRecorder
+format. Re-record them from the live API with:
+
+    python -m benchmarks.fixtures --record
+"""
+import argparse
+import json
+import random
+import tempfile
+from contextlib import contextmanager
+from dataclasses import replace
+from pathlib import Path
+from typing import List
+
+import numpy as np
+
+from src.market_data.market_provider import MAX_PAIRS_PER_REQUEST, MarketDataProvider, TokenData
+from src.market_data.price_feed import ReplayServer, TickRecorder, load_ticks
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures"
+RECORDED_PAIRS = FIXTURE_DIR / "dexscreener_pairs.jsonl"
+CONFIG_FILE = Path(__file__).parent.parent / "config" / "bot_config.json"
+
+def recorded_tokens() -> List[TokenData]:
+    """The recorded DexScreener pairs."""
+    return [token_data for _, _, token_data in load_ticks(RECORDED_PAIRS)]
+
+def synthetic_tokens(count: int, seed: int = 0) -> List[TokenData]:
+    """``count`` unique pairs cloned from the recorded ones with jittered numbers."""
+    rng = random.Random(seed)
+    templates = recorded_tokens()
+    tokens = []
+    for i in range(count):
+        template = templates[i % len(templates)]
+        tokens.append(replace(
+            template,
+            pair_address=f"{template.pair_address[:32]}{i:012d}",
+            base_token_symbol=f"{template.base_token_symbol}{i}",
+            base_token_address=f"{template.base_token_address[:32]}{i:012d}",
+            price_usd=template.price_usd * rng.uniform(0.5, 1.5),
+            volume_h24=template.volume_h24 * rng.uniform(0.1, 2.0),
+            liquidity_usd=template.liquidity_usd * rng.uniform(0.1, 2.0),
+            price_change_h24=template.price_change_h24 + rng.uniform(-20.0, 20.0),
+        ))
+    return tokens
+
+def random_walk(bars: int, columns: int, seed: int = 0) -> np.ndarray:
+    """(bars, columns) strictly positive random-walk closes."""
+    rng = np.random.default_rng(seed)
+    steps = rng.normal(0.0, 0.02, size=(bars, columns))
+    return np.exp(np.cumsum(steps, axis=0))
+
+def pair_responses(tokens: List[TokenData]) -> List[bytes]:
+    """Multi-pair response bodies for ``tokens`` as the stub API serves them."""
+    return [
+        json.dumps({'pairs': [ReplayServer._to_pair(t) for t in tokens[i:i + MAX_PAIRS_PER_REQUEST]]},
+                   separators=(',', ':')).encode('utf-8')
+        for i in range(0, len(tokens), MAX_PAIRS_PER_REQUEST)
+    ]
+
+@contextmanager
+def stub_dexscreener(tokens: List[TokenData]):
+    """Serve ``tokens`` from a local DexScreener stand-in; yields its base URL."""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "ticks.jsonl"
+        recorder = TickRecorder(path)
+        for token_data in tokens:
+            recorder.record(token_data, timestamp=0.0)
+        recorder.close()
+
+        with ReplayServer(str(path), speed=float('inf')) as server:
+            server.wait_replayed()
+            yield server.base_url
+
+def record_fixtures(path: Path = RECORDED_PAIRS):
+    """Overwrite the recorded fixture with live data for the configured pairs."""
+    with open(CONFIG_FILE, encoding='utf-8') as f:
+        addresses = [entry['pair_address'] for entry in json.load(f).get('symbols', [])]
+    addresses += [token_data.pair_address for token_data in recorded_tokens()]
+
+    provider = MarketDataProvider()
+    try:
+        tokens = provider.fetch_many(addresses)
+    finally:
+        provider.close()
+    if not tokens:
+        raise SystemExit("No pairs returned; fixture left unchanged")
+
+    tmp_path = path.with_suffix('.tmp')
+    tmp_path.unlink(missing_ok=True)
+    recorder = TickRecorder(tmp_path)
+    for token_data in tokens.values():
+        recorder.record(token_data)
+    recorder.close()
+    tmp_path.replace(path)
+    print(f"Recorded {len(tokens)} pairs to {path}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--record", action="store_true",
+                        help="re-record the DexScreener fixture from the live API")
+    args = parser.parse_args()
+    if args.record:
+        record_fixtures()
+    else:
+        for token_data in recorded_tokens():
+            print(token_data)
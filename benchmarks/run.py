@@ -0,0 +1,458 @@
+"""
+Offline benchmark suite for the bot's hot paths.
+
+Every benchmark runs at each requested scale (symbols, tokens, positions or
+secrets) and records throughput, per-operation latency percentiles and the
+peak traced memory of setup plus one operation. Results are written as JSON
+so runs can be compared between commits:
+
+    python -m benchmarks.run
+    python -m benchmarks.run --only filter --sizes 10 1000 100000
+    python -m benchmarks.run --compare benchmarks/results/<old>.json
+"""
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.fixtures import pair_responses, random_walk, stub_dexscreener, synthetic_tokens
+from src.filters.token_filter import FilterSettings, TokenFilter
+from src.market_data.columnar import PairColumns, decode_pairs
+from src.market_data.market_provider import MarketDataProvider
+from src.monitoring.event_log import EVENTS, FILL, NULL_LOG, OFF, EventLog
+from src.security.secure_storage import SecureStorage
+from src.trading.portfolio_manager import PortfolioManager
+from src.trading.strategy import (EMACrossoverStrategy, RSIStrategy, SMACrossoverStrategy,
+                                  StrategyEngine, VolatilityBreakoutStrategy)
+from src.trading.transaction_executor import TransactionExecutor
+from src.trading.universe import TokenUniverse
+from src.trading.venues import SimulatedAMMVenue
+
+DEFAULT_SIZES = (10, 100, 1000, 10000, 100000)
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# setup(size, workdir) -> (operation, items processed per operation, teardown)
+Setup = Callable[[int, Path], Tuple[Callable[[], object], int, Optional[Callable[[], None]]]]
+
+@dataclass
+class Benchmark:
+    """A named hot path and the largest scale it runs at by default."""
+    name: str
+    setup: Setup
+    max_size: int = 100000
+
+@dataclass
+class BenchResult:
+    """Measurements for one benchmark at one scale."""
+    name: str
+    size: int
+    operations: int
+    seconds: float
+    items_per_second: float
+    latency_us: Dict[str, float] = field(default_factory=dict)
+    peak_memory_bytes: int = 0
+
+def _settings() -> FilterSettings:
+    return FilterSettings(min_liquidity_usd=50000.0, min_volume_h24_usd=100000.0,
+                          min_price_change_h24=-50.0, max_price_change_h24=500.0,
+                          exclude_meme_coins=True, blocked_tokens=['SQUID', 'SAFU'])
+
+def setup_generate_signal(size, workdir):
+    strategy = SMACrossoverStrategy()
+    closes = random_walk(60, size)
+    frames = [pd.DataFrame({'close': closes[:, i]}) for i in range(size)]
+    current = closes[-1]
+
+    def operation():
+        for i, frame in enumerate(frames):
+            strategy.generate_signal(frame, current[i])
+    return operation, size, None
+
+def setup_generate_signals(size, workdir):
+    strategy = SMACrossoverStrategy()
+    prices = random_walk(60, size).T.copy()
+    return lambda: strategy.generate_signals(prices), size, None
+
+def setup_streaming_update(size, workdir):
+    strategy = SMACrossoverStrategy()
+    closes = random_walk(61, size)
+    symbols = [f"SYM{i}" for i in range(size)]
+    for i, symbol in enumerate(symbols):
+        strategy.warm_start(symbol, closes[:-1, i])
+    latest = closes[-1].tolist()
+
+    def operation():
+        for symbol, price in zip(symbols, latest):
+            strategy.update(symbol, price)
+    return operation, size, None
+
+def _engine_setup(strategies):
+    def setup(size, workdir):
+        engine = StrategyEngine(strategies())
+        closes = random_walk(61, size)
+        symbols = [f"SYM{i}" for i in range(size)]
+        for i, symbol in enumerate(symbols):
+            engine.warm_start(symbol, closes[:-1, i])
+        latest = closes[-1].tolist()
+
+        def operation():
+            for symbol, price in zip(symbols, latest):
+                engine.update(symbol, price)
+        return operation, size, None
+    return setup
+
+# Ten strategies over nine distinct indicators
+TEN_STRATEGIES = lambda: [
+    SMACrossoverStrategy(10, 20), SMACrossoverStrategy(10, 50), SMACrossoverStrategy(20, 50),
+    EMACrossoverStrategy(12, 26), EMACrossoverStrategy(26, 12),
+    RSIStrategy(14), RSIStrategy(14, 20, 80),
+    VolatilityBreakoutStrategy(20, 2.0), VolatilityBreakoutStrategy(20, 1.5),
+    VolatilityBreakoutStrategy(20, 2.5),
+]
+
+def setup_passes_filters(size, workdir):
+    token_filter = TokenFilter(_settings())
+    tokens = synthetic_tokens(size)
+
+    def operation():
+        for token_data in tokens:
+            token_filter.passes_filters(token_data)
+    return operation, size, None
+
+def setup_filter_batch(size, workdir):
+    token_filter = TokenFilter(_settings())
+    tokens = synthetic_tokens(size)
+    return lambda: token_filter.filter_batch(tokens), size, None
+
+def setup_profit_check(size, workdir):
+    portfolio = PortfolioManager(initial_balance=float('inf'), events=NULL_LOG)
+    prices = {}
+    for i in range(size):
+        symbol = f"SYM{i}"
+        portfolio.update_position(symbol, 100, 1.0, 'buy')
+        # Below the 2x trigger, so every call scans the full book
+        prices[symbol] = 1.5
+    return lambda: portfolio.check_profit_taking_opportunities(prices), size, None
+
+def setup_mark_to_market(size, workdir):
+    portfolio = PortfolioManager(initial_balance=float('inf'), events=NULL_LOG)
+    for i in range(size):
+        portfolio.update_position(f"SYM{i}", 100, 1.0, 'buy')
+    # A tick moves 100 prices whatever the size of the book
+    changed = min(size, 100)
+    ticks = [{f"SYM{(t * 7919 + i) % size}": 1.0 + 0.001 * (t % 50) for i in range(changed)}
+             for t in range(64)]
+    state = {'tick': 0}
+
+    def operation():
+        state['tick'] += 1
+        return portfolio.mark_to_market(ticks[state['tick'] % len(ticks)])
+    return operation, changed, None
+
+def setup_retrieve_secret(size, workdir):
+    storage = SecureStorage(workdir / "secrets.enc")
+    if not storage.initialize_storage("benchmark"):
+        raise RuntimeError("Failed to initialize secure storage")
+    keys = [f"secret_{i}" for i in range(size)]
+    storage.store_secrets({key: f"value_{i}" for i, key in enumerate(keys)})
+
+    def operation():
+        for key in keys:
+            storage.retrieve_secret(key)
+    return operation, size, None
+
+def setup_fetch_many(size, workdir):
+    tokens = synthetic_tokens(size)
+    addresses = [token_data.pair_address for token_data in tokens]
+    server = stub_dexscreener(tokens)
+    base_url = server.__enter__()
+    provider = MarketDataProvider(max_cache_size=max(size, 1))
+    provider.base_url = base_url
+
+    def teardown():
+        provider.close()
+        server.__exit__(None, None, None)
+    return lambda: provider.fetch_many(addresses), size, teardown
+
+def setup_ingest_objects(size, workdir):
+    # The previous ingestion path: text-decode, then one TokenData per pair
+    provider = MarketDataProvider()
+    bodies = pair_responses(synthetic_tokens(size))
+
+    def operation():
+        return {
+            token_data.pair_address: token_data
+            for body in bodies
+            for token_data in map(provider._parse_pair, json.loads(body.decode('utf-8'))['pairs'])
+        }
+    return operation, size, provider.close
+
+def setup_ingest_columns(size, workdir):
+    bodies = pair_responses(synthetic_tokens(size))
+
+    def operation():
+        columns = PairColumns(size)
+        for body in bodies:
+            columns.append_pairs(decode_pairs(body))
+        return columns
+    return operation, size, None
+
+def setup_universe_refresh(size, workdir):
+    # A 100-pair listing with 10 pairs crossing the liquidity threshold
+    # against a universe of ``size``; every pair's volume moves each pull,
+    # which alone must not trigger re-screening
+    tokens = synthetic_tokens(size)
+    universe = TokenUniverse()
+    token_filter = TokenFilter(_settings())
+    for token_data in tokens:
+        universe.add(token_data.base_token_symbol, token_data.pair_address)
+
+    def listing(liquidity, volume_scale):
+        listed = [replace(t, liquidity_usd=liquidity if i < 10 else t.liquidity_usd,
+                          volume_h24=t.volume_h24 * volume_scale)
+                  for i, t in enumerate(tokens[:100])]
+        columns = PairColumns(len(listed))
+        for body in pair_responses(listed):
+            columns.append_pairs(decode_pairs(body))
+        return columns
+    listings = [listing(1e6, 1.0), listing(1.0, 1.01)]
+    state = {'tick': 0}
+
+    def operation():
+        state['tick'] += 1
+        return universe.diff(listings[state['tick'] % 2], token_filter)
+    return operation, len(listings[0]), None
+
+def setup_event_emit(size, workdir):
+    # Fill events into a JSONL-backed log; the caller only pays for the enqueue
+    log = EventLog(console_level=OFF, path=str(workdir / "events.jsonl"),
+                   capacity=max(100000, 2 * size))
+
+    def operation():
+        for i in range(size):
+            log.emit(FILL, "SYM", 'buy', 100.0, 1.0, 1000.0)
+    return operation, size, log.close
+
+def setup_simulated_orders(size, workdir):
+    # Orders through the executor's worker pool against 1000 simulated pools
+    tokens = synthetic_tokens(min(size, 1000))
+    venue = SimulatedAMMVenue(latency_median_ms=400.0, latency_sigma=0.5,
+                              reject_rate=0.02, partial_fill_rate=0.1, seed=0)
+    venue.sync(tokens)
+    executor = TransactionExecutor(venue=venue)
+    addresses = [tokens[i % len(tokens)].pair_address for i in range(size)]
+
+    def operation():
+        futures = [executor.submit_buy(address, 0.1) for address in addresses]
+        futures.extend(executor.submit_sell(address, 1000.0) for address in addresses)
+        return [future.result() for future in futures]
+    return operation, 2 * size, executor.close
+
+def setup_run_once(size, workdir):
+    from src.trading.main import TradingBot
+
+    tokens = synthetic_tokens(size)
+    server = stub_dexscreener(tokens)
+    base_url = server.__enter__()
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    bot = TradingBot(password="benchmark")
+    bot.token_filter = TokenFilter(_settings())
+    bot.market_provider.base_url = base_url
+    bot.market_provider.cache_ttl = 0.0
+    for token_data in tokens:
+        bot.add_symbol(token_data.base_token_symbol, token_data.pair_address)
+
+    def teardown():
+        bot.market_provider.close()
+        if bot.transaction_executor is not None:
+            bot.transaction_executor.close()
+        os.chdir(cwd)
+        server.__exit__(None, None, None)
+    return bot.run_once, size, teardown
+
+def setup_cold_start(size, workdir):
+    from src.trading.bootstrap import derive_key, write_keyfile
+
+    config = {'symbols': [{'symbol': t.base_token_symbol, 'pair_address': t.pair_address}
+                          for t in synthetic_tokens(size)]}
+    with open(workdir / "bot_config.json", 'w', encoding='utf-8') as f:
+        json.dump(config, f)
+    cwd = os.getcwd()
+    os.chdir(workdir)
+    try:
+        write_keyfile("storage.key", derive_key("benchmark"))
+    finally:
+        os.chdir(cwd)
+
+    root = Path(__file__).parent.parent
+    env = dict(os.environ, TRADING_BOT_KEYFILE="storage.key",
+               PYTHONPATH=os.pathsep.join(filter(None, [str(root), os.environ.get('PYTHONPATH')])))
+    command = [sys.executable, "-c",
+               "from src.trading.bootstrap import build_bot; build_bot('bot_config.json')"]
+    return (lambda: subprocess.run(command, cwd=workdir, env=env, check=True,
+                                   stdout=subprocess.DEVNULL)), 1, None
+
+BENCHMARKS = [
+    Benchmark("bot.cold_start", setup_cold_start, max_size=1000),
+    Benchmark("strategy.generate_signal", setup_generate_signal, max_size=10000),
+    Benchmark("strategy.generate_signals", setup_generate_signals),
+    Benchmark("strategy.update", setup_streaming_update),
+    Benchmark("strategy.engine_update", _engine_setup(lambda: [SMACrossoverStrategy()])),
+    Benchmark("strategy.engine_update_10", _engine_setup(TEN_STRATEGIES)),
+    Benchmark("filter.passes_filters", setup_passes_filters),
+    Benchmark("filter.filter_batch", setup_filter_batch),
+    Benchmark("portfolio.profit_check", setup_profit_check),
+    Benchmark("portfolio.mark_to_market", setup_mark_to_market),
+    Benchmark("storage.retrieve_secret", setup_retrieve_secret),
+    Benchmark("market.ingest_objects", setup_ingest_objects),
+    Benchmark("market.ingest_columns", setup_ingest_columns),
+    Benchmark("market.fetch_many", setup_fetch_many),
+    Benchmark("universe.refresh", setup_universe_refresh),
+    Benchmark("events.emit", setup_event_emit),
+    Benchmark("executor.simulated_orders", setup_simulated_orders, max_size=10000),
+    Benchmark("bot.run_once", setup_run_once, max_size=10000),
+]
+
+def _percentiles(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples) / 1000.0
+    p50, p90, p99 = np.percentile(values, [50, 90, 99])
+    return {'p50': round(float(p50), 2), 'p90': round(float(p90), 2),
+            'p99': round(float(p99), 2), 'max': round(float(values.max()), 2)}
+
+def measure(benchmark: Benchmark, size: int, min_time: float, max_repeats: int) -> BenchResult:
+    """Time repeated operations, then trace peak memory of a fresh setup."""
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        operation, items, teardown = benchmark.setup(size, Path(tmp))
+        try:
+            operation()  # warm-up
+            samples = []
+            started = time.perf_counter()
+            gc_was_enabled = gc.isenabled()
+            gc.disable()
+            try:
+                while len(samples) < max_repeats:
+                    op_started = time.perf_counter_ns()
+                    operation()
+                    samples.append(time.perf_counter_ns() - op_started)
+                    if len(samples) >= 3 and time.perf_counter() - started >= min_time:
+                        break
+            finally:
+                if gc_was_enabled:
+                    gc.enable()
+        finally:
+            if teardown:
+                teardown()
+            # Write out queued bot events while stdout is still redirected
+            EVENTS.flush()
+
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        gc.collect()
+        tracemalloc.start()
+        try:
+            operation, _, teardown = benchmark.setup(size, Path(tmp))
+            try:
+                operation()
+            finally:
+                if teardown:
+                    teardown()
+                EVENTS.flush()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    seconds = sum(samples) / 1e9
+    return BenchResult(
+        name=benchmark.name,
+        size=size,
+        operations=len(samples),
+        seconds=round(seconds, 6),
+        items_per_second=round(items * len(samples) / seconds, 1) if seconds else 0.0,
+        latency_us=_percentiles(samples),
+        peak_memory_bytes=peak,
+    )
+
+def _git_revision() -> str:
+    root = Path(__file__).parent.parent
+    try:
+        revision = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=root,
+                                  capture_output=True, text=True, check=True).stdout.strip()
+        dirty = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'],
+                               cwd=root, capture_output=True, text=True).stdout.strip()
+        return f"{revision}-dirty" if dirty else revision
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def compare(current: dict, baseline: dict) -> str:
+    """Table of throughput ratios (current / baseline) for shared entries."""
+    base = {(r['name'], r['size']): r for r in baseline['results']}
+    lines = [f"{'benchmark':<28}{'size':>8}{'items/s':>14}{'baseline':>14}{'ratio':>8}"]
+    for result in current['results']:
+        old = base.get((result['name'], result['size']))
+        if not old or not old['items_per_second']:
+            continue
+        ratio = result['items_per_second'] / old['items_per_second']
+        lines.append(f"{result['name']:<28}{result['size']:>8}{result['items_per_second']:>14.0f}"
+                     f"{old['items_per_second']:>14.0f}{ratio:>8.2f}")
+    return "\n".join(lines)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--sizes", type=int, nargs="+",
+                        help="scales to run (default: 10 to 100k, capped per benchmark)")
+    parser.add_argument("--only", nargs="+", default=[],
+                        help="run benchmarks whose name contains any of these strings")
+    parser.add_argument("--min-time", type=float, default=0.5,
+                        help="minimum seconds of timed operations per entry")
+    parser.add_argument("--max-repeats", type=int, default=1000)
+    parser.add_argument("--output", help="results file (default: benchmarks/results/<rev>.json)")
+    parser.add_argument("--compare", help="baseline results file to compare against")
+    args = parser.parse_args(argv)
+
+    revision = _git_revision()
+    results = []
+    for benchmark in BENCHMARKS:
+        if args.only and not any(part in benchmark.name for part in args.only):
+            continue
+        sizes = args.sizes or [s for s in DEFAULT_SIZES if s <= benchmark.max_size]
+        for size in sizes:
+            result = measure(benchmark, size, args.min_time, args.max_repeats)
+            results.append(result)
+            print(f"{result.name:<28}{size:>8}  {result.items_per_second:>12.0f} items/s  "
+                  f"p50 {result.latency_us['p50']:>10.1f}us  p99 {result.latency_us['p99']:>10.1f}us  "
+                  f"peak {result.peak_memory_bytes / 1e6:>8.1f}MB", flush=True)
+
+    report = {
+        'revision': revision,
+        'created_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'results': [asdict(result) for result in results],
+    }
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{revision}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            print(compare(report, json.load(f)))
+
+if __name__ == "__main__":
+    main()
@@ -2,8 +2,24 @@
 Bubblemaps API integration for rug pull detection.
 """
 import requests
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Optional
+from typing import Dict, Iterable, Optional
+
+from src.monitoring.event_log import EVENTS, FAILURE
+from src.monitoring.metrics import METRICS
+from src.network.governor import GOVERNOR, RISK, RequestGovernor
+
+# Holder concentration moves slowly; riskier tokens are re-scored sooner
+RISK_TTL_SECONDS = {
+    'low': 6 * 3600,
+    'medium': 2 * 3600,
+    'high': 30 * 60,
+    'critical': 6 * 3600,
+}
 
 @dataclass
 class RugPullRisk:
@@ -14,20 +30,48 @@ class RugPullRisk:
     alerts: list
 
 class BubblemapsAPI:
-    """Interface with Bubblemaps for rug pull detection."""
-    
-    def __init__(self):
+    """Interface with Bubblemaps for rug pull detection.
+
+    Assessments are cached per (chain, token_address) with a TTL that depends
+    on the risk level. Once a token has been scored, lookups never block:
+    an expired entry is returned as-is while a refresh runs in the
+    background.
+    """
+
+    def __init__(self, cache_size: int = 5000, ttls: Optional[Dict[str, float]] = None,
+                 refresh_margin: float = 0.2, max_workers: int = 8,
+                 governor: Optional[RequestGovernor] = None):
+        self.governor = governor or GOVERNOR
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'User-Agent': 'TradingBot/1.0'
         })
-    
-    def check_rug_pull(self, token_address: str, chain: str = "solana") -> Optional[RugPullRisk]:
-        """Check for rug pull risks."""
+
+        self.cache_size = cache_size
+        self.ttls = dict(RISK_TTL_SECONDS, **(ttls or {}))
+        self.refresh_margin = refresh_margin
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.stale_hits = 0
+
+        # (chain, token_address) -> (expires_at, ttl, RugPullRisk), LRU ordered
+        self._cache = OrderedDict()
+        self._inflight: Dict[tuple, Future] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="bubblemaps")
+        self._refresher = None
+        self._stop_refresh = threading.Event()
+
+    def _get(self, url: str, **kwargs) -> requests.Response:
+        """GET through the shared request governor at risk-refresh priority."""
+        return self.governor.get(self.session, url, priority=RISK, **kwargs)
+
+    def _score_token(self, token_address: str, chain: str) -> Optional[RugPullRisk]:
+        """Score one token against the API (uncached)."""
         try:
-            # In a real implementation, you would use the actual Bubblemaps API
-            # For demo purposes, return mock data
+            # In a real implementation, you would call the actual Bubblemaps API
+            # via self._get. For demo purposes, return mock data
             import random
             risk_score = random.uniform(0, 1)
             risk_level = "low"
@@ -37,11 +81,11 @@ class BubblemapsAPI:
                 risk_level = "high"
             elif risk_score >= 0.4:
                 risk_level = "medium"
-            
+
             alerts = []
             if risk_score > 0.7:
                 alerts.append("High concentration of tokens in few wallets")
-            
+
             return RugPullRisk(
                 token_address=token_address,
                 risk_score=risk_score,
@@ -49,5 +93,135 @@ class BubblemapsAPI:
                 alerts=alerts
             )
         except Exception as e:
-            print(f"Error checking rug pull: {e}")
+            EVENTS.emit(FAILURE, 'rug pull check', str(e))
             return None
+
+    def _load(self, key: tuple) -> Optional[RugPullRisk]:
+        """Score a token and cache the result; runs on the worker pool."""
+        try:
+            METRICS.count("risk.api_calls")
+            with METRICS.timer("risk.score"):
+                risk = self._score_token(key[1], key[0])
+            if risk is not None:
+                ttl = self.ttls.get(risk.risk_level, min(self.ttls.values()))
+                with self._lock:
+                    self._cache[key] = (time.monotonic() + ttl, ttl, risk)
+                    self._cache.move_to_end(key)
+                    while len(self._cache) > self.cache_size:
+                        self._cache.popitem(last=False)
+            return risk
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _submit(self, key: tuple) -> Future:
+        """Start a lookup, joining one already in flight for the same key."""
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is None:
+                future = self._inflight[key] = self._pool.submit(self._load, key)
+            return future
+
+    def _cached(self, key: tuple):
+        """(risk, is_fresh) for a cached key, or (None, False)."""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self.cache_misses += 1
+                METRICS.count("risk.cache_misses")
+                return None, False
+            self._cache.move_to_end(key)
+            fresh = time.monotonic() < entry[0]
+            if fresh:
+                self.cache_hits += 1
+            else:
+                self.stale_hits += 1
+            METRICS.count("risk.cache_hits")
+            return entry[2], fresh
+
+    def check_rug_pull(self, token_address: str, chain: str = "solana") -> Optional[RugPullRisk]:
+        """Check for rug pull risks."""
+        key = (chain, token_address)
+        risk, fresh = self._cached(key)
+        if risk is not None:
+            if not fresh:
+                self._submit(key)
+            return risk
+        try:
+            return self._submit(key).result()
+        except Exception as e:
+            EVENTS.emit(FAILURE, 'rug pull check', str(e))
+            return None
+
+    def check_many(self, token_addresses: Iterable[str], chain: str = "solana",
+                   timeout: Optional[float] = None) -> Dict[str, Optional[RugPullRisk]]:
+        """Check many tokens at once, scoring unseen ones concurrently.
+
+        Duplicate addresses and lookups already in flight are coalesced.
+        Tokens still pending after ``timeout`` map to None.
+        """
+        results = {}
+        pending = {}
+        for token_address in dict.fromkeys(token_addresses):
+            key = (chain, token_address)
+            risk, fresh = self._cached(key)
+            if risk is not None:
+                results[token_address] = risk
+                if not fresh:
+                    self._submit(key)
+            else:
+                pending[token_address] = self._submit(key)
+
+        if pending:
+            wait(pending.values(), timeout=timeout)
+            for token_address, future in pending.items():
+                try:
+                    results[token_address] = future.result(timeout=0) if future.done() else None
+                except Exception as e:
+                    EVENTS.emit(FAILURE, 'rug pull check', str(e))
+                    results[token_address] = None
+        return results
+
+    def refresh_expiring(self) -> int:
+        """Re-score cached tokens that are within refresh_margin of expiry."""
+        now = time.monotonic()
+        with self._lock:
+            due = [key for key, (expires_at, ttl, _) in self._cache.items()
+                   if expires_at - now <= ttl * self.refresh_margin and key not in self._inflight]
+        for key in due:
+            self._submit(key)
+        return len(due)
+
+    def start_background_refresh(self, interval_seconds: float = 60.0):
+        """Re-score cached tokens periodically before they expire."""
+        if self._refresher is not None and self._refresher.is_alive():
+            return
+        self._stop_refresh.clear()
+
+        def loop():
+            while not self._stop_refresh.wait(interval_seconds):
+                try:
+                    self.refresh_expiring()
+                except Exception as e:
+                    EVENTS.emit(FAILURE, 'rug pull cache refresh', str(e))
+
+        self._refresher = threading.Thread(target=loop, name="bubblemaps-refresh", daemon=True)
+        self._refresher.start()
+
+    def stop_background_refresh(self):
+        """Stop the background refresher."""
+        self._stop_refresh.set()
+        if self._refresher is not None:
+            self._refresher.join()
+            self._refresher = None
+
+    def cache_stats(self) -> dict:
+        """Risk cache counters."""
+        with self._lock:
+            return {
+                'size': len(self._cache),
+                'hits': self.cache_hits,
+                'stale_hits': self.stale_hits,
+                'misses': self.cache_misses,
+                'inflight': len(self._inflight),
+            }
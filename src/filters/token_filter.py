@@ -1,8 +1,23 @@
 """
 Token filtering system with configurable criteria.
 """
+import re
 from dataclasses import dataclass
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+import numpy as np
+
+from src.monitoring.metrics import METRICS
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Rule names, in the order passes_filters applies them
+FILTER_RULES = ('liquidity', 'volume', 'price_change', 'meme', 'blocked', 'not_allowed')
+
+# Columns a token batch must provide
+BATCH_COLUMNS = ('liquidity_usd', 'volume_h24', 'price_change_h24',
+                 'base_token_name', 'base_token_symbol')
 
 @dataclass
 class FilterSettings:
@@ -14,34 +29,191 @@ class FilterSettings:
     exclude_meme_coins: bool = False
     allowed_tokens: List[str] = None
     blocked_tokens: List[str] = None
-    
+
     def __post_init__(self):
         if self.allowed_tokens is None:
             self.allowed_tokens = []
         if self.blocked_tokens is None:
             self.blocked_tokens = []
 
+    def fingerprint(self) -> tuple:
+        """Every setting as a hashable tuple; changes when any list is mutated."""
+        return (self.min_liquidity_usd, self.min_volume_h24_usd,
+                self.min_price_change_h24, self.max_price_change_h24,
+                self.exclude_meme_coins, tuple(self.allowed_tokens or ()),
+                tuple(self.blocked_tokens or ()))
+
+@dataclass
+class FilterResult:
+    """Outcome of filtering a batch of tokens."""
+    mask: np.ndarray  # True where the token passed every rule
+    rejections: Dict[str, int]  # tokens rejected by each rule (first failing rule)
+
+    @property
+    def passed(self) -> int:
+        return int(self.mask.sum())
+
+class CompiledFilter:
+    """FilterSettings frozen into sets and a precompiled name matcher."""
+
+    __slots__ = ('min_liquidity_usd', 'min_volume_h24_usd', 'min_price_change_h24',
+                 'max_price_change_h24', 'exclude_meme_coins', 'allowed', 'blocked', 'meme',
+                 'fingerprint')
+
+    def __init__(self, settings: FilterSettings):
+        self.fingerprint = settings.fingerprint()
+        self.min_liquidity_usd = settings.min_liquidity_usd
+        self.min_volume_h24_usd = settings.min_volume_h24_usd
+        self.min_price_change_h24 = settings.min_price_change_h24
+        self.max_price_change_h24 = settings.max_price_change_h24
+        self.exclude_meme_coins = settings.exclude_meme_coins
+        self.allowed = frozenset(settings.allowed_tokens or ())
+        self.blocked = frozenset(settings.blocked_tokens or ())
+        self.meme = re.compile('meme', re.IGNORECASE)
+
+    def first_failure(self, token_data) -> Optional[str]:
+        """Name of the first rule the token fails, or None if it passes.
+
+        Comparisons are written as filter_batch's masks, so NaN fails them.
+        """
+        if not token_data.liquidity_usd >= self.min_liquidity_usd:
+            return 'liquidity'
+        if not token_data.volume_h24 >= self.min_volume_h24_usd:
+            return 'volume'
+        if not (self.min_price_change_h24 <= token_data.price_change_h24
+                <= self.max_price_change_h24):
+            return 'price_change'
+        if self.exclude_meme_coins and self.meme.search(token_data.base_token_name):
+            return 'meme'
+        if self.blocked and token_data.base_token_symbol in self.blocked:
+            return 'blocked'
+        if self.allowed and token_data.base_token_symbol not in self.allowed:
+            return 'not_allowed'
+        return None
+
+def tokens_to_frame(tokens) -> 'pd.DataFrame':
+    """Columnar batch from an iterable of TokenData or TokenView."""
+    import pandas as pd
+
+    from src.market_data.columnar import token_fields
+
+    tokens = list(tokens)
+    if not tokens:
+        return pd.DataFrame({column: [] for column in BATCH_COLUMNS})
+    return pd.DataFrame([token_fields(t) for t in tokens])
+
+def tokens_to_columns(tokens) -> Dict[str, object]:
+    """BATCH_COLUMNS of a TokenData sequence: float arrays and string lists."""
+    count = len(tokens)
+    return {
+        'liquidity_usd': np.fromiter((t.liquidity_usd for t in tokens), np.float64, count),
+        'volume_h24': np.fromiter((t.volume_h24 for t in tokens), np.float64, count),
+        'price_change_h24': np.fromiter((t.price_change_h24 for t in tokens), np.float64, count),
+        'base_token_name': [t.base_token_name for t in tokens],
+        'base_token_symbol': [t.base_token_symbol for t in tokens],
+    }
+
+def _factorize(values):
+    """(codes, uniques) with codes indexing uniques in first-seen order."""
+    index = {}
+    codes = np.fromiter((index.setdefault(value, len(index)) for value in values),
+                        dtype=np.intp, count=len(values))
+    return codes, list(index)
+
 class TokenFilter:
     """Filters tokens based on configured criteria."""
-    
+
     def __init__(self, settings=None):
         self.settings = settings or FilterSettings()
-    
+
+    @property
+    def settings(self) -> FilterSettings:
+        return self._settings
+
+    @settings.setter
+    def settings(self, settings: FilterSettings):
+        self._settings = settings
+        self.recompile()
+
+    def recompile(self) -> CompiledFilter:
+        """Rebuild the compiled rules from the current settings."""
+        self._compiled = CompiledFilter(self._settings)
+        return self._compiled
+
+    @property
+    def compiled(self) -> CompiledFilter:
+        """Rules in effect, recompiled first if settings changed in place."""
+        compiled = self._compiled
+        if compiled.fingerprint != self._settings.fingerprint():
+            compiled = self.recompile()
+        return compiled
+
+    def numeric_outcomes(self, liquidity: np.ndarray, volume: np.ndarray,
+                         price_change: np.ndarray) -> np.ndarray:
+        """Liquidity, volume and price change rule results packed as bits 0-2.
+
+        Rows with equal bits (and equal names and symbols) get the same
+        filter_batch result, whatever the exact numbers.
+        """
+        compiled = self.compiled
+        bits = (np.asarray(liquidity) >= compiled.min_liquidity_usd).astype(np.int8)
+        bits |= (np.asarray(volume) >= compiled.min_volume_h24_usd).astype(np.int8) << 1
+        price_change = np.asarray(price_change)
+        bits |= ((price_change >= compiled.min_price_change_h24) &
+                 (price_change <= compiled.max_price_change_h24)).astype(np.int8) << 2
+        return bits
+
     def passes_filters(self, token_data) -> bool:
         """Check if token passes all filters."""
-        if token_data.liquidity_usd < self.settings.min_liquidity_usd:
-            return False
-        if token_data.volume_h24 < self.settings.min_volume_h24_usd:
-            return False
-        if (token_data.price_change_h24 < self.settings.min_price_change_h24 or 
-            token_data.price_change_h24 > self.settings.max_price_change_h24):
-            return False
-        if self.settings.exclude_meme_coins and 'meme' in token_data.base_token_name.lower():
-            return False
-        if (self.settings.blocked_tokens and 
-            token_data.base_token_symbol in self.settings.blocked_tokens):
-            return False
-        if (self.settings.allowed_tokens and 
-            token_data.base_token_symbol not in self.settings.allowed_tokens):
-            return False
-        return True
+        return self.compiled.first_failure(token_data) is None
+
+    def filter_batch(self, batch) -> FilterResult:
+        """Filter a columnar batch of tokens with boolean masks.
+
+        ``batch`` is a DataFrame or mapping with BATCH_COLUMNS, or a list of
+        TokenData. Symbol and name checks run once per distinct value.
+        """
+        with METRICS.timer("filter.batch"):
+            return self._filter_batch(batch)
+
+    def _filter_batch(self, batch) -> FilterResult:
+        if isinstance(batch, (list, tuple)):
+            batch = tokens_to_columns(batch)
+        compiled = self.compiled
+
+        liquidity = np.asarray(batch['liquidity_usd'], dtype=np.float64)
+        volume = np.asarray(batch['volume_h24'], dtype=np.float64)
+        price_change = np.asarray(batch['price_change_h24'], dtype=np.float64)
+        count = len(liquidity)
+
+        rule_masks = [
+            ('liquidity', liquidity >= compiled.min_liquidity_usd),
+            ('volume', volume >= compiled.min_volume_h24_usd),
+            ('price_change', (price_change >= compiled.min_price_change_h24) &
+                             (price_change <= compiled.max_price_change_h24)),
+        ]
+
+        if compiled.exclude_meme_coins:
+            codes, uniques = _factorize(list(batch['base_token_name']))
+            is_meme = np.fromiter((bool(compiled.meme.search(str(n))) for n in uniques),
+                                  dtype=bool, count=len(uniques))
+            rule_masks.append(('meme', ~is_meme[codes]))
+
+        if compiled.blocked or compiled.allowed:
+            codes, uniques = _factorize(list(batch['base_token_symbol']))
+            if compiled.blocked:
+                is_blocked = np.fromiter((s in compiled.blocked for s in uniques),
+                                         dtype=bool, count=len(uniques))
+                rule_masks.append(('blocked', ~is_blocked[codes]))
+            if compiled.allowed:
+                is_allowed = np.fromiter((s in compiled.allowed for s in uniques),
+                                         dtype=bool, count=len(uniques))
+                rule_masks.append(('not_allowed', is_allowed[codes]))
+
+        mask = np.ones(count, dtype=bool)
+        rejections = dict.fromkeys(FILTER_RULES, 0)
+        for rule, ok in rule_masks:
+            rejections[rule] = int(np.count_nonzero(mask & ~ok))
+            mask &= ok
+
+        return FilterResult(mask=mask, rejections=rejections)
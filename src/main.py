@@ -1,12 +1,49 @@
 """
 Main entry point for the trading bot.
+
+Run from the repository root:
+
+    python -m src.main --config config/bot_config.json
+    python -m src.main --workers 4            # sharded, see src.trading.supervisor
+    python -m src.main --write-keyfile .key   # derive the storage key once
+
+Secrets are read from TRADING_BOT_KEYFILE, TRADING_BOT_PASSWORD_FD or
+TRADING_BOT_PASSWORD before falling back to a prompt.
 """
-from trading.main import TradingBot
+import argparse
+
+from src.trading.bootstrap import DEFAULT_CONFIG, StartupTimer
 
 def main():
     """Initialize and run the trading bot."""
-    bot = TradingBot()
-    bot.run()
+    timer = StartupTimer()
+    parser = argparse.ArgumentParser(description="Run the trading bot.")
+    parser.add_argument("--config", default=DEFAULT_CONFIG)
+    parser.add_argument("--hours", type=float, default=24)
+    parser.add_argument("--workers", type=int, default=0,
+                        help="run sharded across this many worker processes")
+    parser.add_argument("--write-keyfile", metavar="PATH",
+                        help="derive the storage key, write it to PATH and exit")
+    args = parser.parse_args()
+
+    if args.write_keyfile:
+        from src.trading.bootstrap import derive_key, load_config, resolve_secret, write_keyfile
+
+        password, key = resolve_secret(load_config(args.config))
+        write_keyfile(args.write_keyfile, key or derive_key(password))
+        print(f"Wrote storage key to {args.write_keyfile}")
+        return
+
+    if args.workers:
+        from src.trading.supervisor import run_from_config
+
+        run_from_config(args.config, workers=args.workers, duration_hours=args.hours)
+        return
+
+    from src.trading.bootstrap import build_bot
+
+    bot = build_bot(args.config, timer=timer)
+    bot.run(duration_hours=args.hours)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,231 @@
+"""
+Local OHLCV history store backed by memory-mapped columnar files.
+"""
+import time
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Optional
+
+import numpy as np
+
+from src.monitoring.event_log import EVENTS, FAILURE
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Fixed-width column layout, one file per column
+BAR_COLUMNS = (
+    ('timestamp', np.dtype('<i8')),  # epoch milliseconds
+    ('open', np.dtype('<f8')),
+    ('high', np.dtype('<f8')),
+    ('low', np.dtype('<f8')),
+    ('close', np.dtype('<f8')),
+    ('volume', np.dtype('<f8')),
+)
+
+class PairHistory:
+    """Append-only bar history for one pair.
+
+    Each column is a flat little-endian file that is memory-mapped on read,
+    so slicing never loads more than the pages it touches. Single bars are
+    buffered in memory and written in batches by flush(); readers flush
+    first, so they always see every appended bar.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self._paths = {name: self.directory / f"{name}.col" for name, _ in BAR_COLUMNS}
+        self._maps = {}
+        self._mapped_length = -1
+        # Bars on disk and the newest timestamp, read from the files once
+        self._length: Optional[int] = None
+        self._last_timestamp: Optional[int] = None
+        self._pending = []  # buffered (timestamp, open, high, low, close, volume)
+        self._lock = threading.Lock()
+
+    def _load(self):
+        if self._length is not None:
+            return
+        # A torn append can leave columns with different lengths; trust the
+        # shortest and cut the others back so the next append lines up again
+        self._length = min(
+            (self._paths[name].stat().st_size if self._paths[name].exists() else 0) // dtype.itemsize
+            for name, dtype in BAR_COLUMNS
+        )
+        for name, dtype in BAR_COLUMNS:
+            path = self._paths[name]
+            if path.exists() and path.stat().st_size != self._length * dtype.itemsize:
+                with open(path, 'r+b') as f:
+                    f.truncate(self._length * dtype.itemsize)
+        if self._length:
+            timestamps = np.memmap(self._paths['timestamp'], dtype='<i8', mode='r',
+                                   shape=(self._length,))
+            self._last_timestamp = int(timestamps[-1])
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._load()
+            return self._length + len(self._pending)
+
+    @property
+    def pending(self) -> int:
+        """Bars buffered but not yet written."""
+        return len(self._pending)
+
+    def _columns(self) -> Dict[str, np.ndarray]:
+        """Read-only memory maps of every column, remapped after appends."""
+        self.flush()
+        length = self._length
+        if length != self._mapped_length:
+            maps = {}
+            for name, dtype in BAR_COLUMNS:
+                if length == 0:
+                    maps[name] = np.empty(0, dtype=dtype)
+                else:
+                    maps[name] = np.memmap(self._paths[name], dtype=dtype, mode='r', shape=(length,))
+            self._maps = maps
+            self._mapped_length = length
+        return self._maps
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        """Timestamp of the newest bar, or None when empty."""
+        with self._lock:
+            self._load()
+            return self._last_timestamp
+
+    def _write(self, arrays: Dict[str, np.ndarray]):
+        """Write column arrays to disk; the caller holds the lock."""
+        for name, _ in BAR_COLUMNS:
+            with open(self._paths[name], 'ab') as f:
+                f.write(arrays[name].tobytes())
+        self._length += len(arrays['timestamp'])
+
+    def _write_pending(self):
+        pending, self._pending = self._pending, []
+        if pending:
+            rows = list(zip(*pending))
+            self._write({name: np.array(rows[i], dtype=dtype)
+                         for i, (name, dtype) in enumerate(BAR_COLUMNS)})
+
+    def flush(self):
+        """Write buffered bars to disk."""
+        with self._lock:
+            self._load()
+            self._write_pending()
+
+    def append_many(self, bars: Dict[str, np.ndarray]):
+        """Append bars given as column arrays; timestamps must not go backwards."""
+        arrays = {name: np.ascontiguousarray(bars[name], dtype=dtype) for name, dtype in BAR_COLUMNS}
+        timestamps = arrays['timestamp']
+        if len(timestamps) == 0:
+            return
+        if len({len(a) for a in arrays.values()}) != 1:
+            raise ValueError("All bar columns must have the same length")
+        if np.any(np.diff(timestamps) < 0):
+            raise ValueError("Bar timestamps must be non-decreasing")
+
+        with self._lock:
+            self._load()
+            last = self._last_timestamp
+            if last is not None and timestamps[0] < last:
+                raise ValueError(f"Bar at {int(timestamps[0])} is older than last bar at {last}")
+            self._write_pending()
+            self._write(arrays)
+            self._last_timestamp = int(timestamps[-1])
+
+    def append(self, timestamp: int, open_: float, high: float, low: float,
+               close: float, volume: float = 0.0):
+        """Buffer a single bar; it is written by the next flush() or read."""
+        with self._lock:
+            self._load()
+            last = self._last_timestamp
+            if last is not None and timestamp < last:
+                raise ValueError(f"Bar at {int(timestamp)} is older than last bar at {last}")
+            self._pending.append((timestamp, open_, high, low, close, volume))
+            self._last_timestamp = int(timestamp)
+
+    def slice(self, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Zero-copy views of bars with start <= timestamp < end (binary search)."""
+        columns = self._columns()
+        timestamps = columns['timestamp']
+        lo = 0 if start is None else int(np.searchsorted(timestamps, start, side='left'))
+        hi = len(timestamps) if end is None else int(np.searchsorted(timestamps, end, side='left'))
+        return {name: column[lo:hi] for name, column in columns.items()}
+
+    def tail(self, count: int) -> Dict[str, np.ndarray]:
+        """Zero-copy views of the newest count bars."""
+        columns = self._columns()
+        return {name: column[max(len(column) - count, 0):] for name, column in columns.items()}
+
+    def to_frame(self, start: Optional[int] = None, end: Optional[int] = None) -> 'pd.DataFrame':
+        """Bars in a time range as a DataFrame for SMACrossoverStrategy.generate_signal."""
+        import pandas as pd
+
+        return pd.DataFrame(self.slice(start, end), copy=False)
+
+class HistoryStore:
+    """Persistent per-pair time-series store.
+
+    Recorded ticks are buffered per pair and written for all pairs at most
+    every ``flush_interval`` seconds, so a tick costs no file I/O. Call
+    flush() before shutdown; bars still buffered at a crash are lost.
+    """
+
+    def __init__(self, root_dir: str = "data/history", flush_interval: float = 60.0):
+        self.root_dir = Path(root_dir)
+        self.root_dir.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self._pairs: Dict[str, PairHistory] = {}
+        self._lock = threading.Lock()
+        self._last_flush = time.monotonic()
+
+    def pair(self, pair_address: str) -> PairHistory:
+        """History for one pair, created on first use."""
+        history = self._pairs.get(pair_address)
+        if history is None:
+            with self._lock:
+                history = self._pairs.get(pair_address)
+                if history is None:
+                    history = self._pairs[pair_address] = PairHistory(self.root_dir / pair_address)
+        return history
+
+    def pairs(self) -> list:
+        """Pair addresses with stored history."""
+        return sorted(p.name for p in self.root_dir.iterdir() if p.is_dir())
+
+    def record_tick(self, token_data, timestamp: Optional[int] = None):
+        """Append a fetched TokenData as a single-price bar."""
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        price = token_data.price_usd
+        try:
+            self.pair(token_data.pair_address).append(
+                timestamp, price, price, price, price, token_data.volume_h24
+            )
+        except (OSError, ValueError) as e:
+            EVENTS.emit(FAILURE, 'history store', f"recording tick for {token_data.pair_address}: {e}")
+
+    def record_snapshot(self, snapshot: Dict[str, object], timestamp: Optional[int] = None):
+        """Append one bar per pair from a MarketDataProvider snapshot."""
+        if timestamp is None:
+            timestamp = int(time.time() * 1000)
+        for token_data in snapshot.values():
+            self.record_tick(token_data, timestamp)
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write every pair's buffered bars to disk."""
+        self._last_flush = time.monotonic()
+        for pair_address, history in list(self._pairs.items()):
+            try:
+                history.flush()
+            except OSError as e:
+                EVENTS.emit(FAILURE, 'history store', f"flushing {pair_address}: {e}")
+
+    def closes(self, pair_address: str, start: Optional[int] = None,
+               end: Optional[int] = None) -> np.ndarray:
+        """Zero-copy close prices for a pair in a time range."""
+        return self.pair(pair_address).slice(start, end)['close']
@@ -2,11 +2,24 @@
 Market data provider using DexScreener API.
 """
 import requests
-import json
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, wait
 from dataclasses import dataclass
-from typing import Optional, List
+from typing import Optional, List, Dict, Iterable
 
-@dataclass
+from requests.adapters import HTTPAdapter
+
+from src.market_data.columnar import PairColumns, TokenView, decode_pairs
+from src.monitoring.event_log import EVENTS, FAILURE, WARN
+from src.monitoring.metrics import METRICS
+from src.network.governor import GOVERNOR, MARKET_DATA, RequestGovernor
+
+# DexScreener accepts up to 30 comma-separated pair addresses per request
+MAX_PAIRS_PER_REQUEST = 30
+
+@dataclass(slots=True)
 class TokenData:
     """Data class for token information."""
     pair_address: str
@@ -16,33 +29,249 @@ class TokenData:
     volume_h24: float
     liquidity_usd: float
     price_change_h24: float
+    base_token_address: str = ""
 
 class MarketDataProvider:
     """Provides market data from DexScreener."""
-    
-    def __init__(self):
+
+    def __init__(self, chain_id: str = "solana", max_workers: int = 16,
+                 request_timeout: float = 10.0, cache_ttl: float = 30.0,
+                 max_cache_size: int = 10000, governor: Optional[RequestGovernor] = None):
         self.base_url = "https://api.dexscreener.com/latest/dex"
-    
+        self.chain_id = chain_id
+        self.governor = governor or GOVERNOR
+        self.max_workers = max_workers
+        self.request_timeout = request_timeout
+
+        # Snapshot cache: pair_address -> (fetched_at, TokenData), LRU ordered
+        self.cache_ttl = cache_ttl
+        self.max_cache_size = max_cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+        # Pooled keep-alive session shared by all fetch threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Accept': 'application/json',
+            'User-Agent': 'TradingBot/1.0'
+        })
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="market-data"
+        )
+
+    def _parse_pair(self, pair: dict) -> TokenData:
+        """Build TokenData from a DexScreener pair object."""
+        return TokenData(
+            pair_address=pair['pairAddress'],
+            base_token_name=pair['baseToken']['name'],
+            base_token_symbol=pair['baseToken']['symbol'],
+            price_usd=float(pair['priceUsd']),
+            volume_h24=float(pair['volumeH24']),
+            liquidity_usd=float(pair['liquidity']['usd']),
+            price_change_h24=float(pair['priceChange']['h24']),
+            base_token_address=pair['baseToken'].get('address', '')
+        )
+
     def fetch_pair_data(self, pair_address: str) -> Optional[TokenData]:
         """Fetch data for a specific token pair."""
         try:
             url = f"{self.base_url}/pairs/{pair_address}"
-            response = requests.get(url, timeout=10)
-            
+            METRICS.count("market.api_calls")
+            with METRICS.timer("market.request"):
+                response = self.governor.get(self.session, url, priority=MARKET_DATA,
+                                             max_wait=self.request_timeout,
+                                             timeout=self.request_timeout)
+
             if response.status_code == 200:
                 data = response.json()
-                if 'pair' in 
-                    pair = data['pair']
-                    return TokenData(
-                        pair_address=pair['pairAddress'],
-                        base_token_name=pair['baseToken']['name'],
-                        base_token_symbol=pair['baseToken']['symbol'],
-                        price_usd=float(pair['priceUsd']),
-                        volume_h24=float(pair['volumeH24']),
-                        liquidity_usd=float(pair['liquidity']['usd']),
-                        price_change_h24=float(pair['priceChange']['h24'])
-                    )
+                if 'pair' in data and data['pair']:
+                    token_data = self._parse_pair(data['pair'])
+                    self._store([token_data])
+                    return token_data
+            else:
+                METRICS.count("market.errors")
+                EVENTS.emit(FAILURE, 'market data',
+                            f"HTTP {response.status_code} fetching pair {pair_address}")
             return None
         except Exception as e:
-            print(f"Error fetching pair  {e}")
+            METRICS.count("market.errors")
+            EVENTS.emit(FAILURE, 'market data', f"fetching pair {pair_address}: {e}")
             return None
+
+    def _fetch_chunk(self, pair_addresses: List[str], timeout: float) -> bytes:
+        """Fetch up to MAX_PAIRS_PER_REQUEST pairs in a single request; returns the raw body."""
+        url = f"{self.base_url}/pairs/{self.chain_id}/{','.join(pair_addresses)}"
+        METRICS.count("market.api_calls")
+        with METRICS.timer("market.request"):
+            response = self.governor.get(self.session, url, priority=MARKET_DATA,
+                                         max_wait=timeout, timeout=timeout)
+        response.raise_for_status()
+        return response.content
+
+    def fetch_many(self, pair_addresses: Iterable[str], timeout: Optional[float] = None,
+                   deadline: Optional[float] = None) -> Dict[str, TokenView]:
+        """Fetch many pairs concurrently.
+
+        Addresses are batched into multi-pair requests which run in parallel
+        on the pooled session. ``timeout`` bounds each request, both its
+        wait for a rate-limit slot and the HTTP call itself, and
+        ``deadline`` bounds the whole batch (by default twice the timeout,
+        so a request that queued and then ran for its full timeout still
+        counts); pairs that fail or are still in flight when the deadline
+        passes are left out of the result.
+
+        Values are TokenView rows of one PairColumns batch, read like TokenData.
+        """
+        columns = self._fetch_columns(pair_addresses, timeout, deadline)
+        self._store(columns.token_data().values())
+        return columns.views()
+
+    def fetch_columns(self, pair_addresses: Iterable[str], timeout: Optional[float] = None,
+                      deadline: Optional[float] = None) -> PairColumns:
+        """Like fetch_many, but return the whole batch as columns."""
+        columns = self._fetch_columns(pair_addresses, timeout, deadline)
+        self._store(columns.token_data().values())
+        return columns
+
+    def _fetch_columns(self, pair_addresses: Iterable[str], timeout: Optional[float],
+                       deadline: Optional[float]) -> PairColumns:
+        addresses = list(dict.fromkeys(a for a in pair_addresses if a))
+        columns = PairColumns(len(addresses))
+        if not addresses:
+            return columns
+
+        timeout = timeout if timeout is not None else self.request_timeout
+        if deadline is None:
+            # Each request may queue for a slot (max_wait) and then run for timeout
+            deadline = 2 * timeout
+
+        chunks = [
+            addresses[i:i + MAX_PAIRS_PER_REQUEST]
+            for i in range(0, len(addresses), MAX_PAIRS_PER_REQUEST)
+        ]
+        started = time.monotonic()
+        METRICS.count("market.pairs_requested", len(addresses))
+        futures = [self._executor.submit(self._fetch_chunk, chunk, timeout) for chunk in chunks]
+        done, not_done = wait(futures, timeout=deadline)
+
+        # Decode one body at a time so each response's objects are freed
+        # before the next is parsed
+        for future in done:
+            try:
+                columns.append_pairs(decode_pairs(future.result()))
+            except Exception as e:
+                METRICS.count("market.errors")
+                EVENTS.emit(FAILURE, 'market data', f"fetching pair batch: {e}")
+        for future in not_done:
+            future.cancel()
+
+        METRICS.observe("market.fetch_many", (time.monotonic() - started) * 1e6)
+        if not_done:
+            METRICS.count("market.deadline_misses", len(not_done))
+            EVENTS.emit(WARN, 'market data',
+                        f"Market data deadline hit after {time.monotonic() - started:.2f}s: "
+                        f"{len(not_done)} of {len(chunks)} batches pending")
+        return columns
+
+    def fetch_listing(self, url: Optional[str] = None,
+                      timeout: Optional[float] = None) -> PairColumns:
+        """Pairs on this chain from a DexScreener-style ``{"pairs": [...]}`` listing.
+
+        Defaults to a search for the chain id. Listed pairs also go into the
+        snapshot cache, so newly followed pairs need no separate fetch.
+        """
+        url = url or f"{self.base_url}/search?q={self.chain_id}"
+        timeout = timeout if timeout is not None else self.request_timeout
+        METRICS.count("market.api_calls")
+        with METRICS.timer("market.request"):
+            response = self.governor.get(self.session, url, priority=MARKET_DATA,
+                                         max_wait=timeout, timeout=timeout)
+        response.raise_for_status()
+        pairs = [pair for pair in decode_pairs(response.content)
+                 if pair.get('chainId', self.chain_id) == self.chain_id]
+        columns = PairColumns(len(pairs))
+        columns.append_pairs(pairs)
+        self._store(columns.token_data().values())
+        return columns
+
+    def _store(self, tokens: Iterable[TokenData]):
+        """Insert fetched tokens into the snapshot cache, evicting LRU entries.
+
+        TokenViews are copied out first, so the cache never pins a batch.
+        """
+        now = time.monotonic()
+        tokens = [token.to_token_data() if isinstance(token, TokenView) else token
+                  for token in tokens]
+        with self._cache_lock:
+            for token_data in tokens:
+                self._cache[token_data.pair_address] = (now, token_data)
+                self._cache.move_to_end(token_data.pair_address)
+            while len(self._cache) > self.max_cache_size:
+                self._cache.popitem(last=False)
+
+    def ingest(self, tokens: Iterable[TokenData]):
+        """Add updates from a push feed to the snapshot cache."""
+        self._store(tokens)
+
+    def get_cached(self, pair_address: str, max_age: Optional[float] = None) -> Optional[TokenData]:
+        """Return a cached pair if it is fresher than max_age seconds."""
+        max_age = self.cache_ttl if max_age is None else max_age
+        with self._cache_lock:
+            entry = self._cache.get(pair_address)
+            if entry is None or time.monotonic() - entry[0] > max_age:
+                return None
+            self._cache.move_to_end(pair_address)
+            return entry[1]
+
+    def get_snapshot(self, pair_addresses: Iterable[str],
+                     max_age: Optional[float] = None) -> Dict[str, TokenData]:
+        """Return TokenData for every pair, fetching only stale or missing entries.
+
+        A tick should call this once and pass the result to every consumer so
+        prices, filters, signals and valuation all see the same data.
+        """
+        snapshot = {}
+        missing = []
+        for pair_address in dict.fromkeys(a for a in pair_addresses if a):
+            token_data = self.get_cached(pair_address, max_age)
+            if token_data is None:
+                missing.append(pair_address)
+            else:
+                snapshot[pair_address] = token_data
+
+        with self._cache_lock:
+            self.cache_hits += len(snapshot)
+            self.cache_misses += len(missing)
+        METRICS.count("market.cache_hits", len(snapshot))
+        METRICS.count("market.cache_misses", len(missing))
+
+        if missing:
+            snapshot.update(self.fetch_many(missing))
+        return snapshot
+
+    def invalidate(self, pair_address: Optional[str] = None):
+        """Drop one pair, or the whole snapshot cache."""
+        with self._cache_lock:
+            if pair_address is None:
+                self._cache.clear()
+            else:
+                self._cache.pop(pair_address, None)
+
+    def cache_stats(self) -> dict:
+        """Snapshot cache counters."""
+        with self._cache_lock:
+            return {
+                'size': len(self._cache),
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+            }
+
+    def close(self):
+        """Release pooled connections and worker threads."""
+        self._executor.shutdown(wait=False)
+        self.session.close()
@@ -0,0 +1,373 @@
+"""
+Push-based price feeds, plus a tick recorder and replayer for offline runs.
+"""
+import asyncio
+import json
+import threading
+import time
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple
+
+from src.market_data.columnar import token_fields
+from src.market_data.market_provider import TokenData
+from src.monitoring.event_log import EVENTS, WARN
+
+class PriceFeed(ABC):
+    """Async iterator of TokenData updates.
+
+    Subclasses implement ``_messages()``, an async generator of
+    ``(seq, TokenData)`` for one connection. The base class reconnects with
+    backoff, counts sequence gaps, and coalesces bursts: if several updates
+    for a pair arrive before the consumer reads, only the latest is kept.
+
+    Sequence numbers run across the whole feed and are tracked across
+    reconnects, so updates missed while disconnected are reported as a gap
+    on the first message of the new connection.
+    """
+
+    def __init__(self, reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0,
+                 idle_timeout: Optional[float] = None):
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.idle_timeout = idle_timeout
+        self.reconnects = 0
+        self.gaps = 0
+        self.coalesced = 0
+        self.received = 0
+        self.last_seq: Optional[int] = None
+
+        self._latest: Dict[str, TokenData] = {}
+        self._ready: Optional[asyncio.Event] = None
+        self._producer: Optional[asyncio.Task] = None
+        self._finished = False
+
+    @abstractmethod
+    def _messages(self) -> AsyncIterator[Tuple[Optional[int], TokenData]]:
+        """Open one connection and yield (seq, TokenData); seq may be None."""
+
+    async def _on_gap(self, expected: int, received: int):
+        """Called when sequence numbers skip; subclasses may resync here."""
+        EVENTS.emit(WARN, 'price feed', f"Price feed gap: expected seq {expected}, got {received}")
+
+    async def _produce(self):
+        delay = self.reconnect_delay
+        while True:
+            messages = self._messages()
+            try:
+                while True:
+                    if self.idle_timeout is None:
+                        seq, token_data = await messages.__anext__()
+                    else:
+                        seq, token_data = await asyncio.wait_for(messages.__anext__(),
+                                                                 self.idle_timeout)
+                    delay = self.reconnect_delay
+                    self.received += 1
+
+                    if seq is not None:
+                        last_seq = self.last_seq
+                        if last_seq is not None and seq != last_seq + 1:
+                            self.gaps += 1
+                            await self._on_gap(last_seq + 1, seq)
+                        self.last_seq = seq
+
+                    if token_data.pair_address in self._latest:
+                        self.coalesced += 1
+                    self._latest[token_data.pair_address] = token_data
+                    self._ready.set()
+            except StopAsyncIteration:
+                self._finished = True
+                self._ready.set()
+                return
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.reconnects += 1
+                EVENTS.emit(WARN, 'price feed',
+                            f"Price feed disconnected ({e!r}); reconnecting in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_reconnect_delay)
+            finally:
+                await messages.aclose()
+
+    def __aiter__(self):
+        if self._producer is None:
+            self._ready = asyncio.Event()
+            self._producer = asyncio.get_running_loop().create_task(self._produce())
+        return self
+
+    async def __anext__(self) -> TokenData:
+        while not self._latest:
+            if self._finished:
+                raise StopAsyncIteration
+            self._ready.clear()
+            await self._ready.wait()
+        pair_address = next(iter(self._latest))
+        return self._latest.pop(pair_address)
+
+    async def close(self):
+        """Stop the feed and its connection."""
+        if self._producer is not None:
+            self._producer.cancel()
+            try:
+                await self._producer
+            except asyncio.CancelledError:
+                pass
+            self._producer = None
+        self._finished = True
+
+class PollingPriceFeed(PriceFeed):
+    """Feed backed by MarketDataProvider polling, for sources without push.
+
+    ``pair_addresses`` is re-read on every poll, so a live collection such
+    as the bot's universe follows pairs added and removed while running.
+    """
+
+    def __init__(self, provider, pair_addresses: Iterable[str], interval: float = 5.0, **kwargs):
+        super().__init__(**kwargs)
+        self.provider = provider
+        self.pair_addresses = pair_addresses
+        self.interval = interval
+        self._seq = 0  # continues across reconnects
+
+    async def _messages(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            snapshot = await asyncio.to_thread(self.provider.fetch_many,
+                                               list(self.pair_addresses))
+            for token_data in snapshot.values():
+                self._seq += 1
+                yield self._seq, token_data
+            deadline += self.interval
+            await asyncio.sleep(max(deadline - loop.time(), 0))
+
+class TickRecorder:
+    """Appends ticks to a JSONL file that ReplayPriceFeed can play back."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        # Appending to an earlier recording continues its sequence numbers
+        self._seq = self._resume()
+        self._file = open(self.path, 'a', buffering=1, encoding='utf-8')
+
+    def _resume(self) -> int:
+        """Cut a torn last line from an existing file and return its last seq."""
+        if not self.path.exists():
+            return 0
+        with open(self.path, 'r+b') as f:
+            size = f.seek(0, 2)
+            block = 4096
+            while True:
+                # Read back from the end until a whole line is in view
+                start = max(size - block, 0)
+                f.seek(start)
+                tail = f.read()
+                complete = tail[:tail.rfind(b'\n') + 1]
+                lines = complete.splitlines()
+                if start == 0 or len(lines) > 1:
+                    break
+                block *= 2
+            if len(complete) != len(tail):
+                f.truncate(start + len(complete))
+        # Unless the read began at the top, its first line may be partial
+        for line in reversed(lines if start == 0 else lines[1:]):
+            if line.strip():
+                return json.loads(line).get('seq') or 0
+        return 0
+
+    def record(self, token_data: TokenData, timestamp: Optional[float] = None):
+        """Write one tick."""
+        self._seq += 1
+        entry = {'t': time.time() if timestamp is None else timestamp, 'seq': self._seq}
+        entry.update(token_fields(token_data))
+        self._file.write(json.dumps(entry, separators=(',', ':')) + '\n')
+
+    async def tee(self, feed: PriceFeed) -> AsyncIterator[TokenData]:
+        """Pass a feed through while recording every update."""
+        async for token_data in feed:
+            self.record(token_data)
+            yield token_data
+
+    def close(self):
+        self._file.close()
+
+def load_ticks(path: str) -> List[Tuple[float, int, TokenData]]:
+    """Read a recording as (timestamp, seq, TokenData) tuples."""
+    ticks = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            timestamp = entry.pop('t')
+            seq = entry.pop('seq', None)
+            ticks.append((timestamp, seq, TokenData(**entry)))
+    return ticks
+
+class ReplayPriceFeed(PriceFeed):
+    """Plays a recording back through the PriceFeed interface.
+
+    ``speed`` scales time (1.0 is real time, 1000.0 is a thousand times
+    faster); ``speed=None`` replays as fast as the consumer reads. After a
+    reconnect playback resumes at the first undelivered tick.
+    """
+
+    def __init__(self, path: str, speed: Optional[float] = 1.0, **kwargs):
+        super().__init__(**kwargs)
+        self.ticks = load_ticks(path)
+        self.speed = speed
+        self.offset = 0  # index of the next tick to deliver
+
+    async def _messages(self):
+        ticks = self.ticks
+        if self.offset >= len(ticks):
+            return
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+        first = ticks[self.offset][0]
+        while self.offset < len(ticks):
+            timestamp, seq, token_data = ticks[self.offset]
+            if self.speed:
+                delay = started + (timestamp - first) / self.speed - loop.time()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                await asyncio.sleep(0)
+            self.offset += 1
+            yield seq, token_data
+
+class _ReplayHTTPServer(ThreadingHTTPServer):
+    # The default backlog of 5 drops SYNs when a pooled client opens many
+    # connections at once, stalling each dropped connect for a second
+    request_queue_size = 128
+    daemon_threads = True
+
+class ReplayServer:
+    """Local stand-in for the DexScreener pairs API, driven by a recording.
+
+    A background thread advances through the recording at ``speed``; pair
+    requests are answered from the latest replayed state, so
+    MarketDataProvider can run against it by pointing base_url here.
+    ``/search`` lists every pair replayed so far, for discovery.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0, host: str = '127.0.0.1', port: int = 0):
+        self.ticks = load_ticks(path)
+        self.speed = speed
+        self._state: Dict[str, TokenData] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._replayed = threading.Event()
+        self.requests = 0
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                server.requests += 1
+                parts = self.path.split('?', 1)[0].rstrip('/').split('/')
+                if parts[-1] == 'search':
+                    # Listing: every pair replayed so far
+                    with server._lock:
+                        pairs = list(server._state.values())
+                elif 'pairs' in parts[:-1]:
+                    addresses = parts[-1].split(',')
+                    with server._lock:
+                        pairs = [server._state[a] for a in addresses if a in server._state]
+                else:
+                    self.send_error(404)
+                    return
+                body = [server._to_pair(t) for t in pairs]
+                payload = {'pairs': body, 'pair': body[0] if body else None}
+                data = json.dumps(payload).encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+        self._httpd = _ReplayHTTPServer((host, port), Handler)
+        self._threads = []
+
+    @staticmethod
+    def _to_pair(token_data: TokenData) -> dict:
+        return {
+            'pairAddress': token_data.pair_address,
+            'baseToken': {
+                'name': token_data.base_token_name,
+                'symbol': token_data.base_token_symbol,
+                'address': token_data.base_token_address,
+            },
+            'priceUsd': str(token_data.price_usd),
+            'volumeH24': token_data.volume_h24,
+            'liquidity': {'usd': token_data.liquidity_usd},
+            'priceChange': {'h24': token_data.price_change_h24},
+        }
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/latest/dex"
+
+    def _replay(self):
+        try:
+            if not self.ticks:
+                return
+            started = time.monotonic()
+            first = self.ticks[0][0]
+            for timestamp, _, token_data in self.ticks:
+                delay = started + (timestamp - first) / self.speed - time.monotonic()
+                if delay > 0 and self._stop.wait(delay):
+                    return
+                with self._lock:
+                    self._state[token_data.pair_address] = token_data
+        finally:
+            self._replayed.set()
+
+    def wait_replayed(self, timeout: Optional[float] = None) -> bool:
+        """Block until the whole recording has been applied."""
+        return self._replayed.wait(timeout)
+
+    def start(self) -> 'ReplayServer':
+        """Serve requests and start replaying in background threads."""
+        for target in (self._httpd.serve_forever, self._replay):
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+FEEDS = {
+    'replay': ReplayPriceFeed,
+    'polling': PollingPriceFeed,
+}
+
+def build_feed(spec: Dict[str, Any], provider=None,
+               pair_addresses: Iterable[str] = ()) -> PriceFeed:
+    """Feed from a config entry such as ``{"type": "replay", "path": "ticks.jsonl"}``.
+
+    A polling feed reads ``pair_addresses`` through ``provider``.
+    """
+    params = dict(spec)
+    feed_type = params.pop('type')
+    if feed_type not in FEEDS:
+        raise ValueError(f"Unknown feed type {feed_type!r}")
+    if feed_type == 'polling':
+        return PollingPriceFeed(provider, pair_addresses, **params)
+    return FEEDS[feed_type](**params)
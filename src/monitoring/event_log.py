@@ -0,0 +1,242 @@
+"""
+Structured event log that keeps console and file output off the trading path.
+
+Events have a fixed schema (see the EventType constants below) and are
+appended to an in-memory queue; a background thread drains it in batches
+to a rotating JSONL file and to the console. A disabled level costs one
+comparison, and an enabled one a tuple append.
+
+Configure with TRADING_BOT_LOG_LEVEL, TRADING_BOT_CONSOLE_LEVEL and
+TRADING_BOT_EVENT_LOG (JSONL path), or EVENTS.configure().
+"""
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from typing import Optional, Tuple
+
+try:
+    from orjson import dumps as _orjson_dumps
+except ImportError:
+    _orjson_dumps = None
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+OFF = 100
+
+LEVEL_NAMES = {DEBUG: 'DEBUG', INFO: 'INFO', WARNING: 'WARNING', ERROR: 'ERROR', OFF: 'OFF'}
+LEVELS = {name.lower(): level for level, name in LEVEL_NAMES.items()}
+
+class EventType:
+    """A named event with a level, fixed field names and a console message."""
+
+    __slots__ = ('name', 'level', 'fields', 'message')
+
+    def __init__(self, name: str, level: int, fields: Tuple[str, ...], message: str):
+        self.name = name
+        self.level = level
+        self.fields = fields
+        self.message = message
+
+    def format(self, values: tuple) -> str:
+        return self.message.format(**dict(zip(self.fields, values)))
+
+# Trading
+FILL = EventType('fill', INFO, ('symbol', 'side', 'quantity', 'price', 'cash'),
+                 "Fill: {side} {quantity} {symbol} at ${price:.6f}. Cash: ${cash:.2f}")
+POSITION = EventType('position', INFO, ('symbol', 'status', 'quantity'),
+                     "Position in {symbol} {status}; {quantity} left")
+TRIGGER = EventType('trigger', INFO, ('symbol', 'trigger', 'price'),
+                    "Triggered {trigger} for {symbol} at ${price:.6f}")
+SKIP = EventType('skip', INFO, ('symbol', 'reason'), "Skipping {symbol}: {reason}")
+ORDER = EventType('order', DEBUG, ('side', 'token_address', 'amount'),
+                  "Executing {side}: {amount} for {token_address}")
+VALUATION = EventType('valuation', INFO,
+                      ('equity', 'realized_pnl', 'unrealized_pnl', 'drawdown'),
+                      "Portfolio value: ${equity:.2f} (realized ${realized_pnl:.2f}, "
+                      "unrealized ${unrealized_pnl:.2f}, drawdown {drawdown:.1%})")
+# Universe
+SYMBOL = EventType('symbol', INFO, ('symbol', 'pair_address', 'action'),
+                   "Symbol {symbol} {action}")
+UNIVERSE = EventType('universe', INFO,
+                     ('added', 'removed', 'screened', 'unchanged', 'monitored'),
+                     "Universe: +{added} -{removed} ({screened} screened, "
+                     "{unchanged} unchanged, {monitored} monitored)")
+# Everything else
+STATUS = EventType('status', INFO, ('component', 'message'), "{message}")
+WARN = EventType('warning', WARNING, ('component', 'message'), "{message}")
+FAILURE = EventType('error', ERROR, ('component', 'message'), "Error in {component}: {message}")
+
+def _json_default(value):
+    # numpy scalars and anything else without a JSON form
+    return value.item() if hasattr(value, 'item') else str(value)
+
+class EventLog:
+    """Queued event log with a background batch writer.
+
+    ``level`` gates what is queued at all; ``console_level`` what of it is
+    also printed. The queue holds at most ``capacity`` events; past that new
+    events are counted in ``dropped`` instead of blocking the caller. Files
+    rotate at ``max_bytes`` keeping ``backups`` old files.
+    """
+
+    def __init__(self, level: int = INFO, console_level: int = INFO, path: Optional[str] = None,
+                 max_bytes: int = 64 * 1024 * 1024, backups: int = 5,
+                 capacity: int = 100000, flush_interval: float = 0.1, batch_size: int = 4096):
+        self.level = level
+        self.console_level = console_level
+        self.path = path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.capacity = capacity
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.dropped = 0
+        self.written = 0
+
+        self._queue = deque()
+        self._file = None
+        self._size = 0
+        self._thread: Optional[threading.Thread] = None
+        self._wake = threading.Event()
+        self._stopping = False
+        self._write_lock = threading.Lock()
+
+    def enabled(self, level: int) -> bool:
+        return level >= self.level
+
+    def emit(self, event: EventType, *values):
+        """Queue one event; ``values`` follow ``event.fields``."""
+        if event.level < self.level:
+            return
+        queue = self._queue
+        if len(queue) >= self.capacity:
+            self.dropped += 1
+            return
+        queue.append((time.time(), event, values))
+        if self._thread is None:
+            self._start()
+
+    def _start(self):
+        with self._write_lock:
+            if self._thread is not None:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="event-log", daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        """Write out everything queued so far."""
+        with self._write_lock:
+            queue = self._queue
+            while queue:
+                batch = []
+                while queue and len(batch) < self.batch_size:
+                    batch.append(queue.popleft())
+                self._write(batch)
+
+    def _write(self, batch: list):
+        try:
+            lines = [event.format(values) for _, event, values in batch
+                     if event.level >= self.console_level]
+            if lines:
+                sys.stdout.write("\n".join(lines) + "\n")
+                sys.stdout.flush()
+            if self.path:
+                self._write_file(batch)
+            self.written += len(batch)
+        except Exception as e:
+            sys.stderr.write(f"Error writing event log: {e}\n")
+
+    def _write_file(self, batch: list):
+        records = []
+        for timestamp, event, values in batch:
+            record = {'ts': timestamp, 'level': LEVEL_NAMES[event.level], 'event': event.name}
+            record.update(zip(event.fields, values))
+            records.append(record)
+        if _orjson_dumps is not None:
+            data = b"".join(_orjson_dumps(record, default=_json_default) + b"\n"
+                            for record in records)
+        else:
+            data = "".join(json.dumps(record, default=_json_default) + "\n"
+                           for record in records).encode('utf-8')
+
+        if self._file is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._file = open(self.path, 'ab')
+            self._size = self._file.tell()
+        if self._size + len(data) > self.max_bytes and self._size:
+            self._rotate()
+        self._file.write(data)
+        self._file.flush()
+        self._size += len(data)
+
+    def _rotate(self):
+        self._file.close()
+        for index in range(self.backups - 1, 0, -1):
+            older = f"{self.path}.{index}"
+            if os.path.exists(older):
+                os.replace(older, f"{self.path}.{index + 1}")
+        if self.backups:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, 'ab')
+        self._size = 0
+
+    def configure(self, level=None, console_level=None, path: Optional[str] = None, **settings):
+        """Change levels (numbers or names such as "debug"), file path or limits."""
+        with self._write_lock:
+            if level is not None:
+                self.level = LEVELS[level.lower()] if isinstance(level, str) else level
+            if console_level is not None:
+                self.console_level = (LEVELS[console_level.lower()]
+                                      if isinstance(console_level, str) else console_level)
+            if path is not None and path != self.path:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self.path = path
+            for name, value in settings.items():
+                if name.startswith('_') or not hasattr(self, name):
+                    raise ValueError(f"Unknown event log setting {name!r}")
+                setattr(self, name, value)
+
+    def close(self):
+        """Stop the writer after writing out the queue."""
+        self._stopping = True
+        self._wake.set()
+        thread, self._thread = self._thread, None
+        if thread is not None and thread is not threading.current_thread():
+            thread.join()
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def stats(self) -> dict:
+        return {'queued': len(self._queue), 'written': self.written, 'dropped': self.dropped}
+
+def _env_level(name: str, default: int) -> int:
+    value = os.environ.get(name, "")
+    return LEVELS.get(value.lower(), default) if value else default
+
+EVENTS = EventLog(level=_env_level("TRADING_BOT_LOG_LEVEL", INFO),
+                  console_level=_env_level("TRADING_BOT_CONSOLE_LEVEL", INFO),
+                  path=os.environ.get("TRADING_BOT_EVENT_LOG") or None)
+atexit.register(EVENTS.close)
+
+# For components whose events nobody wants, e.g. backtest sweeps
+NULL_LOG = EventLog(level=OFF)
@@ -0,0 +1,245 @@
+"""
+Lightweight hot-path metrics: counters, timers and latency histograms.
+
+Disabled by default. Set TRADING_BOT_METRICS=1 (or call METRICS.enable())
+to record; while disabled, timers return a shared no-op context manager and
+counters return immediately.
+"""
+import os
+import tempfile
+import threading
+import time
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+
+# 2**5 sub-buckets per power of two: about 3% relative precision
+SUB_BUCKET_BITS = 5
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+class LatencyHistogram:
+    """HDR-style log-linear histogram of integer microsecond latencies."""
+
+    __slots__ = ('counts', 'count', 'total', 'min', 'max', '_lock')
+
+    def __init__(self):
+        self.counts = [0] * ((65 - SUB_BUCKET_BITS) * SUB_BUCKETS)
+        self.count = 0
+        self.total = 0
+        self.min = None
+        self.max = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _index(value: int) -> int:
+        if value < SUB_BUCKETS:
+            return value
+        shift = value.bit_length() - SUB_BUCKET_BITS - 1
+        return (shift + 1) * SUB_BUCKETS + (value >> shift) - SUB_BUCKETS
+
+    @staticmethod
+    def _lowest(index: int) -> int:
+        if index < SUB_BUCKETS:
+            return index
+        shift = index // SUB_BUCKETS - 1
+        return (index % SUB_BUCKETS + SUB_BUCKETS) << shift
+
+    def record(self, value_us: float):
+        value = max(int(value_us), 0)
+        with self._lock:
+            self.counts[self._index(value)] += 1
+            self.count += 1
+            self.total += value
+            if self.min is None or value < self.min:
+                self.min = value
+            if value > self.max:
+                self.max = value
+
+    def percentile(self, percent: float) -> int:
+        """Value at the given percentile (bucket lower bound, capped at max)."""
+        with self._lock:
+            if self.count == 0:
+                return 0
+            target = max(1, int(round(self.count * percent / 100.0)))
+            seen = 0
+            for index, bucket in enumerate(self.counts):
+                seen += bucket
+                if seen >= target:
+                    return min(self._lowest(index), self.max)
+            return self.max
+
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def reset(self):
+        with self._lock:
+            self.counts = [0] * len(self.counts)
+            self.count = 0
+            self.total = 0
+            self.min = None
+            self.max = 0
+
+class _NullTimer:
+    """Shared no-op timer handed out while metrics are disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_TIMER = _NullTimer()
+
+class _Timer:
+    __slots__ = ('metrics', 'name', 'started')
+
+    def __init__(self, metrics, name):
+        self.metrics = metrics
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.metrics.observe(self.name, (time.perf_counter() - self.started) * 1e6)
+        return False
+
+class Metrics:
+    """Registry of counters and latency histograms."""
+
+    def __init__(self, enabled: bool = False):
+        self.enabled = enabled
+        self.counters: Dict[str, int] = {}
+        self.histograms: Dict[str, LatencyHistogram] = {}
+        self._last_tick: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self._server = None
+
+    def enable(self):
+        self.enabled = True
+
+    def disable(self):
+        self.enabled = False
+
+    def count(self, name: str, value: int = 1):
+        """Increment a counter."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def observe(self, name: str, value_us: float):
+        """Record one latency sample in microseconds."""
+        if not self.enabled:
+            return
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            with self._lock:
+                histogram = self.histograms.setdefault(name, LatencyHistogram())
+        histogram.record(value_us)
+        self._last_tick[name] = self._last_tick.get(name, 0.0) + value_us
+
+    def timer(self, name: str):
+        """Context manager timing its block into histogram ``name``."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name)
+
+    def timed(self, name: str):
+        """Decorator form of timer()."""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self, name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def summary(self) -> dict:
+        """Counters plus count/mean/p50/p90/p99/max per histogram (microseconds)."""
+        with self._lock:
+            histograms = dict(self.histograms)
+            counters = dict(self.counters)
+        return {
+            'counters': counters,
+            'latency_us': {
+                name: {
+                    'count': h.count,
+                    'mean': round(h.mean(), 1),
+                    'p50': h.percentile(50),
+                    'p90': h.percentile(90),
+                    'p99': h.percentile(99),
+                    'max': h.max,
+                }
+                for name, h in sorted(histograms.items())
+            },
+        }
+
+    def tick_summary(self) -> str:
+        """One line with time spent per metric since the last call."""
+        last, self._last_tick = self._last_tick, {}
+        parts = [f"{name}={value / 1000.0:.2f}ms" for name, value in sorted(last.items())]
+        return "tick: " + (" ".join(parts) if parts else "no samples")
+
+    def render_text(self) -> str:
+        """Prometheus-style text exposition."""
+        summary = self.summary()
+        lines = []
+        for name, value in sorted(summary['counters'].items()):
+            metric = _metric_name(name)
+            lines.append(f"# TYPE {metric}_total counter")
+            lines.append(f"{metric}_total {value}")
+        for name, stats in summary['latency_us'].items():
+            metric = _metric_name(name) + "_latency_us"
+            lines.append(f"# TYPE {metric} summary")
+            for quantile in ('p50', 'p90', 'p99'):
+                lines.append(f'{metric}{{quantile="0.{quantile[1:]}"}} {stats[quantile]}')
+            lines.append(f"{metric}_count {stats['count']}")
+            lines.append(f"{metric}_max {stats['max']}")
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str):
+        """Atomically write render_text() to a file for scraping."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(self.render_text())
+        os.replace(tmp_path, path)
+
+    def serve(self, port: int = 9108, host: str = '127.0.0.1'):
+        """Expose render_text() over HTTP on a local port."""
+        if self._server is not None:
+            return self._server
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                body = metrics.render_text().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/plain; version=0.0.4')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self._server
+
+    def reset(self):
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self._last_tick = {}
+
+def _metric_name(name: str) -> str:
+    return "tradingbot_" + "".join(c if c.isalnum() else "_" for c in name)
+
+METRICS = Metrics(enabled=os.environ.get("TRADING_BOT_METRICS", "") not in ("", "0"))
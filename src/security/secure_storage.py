@@ -4,23 +4,61 @@ Secure storage using AES encryption.
 import os
 import json
 import base64
+import hashlib
+import hmac
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from cryptography.fernet import Fernet
-from cryptography.hazmat.primitives import hashes
-from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
-from cryptography.hazmat.backends import default_backend
+from typing import Optional
+from cryptography.fernet import Fernet, InvalidToken
+
+from src.monitoring.event_log import EVENTS, FAILURE
+from src.monitoring.metrics import METRICS
+
+# Derived keys, so PBKDF2 runs once per process. Entries are keyed by an
+# HMAC of salt and password under a random per-process secret, so the
+# cache holds no unsalted password hash and nothing comparable across
+# processes.
+_KEY_CACHE = {}
+_KEY_CACHE_SECRET = os.urandom(32)
+_KEY_CACHE_LOCK = threading.Lock()
 
 class SecureStorage:
-    """Secure storage for sensitive data."""
-    
+    """Secure storage for sensitive data.
+
+    Decrypted secrets are held in memory and reloaded only when the file's
+    mtime or size changes. Writes made inside ``batch()`` are applied in
+    memory and flushed with a single atomic rewrite.
+    """
+
     def __init__(self, storage_file="secrets.enc"):
         self.storage_file = Path(storage_file)
         self._key = None
         self._cipher = None
         self.storage_file.parent.mkdir(parents=True, exist_ok=True)
-    
+
+        self._lock = threading.RLock()
+        self._secrets = None
+        self._file_stamp = None
+        self._batch_depth = 0
+        self._dirty = False
+
     def _derive_key_from_password(self, password: str, salt: bytes) -> bytes:
         """Derive encryption key from password."""
+        # Length-prefix the salt so (salt, password) pairs cannot collide
+        message = len(salt).to_bytes(4, 'big') + salt + password.encode()
+        cache_key = hmac.new(_KEY_CACHE_SECRET, message, hashlib.sha256).digest()
+        with _KEY_CACHE_LOCK:
+            key = _KEY_CACHE.get(cache_key)
+        if key is not None:
+            return key
+
+        # Only needed when no derived key is supplied or cached
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+        from cryptography.hazmat.backends import default_backend
+
         kdf = PBKDF2HMAC(
             algorithm=hashes.SHA256(),
             length=32,
@@ -29,75 +67,177 @@ class SecureStorage:
             backend=default_backend()
         )
         key = base64.urlsafe_b64encode(kdf.derive(password.encode()))
+        with _KEY_CACHE_LOCK:
+            _KEY_CACHE[cache_key] = key
         return key
-    
+
+    @property
+    def salt_file(self) -> Path:
+        return self.storage_file.with_suffix('.salt')
+
+    @property
+    def derived_key(self) -> Optional[bytes]:
+        """Key derived at initialization; lets other processes skip PBKDF2."""
+        return self._key
+
+    def _load_salt(self) -> bytes:
+        # Reuse the persisted salt so existing secrets stay readable
+        if self.salt_file.exists():
+            return self.salt_file.read_bytes()
+        salt = os.urandom(16)
+        with open(self.salt_file, 'wb') as f:
+            f.write(salt)
+        return salt
+
     def initialize_storage(self, password: str) -> bool:
         """Initialize storage with password."""
         try:
-            salt = os.urandom(16)
-            self._key = self._derive_key_from_password(password, salt)
+            key = self._derive_key_from_password(password, self._load_salt())
+        except Exception as e:
+            EVENTS.emit(FAILURE, 'secure storage', f"initializing: {e}")
+            return False
+        return self.initialize_with_key(key)
+
+    def initialize_with_key(self, key: bytes) -> bool:
+        """Initialize storage with an already derived key (see derived_key)."""
+        try:
+            self._key = key
             self._cipher = Fernet(self._key)
-            
-            # Save salt for future use
-            salt_file = self.storage_file.with_suffix('.salt')
-            with open(salt_file, 'wb') as f:
-                f.write(salt)
-            
+
+            with self._lock:
+                self._secrets = None
+                self._file_stamp = None
+
+            # Create empty storage file, or check the key against it
+            if not self.storage_file.exists():
+                self._save_encrypted_data({})
+            else:
+                self._load_cached()
+
             # Set restrictive permissions
             if hasattr(os, 'chmod'):
-                os.chmod(salt_file, 0o600)
+                if self.salt_file.exists():
+                    os.chmod(self.salt_file, 0o600)
                 os.chmod(self.storage_file, 0o600)
-            
-            # Create empty storage file
-            if not self.storage_file.exists():
-                self._save_encrypted_data({})
-            
+
             return True
+        except InvalidToken:
+            EVENTS.emit(FAILURE, 'secure storage',
+                        "initializing: wrong password or key, or corrupted secrets file")
+            self._cipher = None
+            return False
         except Exception as e:
-            print(f"Error initializing storage: {e}")
+            EVENTS.emit(FAILURE, 'secure storage', f"initializing: {e}")
             return False
-    
-    def _save_encrypted_data(self,  dict):
-        """Save encrypted data to file."""
+
+    def _stat_stamp(self):
+        """(mtime_ns, size) of the storage file, or None if missing."""
+        try:
+            stat = self.storage_file.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _save_encrypted_data(self, data: dict):
+        """Save encrypted data to file, atomically replacing the old one."""
         if not self._cipher:
             raise RuntimeError("Storage not initialized")
-        
+
         json_data = json.dumps(data)
         encrypted_data = self._cipher.encrypt(json_data.encode('utf-8'))
-        
-        with open(self.storage_file, 'wb') as f:
-            f.write(encrypted_data)
-    
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.storage_file.parent,
+                                        prefix=self.storage_file.name, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(encrypted_data)
+                f.flush()
+                os.fsync(f.fileno())
+            if hasattr(os, 'chmod'):
+                os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.storage_file)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
+
+        with self._lock:
+            self._secrets = dict(data)
+            self._file_stamp = self._stat_stamp()
+            self._dirty = False
+
     def _load_encrypted_data(self) -> dict:
         """Load and decrypt data from file."""
         if not self._cipher:
             raise RuntimeError("Storage not initialized")
-        
+
         if not self.storage_file.exists():
             return {}
-        
+
         with open(self.storage_file, 'rb') as f:
             encrypted_data = f.read()
-        
+
         decrypted_data = self._cipher.decrypt(encrypted_data)
         return json.loads(decrypted_data.decode('utf-8'))
-    
+
+    def _load_cached(self) -> dict:
+        """Decrypted secrets, re-read only when the file changed on disk."""
+        with self._lock:
+            if self._dirty:
+                return self._secrets
+            stamp = self._stat_stamp()
+            if self._secrets is None or stamp != self._file_stamp:
+                METRICS.count("storage.decrypts")
+                with METRICS.timer("storage.decrypt"):
+                    self._secrets = self._load_encrypted_data()
+                self._file_stamp = stamp
+            return self._secrets
+
+    def flush(self):
+        """Write pending batched secrets to disk."""
+        with self._lock:
+            if self._dirty:
+                self._save_encrypted_data(self._secrets)
+
+    @contextmanager
+    def batch(self):
+        """Group several store_secret calls into one atomic file rewrite."""
+        with self._lock:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.flush()
+
     def store_secret(self, key: str, value: any) -> bool:
         """Store a secret value."""
         try:
-            data = self._load_encrypted_data()
-            data[key] = value
-            self._save_encrypted_data(data)
+            with self._lock:
+                data = dict(self._load_cached())
+                data[key] = value
+                if self._batch_depth:
+                    self._secrets = data
+                    self._dirty = True
+                else:
+                    self._save_encrypted_data(data)
             return True
         except Exception as e:
-            print(f"Error storing secret: {e}")
+            EVENTS.emit(FAILURE, 'secure storage', f"storing secret: {e}")
             return False
-    
+
+    def store_secrets(self, secrets: dict) -> bool:
+        """Store several secret values with a single write."""
+        with self.batch():
+            return all(self.store_secret(key, value) for key, value in secrets.items())
+
     def retrieve_secret(self, key: str, default=None):
         """Retrieve a secret value."""
         try:
-            data = self._load_encrypted_data()
-            return data.get(key, default)
+            with METRICS.timer("storage.retrieve"):
+                return self._load_cached().get(key, default)
         except Exception as e:
-            print(f"Error retrieving secret: {e}")
+            EVENTS.emit(FAILURE, 'secure storage', f"retrieving secret: {e}")
             return default
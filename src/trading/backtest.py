@@ -0,0 +1,246 @@
+"""
+Backtesting engine that replays historical bars through the live trading rules.
+"""
+import heapq
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from src.monitoring.event_log import NULL_LOG
+from src.trading.strategy import SMACrossoverStrategy, BUY, SELL, rolling_sma, crossover_codes
+from src.trading.portfolio_manager import PortfolioManager
+
+# Event phases within one bar, in the order run_once applies them
+_PROFIT_TAKING, _EXIT, _ENTRY = 0, 1, 2
+
+@dataclass
+class BacktestConfig:
+    """Parameters for one backtest run."""
+    fast_period: int = 10
+    slow_period: int = 20
+    partial_sell_ratio: float = 0.5
+    initial_balance: float = 1000.0
+    position_size_usd: float = 100.0
+    min_confidence: float = 0.3
+    exit_on_sell: bool = False
+
+@dataclass
+class BacktestResult:
+    """Summary of one backtest run."""
+    fast_period: int
+    slow_period: int
+    partial_sell_ratio: float
+    final_equity: float
+    total_return: float
+    max_drawdown: float
+    trades: int
+
+def _max_drawdown(equity: np.ndarray) -> float:
+    """Largest peak-to-trough decline as a fraction of the peak."""
+    if len(equity) == 0:
+        return 0.0
+    peaks = np.maximum.accumulate(equity)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        drawdowns = np.where(peaks > 0, (peaks - equity) / peaks, 0.0)
+    return float(drawdowns.max())
+
+def _as_matrix(prices) -> np.ndarray:
+    return np.atleast_2d(np.asarray(prices, dtype=np.float64))
+
+def price_matrix_from_store(store, pair_addresses: Sequence[str], start: Optional[int] = None,
+                            end: Optional[int] = None) -> np.ndarray:
+    """Align closes from a HistoryStore into a (pairs x time) matrix.
+
+    Series are joined on timestamp, forward-filled, and trimmed to the
+    range where every pair has a price.
+    """
+    series = []
+    for pair_address in pair_addresses:
+        bars = store.pair(pair_address).slice(start, end)
+        series.append(pd.Series(bars['close'], index=bars['timestamp'], name=pair_address))
+    frame = pd.concat(series, axis=1).sort_index()
+    frame = frame[~frame.index.duplicated(keep='last')].ffill().dropna()
+    return frame.to_numpy().T
+
+class Backtester:
+    """Replays bars through SMACrossoverStrategy and PortfolioManager."""
+
+    def __init__(self, config: Optional[BacktestConfig] = None):
+        self.config = config or BacktestConfig()
+
+    def _result(self, equity: np.ndarray, trades: int) -> BacktestResult:
+        config = self.config
+        final_equity = float(equity[-1]) if len(equity) else config.initial_balance
+        return BacktestResult(
+            fast_period=config.fast_period,
+            slow_period=config.slow_period,
+            partial_sell_ratio=config.partial_sell_ratio,
+            final_equity=final_equity,
+            total_return=final_equity / config.initial_balance - 1.0,
+            max_drawdown=_max_drawdown(equity),
+            trades=trades
+        )
+
+    def run(self, prices, symbols: Optional[Sequence[str]] = None) -> BacktestResult:
+        """Event-driven replay: one bar at a time through the live objects."""
+        config = self.config
+        prices = _as_matrix(prices)
+        symbols = list(symbols) if symbols is not None else [f"S{i}" for i in range(len(prices))]
+        strategy = SMACrossoverStrategy(config.fast_period, config.slow_period)
+        portfolio = PortfolioManager(config.initial_balance, config.partial_sell_ratio,
+                                     events=NULL_LOG)
+        equity = np.empty(prices.shape[1])
+        trades = 0
+
+        for t in range(prices.shape[1]):
+            current_prices = dict(zip(symbols, prices[:, t].tolist()))
+
+            for order in portfolio.check_profit_taking_opportunities(current_prices):
+                if portfolio.update_position(order['symbol'], order['quantity'],
+                                             order['price'], 'sell'):
+                    trades += 1
+
+            for symbol, price in current_prices.items():
+                signal = strategy.update(symbol, price)
+                position = portfolio.positions.get(symbol)
+                is_open = position is not None and position.status == "open"
+
+                if signal.signal_type == 'sell' and config.exit_on_sell and is_open:
+                    if portfolio.update_position(symbol, position.quantity, price, 'sell'):
+                        trades += 1
+                elif (signal.signal_type == 'buy' and signal.confidence > config.min_confidence
+                      and not is_open):
+                    quantity = config.position_size_usd / price
+                    if portfolio.update_position(symbol, quantity, signal.entry_price, 'buy'):
+                        trades += 1
+
+            equity[t] = portfolio.cash + sum(
+                p.quantity * current_prices[s]
+                for s, p in portfolio.positions.items() if p.status == "open"
+            )
+
+        return self._result(equity, trades)
+
+    def run_fast(self, prices) -> BacktestResult:
+        """Vectorized replay for parameter sweeps.
+
+        Signals for every bar come from one cumulative-sum pass. The
+        portfolio rules are then applied only at event bars (entries,
+        exits and 2x triggers), and the equity curve is rebuilt with
+        array operations. Results match run() except on exact
+        floating-point SMA ties.
+        """
+        config = self.config
+        prices = _as_matrix(prices)
+        n_symbols, n_bars = prices.shape
+
+        fast = rolling_sma(prices, config.fast_period)
+        slow = rolling_sma(prices, config.slow_period)
+        codes = np.zeros(prices.shape, dtype=np.int8)
+        codes[:, 1:] = crossover_codes(fast[:, :-1], slow[:, :-1], fast[:, 1:], slow[:, 1:])
+        with np.errstate(divide='ignore', invalid='ignore'):
+            confidence = np.minimum(np.abs(fast / slow - 1.0) * 10, 1.0)
+
+        buy_bars = [np.flatnonzero((codes[i] == BUY) & (confidence[i] > config.min_confidence))
+                    for i in range(n_symbols)]
+        sell_bars = [np.flatnonzero(codes[i] == SELL) for i in range(n_symbols)]
+
+        events = []
+        for i in range(n_symbols):
+            if len(buy_bars[i]):
+                heapq.heappush(events, (int(buy_bars[i][0]), _ENTRY, i, -1))
+
+        cash = config.initial_balance
+        quantity = np.zeros(n_symbols)
+        entry_bar = np.full(n_symbols, -1)
+        cash_delta = np.zeros(n_bars)
+        qty_delta = np.zeros(prices.shape)
+        trades = 0
+
+        def schedule_entry(i, t, side):
+            nxt = np.searchsorted(buy_bars[i], t, side=side)
+            if nxt < len(buy_bars[i]):
+                heapq.heappush(events, (int(buy_bars[i][nxt]), _ENTRY, i, -1))
+
+        while events:
+            t, phase, i, opened_at = heapq.heappop(events)
+            price = prices[i, t]
+
+            if phase == _ENTRY:
+                if quantity[i] > 0:
+                    continue
+                qty = config.position_size_usd / price
+                if cash >= qty * price:
+                    cash -= qty * price
+                    cash_delta[t] -= qty * price
+                    quantity[i] = qty
+                    qty_delta[i, t] += qty
+                    entry_bar[i] = t
+                    trades += 1
+
+                    # First bar at or above 2x entry, strictly after entry
+                    hits = np.flatnonzero(prices[i, t + 1:] >= price * 2.0)
+                    if len(hits):
+                        heapq.heappush(events, (t + 1 + int(hits[0]), _PROFIT_TAKING, i, t))
+                    if config.exit_on_sell:
+                        nxt = np.searchsorted(sell_bars[i], t, side='right')
+                        if nxt < len(sell_bars[i]):
+                            heapq.heappush(events, (int(sell_bars[i][nxt]), _EXIT, i, t))
+                    continue
+                schedule_entry(i, t, 'right')
+
+            elif quantity[i] > 0 and entry_bar[i] == opened_at:
+                sold = quantity[i] * (config.partial_sell_ratio if phase == _PROFIT_TAKING else 1.0)
+                if sold <= 0:
+                    continue
+                cash += sold * price
+                cash_delta[t] += sold * price
+                quantity[i] -= sold
+                qty_delta[i, t] -= sold
+                trades += 1
+                if quantity[i] == 0:
+                    # Entries are evaluated after exits within a bar
+                    schedule_entry(i, t, 'left')
+
+        holdings = np.cumsum(qty_delta, axis=1)
+        equity = config.initial_balance + np.cumsum(cash_delta) + (holdings * prices).sum(axis=0)
+        return self._result(equity, trades)
+
+_worker_prices = None
+
+def _init_worker(prices):
+    global _worker_prices
+    _worker_prices = prices
+
+def _run_worker(config: BacktestConfig) -> BacktestResult:
+    return Backtester(config).run_fast(_worker_prices)
+
+def grid_search(prices, fast_periods: Iterable[int], slow_periods: Iterable[int],
+                partial_sell_ratios: Iterable[float], max_workers: Optional[int] = None,
+                **config_kwargs) -> List[BacktestResult]:
+    """Sweep parameter combinations across a process pool, best equity first."""
+    prices = _as_matrix(prices)
+    configs = [
+        BacktestConfig(fast_period=f, slow_period=s, partial_sell_ratio=r, **config_kwargs)
+        for f, s, r in itertools.product(fast_periods, slow_periods, partial_sell_ratios)
+        if f < s
+    ]
+    if not configs:
+        return []
+
+    max_workers = max_workers or os.cpu_count() or 1
+    if max_workers == 1:
+        _init_worker(prices)
+        results = [_run_worker(config) for config in configs]
+    else:
+        chunksize = max(1, len(configs) // (max_workers * 4))
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(prices,)) as pool:
+            results = list(pool.map(_run_worker, configs, chunksize=chunksize))
+
+    return sorted(results, key=lambda r: r.final_equity, reverse=True)
@@ -0,0 +1,165 @@
+"""
+Config-driven bot startup: settings, symbols and non-interactive secrets.
+
+Heavy modules (numpy, requests, cryptography) are imported only when a bot
+is actually built, and every startup phase is timed.
+"""
+import base64
+import json
+import os
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+DEFAULT_CONFIG = "config/bot_config.json"
+
+# Secret sources, checked in this order before falling back to a prompt
+KEYFILE_ENV = "TRADING_BOT_KEYFILE"          # file holding the derived storage key
+PASSWORD_FD_ENV = "TRADING_BOT_PASSWORD_FD"  # inherited fd to read the password from
+PASSWORD_ENV = "TRADING_BOT_PASSWORD"
+
+class StartupTimer:
+    """Wall-clock milliseconds spent in each startup phase."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.phases: Dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + (time.perf_counter() - started) * 1000.0
+
+    @property
+    def total_ms(self) -> float:
+        return (time.perf_counter() - self.started) * 1000.0
+
+    def report(self) -> str:
+        parts = ", ".join(f"{name} {ms:.1f}" for name, ms in self.phases.items())
+        return f"Cold start {self.total_ms:.1f} ms ({parts})"
+
+def load_config(path: Optional[str] = DEFAULT_CONFIG) -> dict:
+    """Parsed bot config, or an empty config if the file is missing."""
+    if not path or not Path(path).exists():
+        return {}
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+def config_symbols(config: dict) -> Dict[str, str]:
+    """Symbol -> pair address from the config's symbols list."""
+    return {entry['symbol']: entry['pair_address'] for entry in config.get('symbols', [])}
+
+def read_keyfile(path: str) -> bytes:
+    """Derived storage key from a keyfile written by write_keyfile."""
+    key = Path(path).read_bytes().strip()
+    if len(base64.urlsafe_b64decode(key)) != 32:
+        raise ValueError(f"{path} does not hold a 32-byte storage key")
+    return key
+
+def write_keyfile(path: str, key: bytes):
+    """Write a derived storage key readable only by the owner."""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, 'wb') as f:
+        f.write(key + b"\n")
+
+def resolve_secret(config: Optional[dict] = None,
+                   interactive: bool = True) -> Tuple[Optional[str], Optional[bytes]]:
+    """(password, derived key) from the first available source.
+
+    Checks a keyfile (TRADING_BOT_KEYFILE or config ``secrets.keyfile``),
+    then an inherited file descriptor (TRADING_BOT_PASSWORD_FD), then the
+    TRADING_BOT_PASSWORD environment variable, and finally prompts.
+    """
+    secrets = (config or {}).get('secrets', {})
+
+    keyfile = os.environ.get(KEYFILE_ENV) or secrets.get('keyfile')
+    if keyfile:
+        return None, read_keyfile(keyfile)
+
+    password_fd = os.environ.get(PASSWORD_FD_ENV)
+    if password_fd:
+        with os.fdopen(int(password_fd), 'r', closefd=True) as f:
+            return f.readline().rstrip('\r\n'), None
+
+    password = os.environ.get(PASSWORD_ENV)
+    if password is not None:
+        return password, None
+
+    if not interactive:
+        raise RuntimeError(f"No secret source: set {KEYFILE_ENV}, {PASSWORD_FD_ENV} "
+                           f"or {PASSWORD_ENV}")
+    return input("Enter secure storage password: "), None
+
+def derive_key(password: str) -> bytes:
+    """Derive the storage key once so workers and restarts can skip PBKDF2."""
+    from src.security.secure_storage import SecureStorage
+
+    storage = SecureStorage()
+    if not storage.initialize_storage(password):
+        raise RuntimeError("Failed to initialize secure storage")
+    return storage.derived_key
+
+def build_bot(config_path: Optional[str] = DEFAULT_CONFIG, password: Optional[str] = None,
+              key: Optional[bytes] = None, portfolio_manager=None,
+              symbols: Optional[Dict[str, str]] = None, timer: Optional[StartupTimer] = None,
+              shard: Optional[int] = None):
+    """Build a TradingBot from the config file.
+
+    ``symbols`` overrides the config's symbol list (sharded workers pass
+    their shard); ``portfolio_manager`` replaces the locally journaled one.
+    A ``shard`` number gives the worker an event log file of its own.
+    """
+    timer = timer or StartupTimer()
+    with timer.phase("config"):
+        config = load_config(config_path)
+        from src.monitoring.event_log import EVENTS
+        if config.get('event_log'):
+            EVENTS.configure(**config['event_log'])
+        if shard is not None and EVENTS.path:
+            # Processes rotating one file would clobber each other's lines
+            EVENTS.configure(path=f"{EVENTS.path}.shard-{shard}")
+    with timer.phase("secrets"):
+        if password is None and key is None:
+            password, key = resolve_secret(config)
+
+    with timer.phase("imports"):
+        from src.filters.token_filter import FilterSettings
+        from src.market_data.price_feed import build_feed
+        from src.trading.main import TradingBot
+        from src.trading.portfolio_manager import PortfolioManager
+        from src.trading.strategy import build_strategy
+        from src.trading.trade_journal import TradeJournal
+        from src.trading.universe import DiscoverySettings
+        from src.trading.venues import build_venue
+
+    with timer.phase("components"):
+        filter_settings = FilterSettings(**config.get('filter_settings', {}))
+        strategies = [build_strategy(spec) for spec in config.get('strategies', [])] or None
+        venue = build_venue(config['venue']) if config.get('venue') else None
+        discovery_settings = (DiscoverySettings(**config['discovery'])
+                              if config.get('discovery') else None)
+        if portfolio_manager is None:
+            portfolio_manager = PortfolioManager(journal=TradeJournal(),
+                                                 **config.get('portfolio_settings', {}))
+        bot = TradingBot(password=password, key=key, portfolio_manager=portfolio_manager,
+                         filter_settings=filter_settings, strategies=strategies,
+                         venue=venue, discovery_settings=discovery_settings)
+
+    with timer.phase("symbols"):
+        for symbol, pair_address in (symbols if symbols is not None
+                                     else config_symbols(config)).items():
+            bot.add_symbol(symbol, pair_address)
+        if config.get('feed'):
+            # A polling feed follows the live universe, discovered pairs included
+            bot.feed = build_feed(config['feed'], bot.market_provider, bot.address_to_symbol)
+
+    from src.monitoring.event_log import EVENTS, STATUS
+    from src.monitoring.metrics import METRICS
+    for name, ms in timer.phases.items():
+        METRICS.observe(f"startup.{name}", ms * 1000.0)
+    EVENTS.emit(STATUS, 'startup', timer.report())
+    return bot
@@ -0,0 +1,317 @@
+"""
+Incremental indicators shared by every strategy that trades a symbol.
+
+Indicators are named by key tuples such as ``('sma', 20)``, ``('ema', 12)``,
+``('std', 20)``, ``('rsi', 14)`` or ``('zscore', 20)``. An IndicatorGraph
+collects the keys the registered strategies need, plus their
+dependencies, in dependency order. Each symbol then gets one
+IndicatorSeries, which updates every indicator exactly once per close.
+Strategies read the memoized ``value`` and ``prev`` of each node.
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional, Tuple
+
+IndicatorKey = Tuple
+
+class RollingMean:
+    """Compensated running mean over a fixed window.
+
+    Mirrors the add/remove bookkeeping of pandas' rolling mean so streaming
+    and batch SMAs agree bit for bit.
+    """
+
+    __slots__ = ('window', 'nobs', 'total', 'comp_add', 'comp_remove',
+                 'neg_ct', 'same_run', 'last_value')
+
+    def __init__(self, window: int):
+        self.window = window
+        self.nobs = 0
+        self.total = 0.0
+        self.comp_add = 0.0
+        self.comp_remove = 0.0
+        self.neg_ct = 0
+        self.same_run = 0
+        self.last_value = None
+
+    def add(self, value: float):
+        self.nobs += 1
+        y = value - self.comp_add
+        t = self.total + y
+        self.comp_add = t - self.total - y
+        self.total = t
+        if value < 0:
+            self.neg_ct += 1
+        if value == self.last_value:
+            self.same_run += 1
+        else:
+            self.same_run = 1
+        self.last_value = value
+
+    def remove(self, value: float):
+        self.nobs -= 1
+        y = -value - self.comp_remove
+        t = self.total + y
+        self.comp_remove = t - self.total - y
+        self.total = t
+        if value < 0:
+            self.neg_ct -= 1
+
+    def mean(self) -> Optional[float]:
+        if self.nobs < self.window:
+            return None
+        result = self.total / self.nobs
+        if self.same_run >= self.nobs:
+            return self.last_value
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+        return result
+
+class Indicator(ABC):
+    """One incrementally updated indicator node.
+
+    ``value`` is None until the indicator has seen enough closes and
+    ``prev`` holds the value as of the previous close. ``inputs`` are the
+    nodes named by ``dependencies``, already updated for the current close.
+    """
+
+    __slots__ = ('value', 'prev', 'inputs')
+
+    @staticmethod
+    def dependencies(*params) -> Tuple[IndicatorKey, ...]:
+        return ()
+
+    @staticmethod
+    def lookback(*params) -> int:
+        """Closes before the newest that update() reads through series.ago."""
+        return 0
+
+    def __init__(self, inputs: Tuple['Indicator', ...]):
+        self.value = None
+        self.prev = None
+        self.inputs = inputs
+
+    @abstractmethod
+    def update(self, series: 'IndicatorSeries'):
+        """Recompute ``value`` for the close just pushed onto ``series``."""
+
+class Change(Indicator):
+    """Close-to-close change."""
+
+    __slots__ = ()
+
+    @staticmethod
+    def lookback() -> int:
+        return 1
+
+    def update(self, series):
+        if series.count > 1:
+            self.value = series.close - series.ago(1)
+
+class SMA(Indicator):
+    """Simple moving average, equal to pandas' rolling(period).mean()."""
+
+    __slots__ = ('period', '_mean')
+
+    @staticmethod
+    def lookback(period: int) -> int:
+        return period
+
+    def __init__(self, inputs, period: int):
+        super().__init__(inputs)
+        self.period = period
+        self._mean = RollingMean(period)
+
+    def update(self, series):
+        if series.count > self.period:
+            buffer = series._buffer
+            self._mean.remove(buffer[(series._index - 1 - self.period) % len(buffer)])
+        self._mean.add(series.close)
+        self.value = self._mean.mean()
+
+class EMA(Indicator):
+    """Exponential moving average, as pandas' ewm(span=period, adjust=False).
+
+    Values start once ``period`` closes have been seen.
+    """
+
+    __slots__ = ('period', 'alpha', '_ema', '_seen')
+
+    def __init__(self, inputs, period: int):
+        super().__init__(inputs)
+        self.period = period
+        self.alpha = 2.0 / (period + 1)
+        self._ema = None
+        self._seen = 0
+
+    def update(self, series):
+        close = series.close
+        ema = self._ema
+        self._ema = close if ema is None else ema + self.alpha * (close - ema)
+        self._seen += 1
+        if self._seen >= self.period:
+            self.value = self._ema
+
+class RollingStd(Indicator):
+    """Sample standard deviation over a window (ddof=1, as pandas' rolling std)."""
+
+    __slots__ = ('period', '_nobs', '_mean', '_ssqdm')
+
+    @staticmethod
+    def lookback(period: int) -> int:
+        return period
+
+    def __init__(self, inputs, period: int):
+        super().__init__(inputs)
+        self.period = period
+        self._nobs = 0
+        self._mean = 0.0
+        self._ssqdm = 0.0
+
+    def update(self, series):
+        # Welford's update with removal of the close leaving the window
+        if series.count > self.period:
+            buffer = series._buffer
+            leaving = buffer[(series._index - 1 - self.period) % len(buffer)]
+            self._nobs -= 1
+            if self._nobs:
+                delta = leaving - self._mean
+                self._mean -= delta / self._nobs
+                self._ssqdm -= delta * (leaving - self._mean)
+            else:
+                self._mean = self._ssqdm = 0.0
+        close = series.close
+        self._nobs += 1
+        delta = close - self._mean
+        self._mean += delta / self._nobs
+        self._ssqdm += delta * (close - self._mean)
+
+        if self._nobs >= self.period and self._nobs > 1:
+            self.value = (max(self._ssqdm, 0.0) / (self._nobs - 1)) ** 0.5
+
+class RSI(Indicator):
+    """Wilder's relative strength index over close-to-close changes."""
+
+    __slots__ = ('period', 'alpha', '_gain', '_loss', '_seen')
+
+    @staticmethod
+    def dependencies(period: int) -> Tuple[IndicatorKey, ...]:
+        return (('change',),)
+
+    def __init__(self, inputs, period: int):
+        super().__init__(inputs)
+        self.period = period
+        self.alpha = 1.0 / period
+        self._gain = None
+        self._loss = None
+        self._seen = 0
+
+    def update(self, series):
+        change = self.inputs[0].value
+        if change is None:
+            return
+        gain = change if change > 0 else 0.0
+        loss = -change if change < 0 else 0.0
+        if self._gain is None:
+            self._gain, self._loss = gain, loss
+        else:
+            self._gain += self.alpha * (gain - self._gain)
+            self._loss += self.alpha * (loss - self._loss)
+        self._seen += 1
+        if self._seen < self.period:
+            return
+        if self._loss == 0:
+            self.value = 100.0 if self._gain > 0 else 50.0
+        else:
+            self.value = 100.0 - 100.0 / (1.0 + self._gain / self._loss)
+
+class ZScore(Indicator):
+    """Distance of the close from its SMA in rolling standard deviations."""
+
+    __slots__ = ('period',)
+
+    @staticmethod
+    def dependencies(period: int) -> Tuple[IndicatorKey, ...]:
+        return (('sma', period), ('std', period))
+
+    def __init__(self, inputs, period: int):
+        super().__init__(inputs)
+        self.period = period
+
+    def update(self, series):
+        mean, std = self.inputs[0].value, self.inputs[1].value
+        self.value = None if mean is None or not std else (series.close - mean) / std
+
+INDICATORS = {
+    'change': Change,
+    'sma': SMA,
+    'ema': EMA,
+    'std': RollingStd,
+    'rsi': RSI,
+    'zscore': ZScore,
+}
+
+class IndicatorGraph:
+    """Indicator keys required by a set of strategies, in dependency order."""
+
+    def __init__(self):
+        self.order: List[IndicatorKey] = []
+        self.history = 1
+
+    def require(self, key: IndicatorKey) -> IndicatorKey:
+        """Add an indicator and its dependencies; adding one twice is a no-op."""
+        key = tuple(key)
+        if key in self.order:
+            return key
+        indicator = INDICATORS.get(key[0])
+        if indicator is None:
+            raise ValueError(f"Unknown indicator {key[0]!r}")
+        for dependency in indicator.dependencies(*key[1:]):
+            self.require(dependency)
+        self.order.append(key)
+        self.history = max(self.history, indicator.lookback(*key[1:]) + 1)
+        return key
+
+    def series(self) -> 'IndicatorSeries':
+        """Fresh per-symbol state for every required indicator."""
+        return IndicatorSeries(self)
+
+class IndicatorSeries:
+    """Recent closes and memoized indicator values for one symbol.
+
+    Closes live in a ring buffer sized to the longest lookback, so a push
+    costs one update per distinct indicator however many strategies read it.
+    """
+
+    __slots__ = ('_buffer', '_index', 'count', 'close', 'nodes', '_order')
+
+    def __init__(self, graph: IndicatorGraph):
+        self._buffer = [0.0] * graph.history
+        self._index = 0
+        self.count = 0
+        self.close = None
+        self.nodes: Dict[IndicatorKey, Indicator] = {}
+        for key in graph.order:
+            inputs = tuple(self.nodes[dependency]
+                           for dependency in INDICATORS[key[0]].dependencies(*key[1:]))
+            self.nodes[key] = INDICATORS[key[0]](inputs, *key[1:])
+        self._order = list(self.nodes.values())
+
+    def ago(self, bars: int) -> float:
+        """The close ``bars`` pushes before the newest one."""
+        return self._buffer[(self._index - 1 - bars) % len(self._buffer)]
+
+    def push(self, close: float):
+        """Add one close and update every indicator once."""
+        buffer = self._buffer
+        buffer[self._index] = close
+        self._index = (self._index + 1) % len(buffer)
+        self.count += 1
+        self.close = close
+        for node in self._order:
+            node.prev = node.value
+            node.update(self)
+
+    def __getitem__(self, key: IndicatorKey) -> Optional[float]:
+        return self.nodes[key].value
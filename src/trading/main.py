@@ -1,145 +1,330 @@
 """
 Main trading bot class.
 """
-import time
-from datetime import datetime, timedelta
+import os
+from typing import Optional
 from src.market_data.market_provider import MarketDataProvider
+from src.market_data.history_store import HistoryStore
 from src.filters.token_filter import TokenFilter, FilterSettings
 from src.security.secure_storage import SecureStorage
-from src.trading.strategy import SMACrossoverStrategy
+from src.trading.strategy import SMACrossoverStrategy, StrategyEngine
 from src.trading.portfolio_manager import PortfolioManager
+from src.trading.trade_journal import TradeJournal
 from src.trading.transaction_executor import TransactionExecutor
+from src.trading.universe import DiscoverySettings, TokenUniverse, UniverseDiff
 from src.analysis.bubblemaps_api import BubblemapsAPI
+from src.monitoring.event_log import EVENTS, SKIP, STATUS, SYMBOL, UNIVERSE, VALUATION
+from src.monitoring.metrics import METRICS
+
+# Bars replayed into the streaming strategy when a symbol is added
+WARM_START_BARS = 500
+
+# Scrapeable metrics text file, rewritten after every tick when metrics are on
+METRICS_FILE = os.environ.get("TRADING_BOT_METRICS_FILE", "")
 
 class TradingBot:
     """Main trading bot class."""
     
-    def __init__(self):
+    def __init__(self, password: Optional[str] = None,
+                 portfolio_manager: Optional[PortfolioManager] = None,
+                 key: Optional[bytes] = None,
+                 filter_settings: Optional[FilterSettings] = None,
+                 strategies: Optional[list] = None,
+                 venue=None,
+                 discovery_settings: Optional[DiscoverySettings] = None):
         self.is_running = False
-        self.active_symbols = []
-        self.symbol_to_address = {}
+        
+        # Monitored pairs, indexed both ways; discovery adds to them when enabled
+        self.discovery_settings = discovery_settings
+        self.universe = TokenUniverse(
+            max_symbols=discovery_settings.max_symbols if discovery_settings else None,
+            evict_after=discovery_settings.evict_after if discovery_settings else 3
+        )
+        self.symbol_to_address = self.universe.symbols
+        self.address_to_symbol = self.universe.pairs
+        # Called with the universe after discovery changes it
+        self.on_universe_change = None
         
         # Initialize components
         self.secure_storage = SecureStorage()
         self.market_provider = MarketDataProvider()
-        self.token_filter = TokenFilter()
-        self.signal_generator = SMACrossoverStrategy()
-        self.portfolio_manager = PortfolioManager()
+        self.history_store = HistoryStore()
+        self.token_filter = TokenFilter(filter_settings)
+        # Every strategy reads one shared set of indicators per symbol
+        self.signal_generator = StrategyEngine(strategies if strategies is not None
+                                               else [SMACrossoverStrategy()])
+        # A sharded worker passes in the coordinator's shared ledger here;
+        # otherwise the book is journaled locally and recovered on restart
+        self.portfolio_manager = (portfolio_manager if portfolio_manager is not None
+                                  else PortfolioManager(journal=TradeJournal()))
         self.bubblemaps_api = BubblemapsAPI()
+        # Orders go to this venue (e.g. a SimulatedAMMVenue for paper
+        # trading) when set, and it is synced with every market snapshot
+        self.venue = venue
+        self.transaction_executor = None
+        # A PriceFeed (see build_feed) pushes prices to run() in place of polling
+        self.feed = None
         
-        # Initialize secure storage
-        password = input("Enter secure storage password: ")
-        if not self.secure_storage.initialize_storage(password):
+        # Initialize secure storage; a pre-derived key skips PBKDF2
+        if key is not None:
+            initialized = self.secure_storage.initialize_with_key(key)
+        else:
+            if password is None:
+                password = input("Enter secure storage password: ")
+            initialized = self.secure_storage.initialize_storage(password)
+        if not initialized:
             raise RuntimeError("Failed to initialize secure storage")
         
-        print("Trading bot initialized")
+        EVENTS.emit(STATUS, 'bot', "Trading bot initialized")
     
-    def add_symbol(self, symbol: str, pair_address: str):
-        """Add a symbol to monitor."""
-        self.active_symbols.append(symbol)
-        self.symbol_to_address[symbol] = pair_address
-        print(f"Added symbol {symbol}")
+    @property
+    def active_symbols(self):
+        """Monitored symbols, in the order they were added."""
+        return self.symbol_to_address.keys()
     
-    def run_once(self):
-        """Run one iteration of the bot."""
-        # Update prices
-        current_prices = {}
-        for symbol in self.active_symbols:
-            if symbol in self.symbol_to_address:
-                token_data = self.market_provider.fetch_pair_data(
-                    self.symbol_to_address[symbol]
-                )
-                if token_data:
-                    current_prices[symbol] = token_data.price_usd
+    def add_symbol(self, symbol: str, pair_address: str, discovered: bool = False) -> bool:
+        """Add a symbol to monitor; False if the symbol or pair is already monitored."""
+        if not self.universe.add(symbol, pair_address, discovered):
+            EVENTS.emit(SKIP, symbol, f"symbol or pair {pair_address} already monitored")
+            return False
         
-        # Check profit-taking opportunities
-        profit_taking_orders = self.portfolio_manager.check_profit_taking_opportunities(
-            current_prices
+        # Resume the strategy from stored history
+        closes = self.history_store.pair(pair_address).tail(WARM_START_BARS)['close']
+        if len(closes):
+            self.signal_generator.warm_start(symbol, closes)
+        EVENTS.emit(SYMBOL, symbol, pair_address, 'added')
+        return True
+    
+    def remove_symbol(self, symbol: str) -> bool:
+        """Stop monitoring a symbol and drop its strategy state."""
+        pair_address = self.universe.remove(symbol)
+        if pair_address is None:
+            return False
+        self.signal_generator.reset(symbol)
+        EVENTS.emit(SYMBOL, symbol, pair_address, 'removed')
+        return True
+    
+    def screen_universe(self) -> UniverseDiff:
+        """Fetch the pair listing and screen its new and changed pairs."""
+        settings = self.discovery_settings or DiscoverySettings()
+        listing = self.market_provider.fetch_listing(settings.listing_url)
+        return self.universe.diff(
+            listing, self.token_filter,
+            self.bubblemaps_api.check_many if settings.check_risk else None
         )
+    
+    def apply_universe(self, diff: UniverseDiff):
+        """Follow newly discovered pairs and drop ones that stopped passing.
         
-        # Initialize transaction executor
+        A dropped symbol with an open position stays monitored so it can
+        still be sold.
+        """
+        for symbol, _ in diff.removed:
+            if self.portfolio_manager.get_position(symbol) is None:
+                self.remove_symbol(symbol)
+        for symbol, pair_address in diff.added:
+            self.add_symbol(symbol, pair_address, discovered=True)
+        METRICS.count("universe.screened", diff.screened)
+        if diff.added or diff.removed:
+            EVENTS.emit(UNIVERSE, len(diff.added), len(diff.removed), diff.screened,
+                        diff.unchanged, len(self.universe))
+            if self.on_universe_change is not None:
+                self.on_universe_change(self.universe)
+    
+    def discover(self) -> UniverseDiff:
+        """Run one discovery refresh."""
+        diff = self.screen_universe()
+        self.apply_universe(diff)
+        return diff
+    
+    def _get_transaction_executor(self) -> TransactionExecutor:
+        """Long-lived executor, rebuilt only if the wallet secrets change."""
         wallet_address = self.secure_storage.retrieve_secret("wallet_address")
         private_key = self.secure_storage.retrieve_secret("private_key")
-        transaction_executor = TransactionExecutor(private_key, wallet_address)
-        
-        # Execute profit-taking sells
-        for order in profit_taking_orders:
-            result = transaction_executor.execute_sell(
-                self.symbol_to_address[order['symbol']], 
-                order['quantity']
-            )
-            if result.success:
-                self.portfolio_manager.update_position(
-                    order['symbol'],
-                    order['quantity'],
-                    order['price'],
-                    'sell'
-                )
+        executor = self.transaction_executor
+        if (executor is None or executor.wallet_address != wallet_address
+                or executor.private_key != private_key):
+            if executor is not None:
+                executor.close()
+            executor = self.transaction_executor = TransactionExecutor(private_key, wallet_address,
+                                                                       venue=self.venue)
+        return executor
+    
+    def poll_prices(self, max_age: float = None):
+        """Take one market snapshot; returns (snapshot by pair address, prices by symbol)."""
+        # Copied first: discovery may change the universe from another thread
+        symbols = list(self.symbol_to_address.items())
+        snapshot = self.market_provider.get_snapshot(
+            (pair_address for _, pair_address in symbols),
+            max_age=max_age
+        )
+        if self.venue is not None:
+            self.venue.sync(snapshot.values())
+        current_prices = {}
+        for symbol, pair_address in symbols:
+            token_data = snapshot.get(pair_address)
+            if token_data:
+                current_prices[symbol] = token_data.price_usd
+        return snapshot, current_prices
+    
+    def record_bar(self, snapshot: dict):
+        """Append this snapshot to the history store (buffered; safe off the loop)."""
+        self.history_store.record_snapshot(snapshot)
+    
+    def buy_candidates(self, snapshot: dict, current_prices: dict) -> list:
+        """Return (symbol, signal, token_address) for buy signals."""
+        # Screen the whole snapshot once; only tokens that pass may be bought
+        snapshot_tokens = list(snapshot.values())
+        filter_result = self.token_filter.filter_batch(snapshot_tokens)
+        tradable = {
+            token.pair_address
+            for token, passed in zip(snapshot_tokens, filter_result.mask) if passed
+        }
         
-        # Generate signals and execute trades
+        candidates = []
         for symbol in self.active_symbols:
             if symbol not in current_prices:
                 continue
             
-            # Get token address from pair data
-            pair_data = self.market_provider.fetch_pair_data(self.symbol_to_address[symbol])
+            # Get token address from this tick's snapshot
+            pair_data = snapshot.get(self.symbol_to_address[symbol])
             if not pair_data:
                 continue
             
-            token_address = pair_data.base_token_address
+            token_address = pair_data.base_token_address or pair_data.pair_address
             
-            # Check rug pull risk
-            risk = self.bubblemaps_api.check_rug_pull(token_address)
+            # Generate signal (streaming, so every tick's price is recorded)
+            signal = self.signal_generator.update(symbol, current_prices[symbol])
+            if (signal.signal_type == 'buy' and signal.confidence > 0.3
+                    and pair_data.pair_address in tradable):
+                candidates.append((symbol, signal, token_address))
+        return candidates
+    
+    def screen_risk(self, candidates: list) -> list:
+        """Drop buy candidates whose token has a critical rug pull risk."""
+        if not candidates:
+            return []
+        risks = self.bubblemaps_api.check_many(address for _, _, address in candidates)
+        approved = []
+        for symbol, signal, token_address in candidates:
+            risk = risks.get(token_address)
             if risk and risk.risk_level == "critical":
-                print(f"Skipping {symbol} due to critical risk level")
+                EVENTS.emit(SKIP, symbol, "critical rug pull risk")
                 continue
+            approved.append((symbol, signal))
+        return approved
+    
+    def submit_orders(self, sell_orders: list, buy_orders: list) -> list:
+        """Send sells and buys concurrently; returns (kind, order, future) in apply order."""
+        transaction_executor = self._get_transaction_executor()
+        submitted = [
+            ('sell', order, transaction_executor.submit_sell(
+                self.symbol_to_address[order['symbol']],
+                order['quantity']
+            ))
+            for order in sell_orders
+        ]
+        for symbol, signal in buy_orders:
+            # In a real implementation, calculate position size based on risk
+            submitted.append(('buy', (symbol, signal), transaction_executor.submit_buy(
+                self.symbol_to_address[symbol],
+                0.1  # Amount in SOL
+            )))
+        return submitted
+    
+    def apply_fill(self, kind: str, order, result):
+        """Book an executed order in the portfolio, at the venue's fill when reported."""
+        if not result.success:
+            return
+        filled = result.filled_quantity is not None
+        if kind == 'sell':
+            self.portfolio_manager.update_position(
+                order['symbol'],
+                result.filled_quantity if filled else order['quantity'],
+                result.fill_price if filled else order['price'],
+                'sell'
+            )
+        else:
+            symbol, signal = order
+            self.portfolio_manager.update_position(
+                symbol,
+                result.filled_quantity if filled else 100,  # Quantity (this would be calculated)
+                result.fill_price if filled else signal.entry_price,
+                'buy'
+            )
+    
+    def report(self, current_prices: dict):
+        """Print portfolio value, plus a per-tick metrics line when enabled."""
+        valuation = self.portfolio_manager.mark_to_market(current_prices)
+        EVENTS.emit(VALUATION, valuation.equity, valuation.realized_pnl,
+                    valuation.unrealized_pnl, valuation.drawdown)
+        if METRICS.enabled:
+            EVENTS.emit(STATUS, 'metrics', METRICS.tick_summary())
+            if METRICS_FILE:
+                METRICS.write_textfile(METRICS_FILE)
+    
+    def run_once(self):
+        """Run one iteration of the bot."""
+        with METRICS.timer("bot.tick"):
+            with METRICS.timer("bot.poll_prices"):
+                snapshot, current_prices = self.poll_prices()
             
-            # Generate signal
-            signal = self.signal_generator.generate_signal(
-                None,  # In a real implementation, you'd fetch historical data
-                current_prices[symbol]
+            # Check profit-taking opportunities
+            profit_taking_orders = self.portfolio_manager.check_profit_taking_opportunities(
+                current_prices
             )
             
-            # Execute trades based on signals
-            if signal.signal_type == 'buy' and signal.confidence > 0.3:
-                # In a real implementation, calculate position size based on risk
-                result = transaction_executor.execute_buy(
-                    self.symbol_to_address[symbol],
-                    0.1  # Amount in SOL
-                )
-                if result.success:
-                    self.portfolio_manager.update_position(
-                        symbol,
-                        100,  # Quantity (this would be calculated)
-                        signal.entry_price,
-                        'buy'
-                    )
-        
-        # Print portfolio value
-        total_value = self.portfolio_manager.cash
-        for symbol, position in self.portfolio_manager.positions.items():
-            if symbol in current_prices:
-                total_value += position.quantity * current_prices[symbol]
+            # Generate signals, then execute sells and buys together
+            with METRICS.timer("bot.signals"):
+                self.record_bar(snapshot)
+                candidates = self.buy_candidates(snapshot, current_prices)
+            with METRICS.timer("bot.risk"):
+                buy_orders = self.screen_risk(candidates)
+            with METRICS.timer("bot.execution"):
+                for kind, order, future in self.submit_orders(profit_taking_orders, buy_orders):
+                    self.apply_fill(kind, order, future.result())
         
-        print(f"Portfolio value: ${total_value:.2f}")
+        self.report(current_prices)
     
-    def run(self, duration_hours: float = 24, check_interval_minutes: int = 5):
-        """Run the bot continuously."""
-        self.is_running = True
-        end_time = datetime.now() + timedelta(hours=duration_hours)
+    def run(self, duration_hours: float = 24, check_interval_minutes: int = 5,
+            price_interval_seconds: float = 5.0, risk_interval_minutes: float = 10.0,
+            feed=None):
+        """Run the bot continuously on the stage scheduler.
+        
+        Prices are polled every price_interval_seconds and checked for 2x
+        profit-taking on every poll; strategy bars are taken every
+        check_interval_minutes. With a ``feed`` (or ``self.feed``) prices
+        are pushed by it instead of polled.
+        """
+        import asyncio
+        from src.trading.scheduler import BotScheduler
         
-        print(f"Starting bot for {duration_hours} hours...")
+        self.is_running = True
+        EVENTS.emit(STATUS, 'bot', f"Starting bot for {duration_hours} hours...")
+        self.bubblemaps_api.start_background_refresh()
         
-        while self.is_running and datetime.now() < end_time:
-            try:
-                self.run_once()
-                time.sleep(check_interval_minutes * 60)
-            except KeyboardInterrupt:
-                print("Bot stopped by user")
-                self.is_running = False
-            except Exception as e:
-                print(f"Error in bot loop: {e}")
-                time.sleep(60)
+        scheduler = BotScheduler(
+            self,
+            price_interval=price_interval_seconds,
+            bar_interval=check_interval_minutes * 60,
+            risk_interval=risk_interval_minutes * 60,
+            feed=feed if feed is not None else self.feed,
+            discovery_interval=(self.discovery_settings.interval_minutes * 60
+                                if self.discovery_settings else None)
+        )
+        try:
+            asyncio.run(scheduler.run(duration_hours * 3600))
+        except KeyboardInterrupt:
+            EVENTS.emit(STATUS, 'bot', "Bot stopped by user")
         
         self.is_running = False
-        print("Bot stopped")
+        self.bubblemaps_api.stop_background_refresh()
+        if self.transaction_executor is not None:
+            self.transaction_executor.close()
+            self.transaction_executor = None
+        journal = getattr(self.portfolio_manager, 'journal', None)
+        if journal is not None:
+            journal.close()
+        self.history_store.flush()
+        EVENTS.emit(STATUS, 'bot', "Bot stopped")
+        EVENTS.flush()
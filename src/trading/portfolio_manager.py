@@ -1,97 +1,304 @@
 """
 Portfolio manager with profit-taking rules.
 """
-from dataclasses import dataclass
+from collections import deque
 from datetime import datetime
-from typing import Optional
+from itertools import repeat
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from src.monitoring.event_log import EVENTS, FILL, POSITION, SKIP, STATUS, TRIGGER, EventLog
+from src.monitoring.metrics import METRICS
+from src.trading import trade_journal
+from src.trading.trade_journal import TradeJournal
+from src.trading.valuation import ValuationLedger, ValuationSnapshot
 
-@dataclass
 class Position:
     """Track a position in a token."""
-    symbol: str
-    quantity: float
-    entry_price: float
-    entry_time: datetime
-    partial_sell_price: float  # 2x price for partial sell
-    partial_sell_executed: bool = False
-    status: str = "open"
+
+    __slots__ = ('symbol', 'quantity', 'entry_price', 'entry_time',
+                 'partial_sell_price', 'partial_sell_executed', 'status')
+
+    def __init__(self, symbol: str, quantity: float, entry_price: float, entry_time: datetime,
+                 partial_sell_price: float, partial_sell_executed: bool = False,
+                 status: str = "open"):
+        self.symbol = symbol
+        self.quantity = quantity
+        self.entry_price = entry_price
+        self.entry_time = entry_time
+        self.partial_sell_price = partial_sell_price  # 2x price for partial sell
+        self.partial_sell_executed = partial_sell_executed
+        self.status = status
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"Position({fields})"
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, Position):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
 
 class PortfolioManager:
-    """Manages portfolio positions and risk."""
-    
-    def __init__(self, initial_balance: float = 1000.0, partial_sell_ratio: float = 0.5):
+    """Manages portfolio positions and risk.
+
+    ``positions`` holds open positions only. Closed positions move to a
+    bounded ``closed_positions`` archive, and positions whose 2x trigger is
+    still armed are kept in struct-of-arrays slots (symbol, trigger price),
+    so a profit-taking check is one vectorized comparison and Python work
+    only for the triggers that fire.
+
+    With a ``journal``, every fill and 2x trigger is appended to it and the
+    book is recovered from it on construction.
+
+    ``valuation`` follows every fill and price mark incrementally, giving
+    equity, realized and unrealized P&L and drawdown without scanning the
+    book.
+    """
+
+    def __init__(self, initial_balance: float = 1000.0, partial_sell_ratio: float = 0.5,
+                 max_closed_history: int = 1000, journal: Optional[TradeJournal] = None,
+                 events: Optional[EventLog] = None):
+        self.events = events or EVENTS
         self.initial_balance = initial_balance
         self.cash = initial_balance
-        self.positions = {}
+        self.positions: Dict[str, Position] = {}
+        self.closed_positions = deque(maxlen=max_closed_history)
         self.partial_sell_ratio = partial_sell_ratio
-    
+        self._pending_triggers: Dict[str, Position] = {}
+        # Armed triggers by slot; free slots have an infinite trigger price
+        self._trigger_slots: Dict[str, int] = {}
+        self._trigger_symbols: List[Optional[str]] = []
+        self._trigger_prices = np.full(16, np.inf)
+        self._free_slots: List[int] = []
+        self.valuation = ValuationLedger(initial_balance)
+        self.journal = journal
+        if journal is not None:
+            self._recover()
+
     def update_position(self, symbol: str, quantity: float, price: float, order_type: str) -> bool:
         """Update portfolio after trade execution."""
         cost = abs(quantity) * price
-        
+
         if order_type == 'buy':
             if self.cash >= cost:
-                self.cash -= cost
-                
-                # Create new position
-                position = Position(
-                    symbol=symbol,
-                    quantity=quantity,
-                    entry_price=price,
-                    entry_time=datetime.now(),
-                    partial_sell_price=price * 2.0  # 2x price for partial sell
-                )
-                self.positions[symbol] = position
-                print(f"Bought {quantity} {symbol} at ${price:.6f}. Cash: ${self.cash:.2f}")
+                now = datetime.now()
+                self._apply_buy(symbol, quantity, price, now)
+                self._journal(trade_journal.BUY, symbol, quantity, price, now.timestamp())
+                METRICS.count("portfolio.fills")
+                self.events.emit(FILL, symbol, 'buy', quantity, price, self.cash)
                 return True
             else:
-                print(f"Insufficient funds to buy {quantity} {symbol}")
+                self.events.emit(SKIP, symbol, f"insufficient funds to buy {quantity}")
                 return False
-        
+
         elif order_type == 'sell':
             if symbol in self.positions:
-                position = self.positions[symbol]
-                actual_quantity = min(quantity, position.quantity)
-                self.cash += actual_quantity * price
-                position.quantity -= actual_quantity
-                
-                if position.quantity == 0:
-                    position.status = "closed"
-                    print(f"Closed position in {symbol}")
+                actual_quantity, closed = self._apply_sell(symbol, quantity, price)
+                self._journal(trade_journal.SELL, symbol, quantity, price)
+
+                self.events.emit(FILL, symbol, 'sell', actual_quantity, price, self.cash)
+                if closed:
+                    METRICS.count("portfolio.closed")
+                    self.events.emit(POSITION, symbol, 'closed', 0.0)
                 else:
-                    print(f"Partially sold {actual_quantity} {symbol}")
-                
-                print(f"Sold {actual_quantity} {symbol} at ${price:.6f}. Cash: ${self.cash:.2f}")
+                    self.events.emit(POSITION, symbol, 'reduced', self.positions[symbol].quantity)
                 return True
             else:
-                print(f"No position to sell for {symbol}")
+                self.events.emit(SKIP, symbol, "no position to sell")
                 return False
-        
+
         return False
-    
+
+    def _apply_buy(self, symbol: str, quantity: float, price: float, entry_time: datetime):
+        self.cash -= abs(quantity) * price
+        self.valuation.buy(symbol, quantity, price)
+
+        position = self.positions.get(symbol)
+        if position is None:
+            # Create new position
+            position = Position(
+                symbol=symbol,
+                quantity=quantity,
+                entry_price=price,
+                entry_time=entry_time,
+                partial_sell_price=price * 2.0  # 2x price for partial sell
+            )
+            self.positions[symbol] = position
+        else:
+            # Add to the open position at the blended entry price
+            total_quantity = position.quantity + quantity
+            position.entry_price = (
+                position.entry_price * position.quantity + price * quantity
+            ) / total_quantity
+            position.quantity = total_quantity
+            position.partial_sell_price = position.entry_price * 2.0
+            position.partial_sell_executed = False
+        self._arm(position)
+
+    def _apply_sell(self, symbol: str, quantity: float, price: float):
+        """Sell from an open position; returns (quantity sold, position closed)."""
+        position = self.positions[symbol]
+        actual_quantity = min(quantity, position.quantity)
+        self.cash += actual_quantity * price
+        position.quantity -= actual_quantity
+        self.valuation.sell(symbol, actual_quantity, price)
+
+        if position.quantity == 0:
+            position.status = "closed"
+            self._archive(position)
+            return actual_quantity, True
+        return actual_quantity, False
+
+    def _apply_trigger(self, symbol: str):
+        position = self._pending_triggers[symbol]
+        self._disarm(symbol)
+        position.partial_sell_executed = True
+
+    def _arm(self, position: Position):
+        """Index a position's 2x trigger, or update its price if already armed."""
+        symbol = position.symbol
+        self._pending_triggers[symbol] = position
+        slot = self._trigger_slots.get(symbol)
+        if slot is None:
+            if self._free_slots:
+                slot = self._free_slots.pop()
+                self._trigger_symbols[slot] = symbol
+            else:
+                slot = len(self._trigger_symbols)
+                self._trigger_symbols.append(symbol)
+                if slot == len(self._trigger_prices):
+                    grown = np.full(2 * slot, np.inf)
+                    grown[:slot] = self._trigger_prices
+                    self._trigger_prices = grown
+            self._trigger_slots[symbol] = slot
+        self._trigger_prices[slot] = position.partial_sell_price
+
+    def _disarm(self, symbol: str):
+        if self._pending_triggers.pop(symbol, None) is None:
+            return
+        slot = self._trigger_slots.pop(symbol)
+        self._trigger_symbols[slot] = None
+        self._trigger_prices[slot] = np.inf
+        self._free_slots.append(slot)
+
+    def _journal(self, kind: str, symbol: str, quantity: float, price: float,
+                 timestamp: Optional[float] = None):
+        journal = self.journal
+        if journal is None:
+            return
+        journal.record(kind, symbol, quantity, price, timestamp)
+        if journal.snapshot_due:
+            journal.snapshot(self.snapshot_state())
+
+    def snapshot_state(self) -> dict:
+        """Cash and positions as a JSON-serializable dict."""
+        def encode(position: Position) -> list:
+            return [position.symbol, position.quantity, position.entry_price,
+                    position.entry_time.timestamp(), position.partial_sell_price,
+                    position.partial_sell_executed, position.status]
+        return {
+            'cash': self.cash,
+            'positions': [encode(p) for p in self.positions.values()],
+            'closed_positions': [encode(p) for p in self.closed_positions],
+            'valuation': self.valuation.state(),
+        }
+
+    def _recover(self):
+        """Rebuild the book from the journal's snapshot and tail."""
+        snapshot, records = self.journal.load()
+        if snapshot is not None:
+            def decode(fields: list) -> Position:
+                symbol, quantity, entry_price, entry_time, sell_price, executed, status = fields
+                return Position(symbol, quantity, entry_price, datetime.fromtimestamp(entry_time),
+                                sell_price, executed, status)
+            self.cash = snapshot['cash']
+            for fields in snapshot['positions']:
+                position = self.positions[fields[0]] = decode(fields)
+                if not position.partial_sell_executed:
+                    self._arm(position)
+            self.closed_positions.extend(decode(fields) for fields in snapshot['closed_positions'])
+            self.valuation.reset(self.cash, self.positions.values(), snapshot.get('valuation'))
+
+        for _, kind, symbol, quantity, price, timestamp in records:
+            if kind == trade_journal.BUY:
+                self._apply_buy(symbol, quantity, price, datetime.fromtimestamp(timestamp))
+            elif kind == trade_journal.SELL:
+                self._apply_sell(symbol, quantity, price)
+            elif kind == trade_journal.TRIGGER:
+                self._apply_trigger(symbol)
+        if snapshot is not None or records:
+            self.events.emit(STATUS, 'portfolio',
+                             f"Recovered {len(self.positions)} open positions from the "
+                             f"trade journal. Cash: ${self.cash:.2f}")
+
+    def _archive(self, position: Position):
+        """Move a closed position out of the open and trigger indexes."""
+        del self.positions[position.symbol]
+        self._disarm(position.symbol)
+        self.closed_positions.append(position)
+
+    def get_position(self, symbol: str) -> Optional[Position]:
+        """Open position for a symbol, if any."""
+        return self.positions.get(symbol)
+
+    @METRICS.timed("portfolio.profit_check")
     def check_profit_taking_opportunities(self, current_prices: dict) -> list:
         """Check for profit-taking opportunities at 2x price."""
         sell_orders = []
-        
-        for symbol, position in self.positions.items():
-            if position.status != "open":
-                continue
-            
-            if symbol in current_prices:
-                current_price = current_prices[symbol]
-                
-                # Check if we should execute partial sell at 2x price
-                if (not position.partial_sell_executed and 
-                    current_price >= position.partial_sell_price):
-                    
-                    quantity_to_sell = position.quantity * self.partial_sell_ratio
-                    if quantity_to_sell > 0:
-                        sell_orders.append({
-                            'symbol': symbol,
-                            'quantity': quantity_to_sell,
-                            'price': current_price
-                        })
-                        position.partial_sell_executed = True
-                        print(f"Triggered partial sell at 2x for {symbol}")
-        
+        pending = self._pending_triggers
+        if not pending or not current_prices:
+            return sell_orders
+
+        # Line this tick's prices up with the trigger slots, gathering from
+        # whichever side is smaller; unpriced slots stay NaN and never fire
+        symbols = self._trigger_symbols
+        count = len(symbols)
+        if len(pending) <= len(current_prices):
+            marks = np.fromiter(map(current_prices.get, symbols, repeat(np.nan)),
+                                dtype=np.float64, count=count)
+        else:
+            marks = np.full(count, np.nan)
+            slots = np.fromiter(map(self._trigger_slots.get, current_prices, repeat(-1)),
+                                dtype=np.intp, count=len(current_prices))
+            priced = slots >= 0
+            marks[slots[priced]] = np.fromiter(current_prices.values(), dtype=np.float64,
+                                               count=len(current_prices))[priced]
+        with np.errstate(invalid='ignore'):
+            fired = np.flatnonzero(marks >= self._trigger_prices[:count])
+
+        for slot in fired.tolist():
+            symbol = symbols[slot]
+            position = pending[symbol]
+            current_price = current_prices[symbol]
+
+            # Partial sell at 2x price
+            quantity_to_sell = position.quantity * self.partial_sell_ratio
+            if quantity_to_sell > 0:
+                sell_orders.append({
+                    'symbol': symbol,
+                    'quantity': quantity_to_sell,
+                    'price': current_price
+                })
+                self._apply_trigger(symbol)
+                self._journal(trade_journal.TRIGGER, symbol, quantity_to_sell, current_price)
+                METRICS.count("portfolio.triggers")
+                self.events.emit(TRIGGER, symbol, 'partial sell at 2x', current_price)
+            else:
+                self._disarm(symbol)
+
         return sell_orders
+
+    def mark_to_market(self, current_prices: dict) -> ValuationSnapshot:
+        """Mark open positions at the given prices and return the valuation."""
+        self.valuation.mark_many(current_prices)
+        return self.valuation.snapshot()
+
+    def total_value(self, current_prices: dict) -> float:
+        """Cash plus open positions marked at the given prices.
+
+        Positions without a price keep their last mark.
+        """
+        self.valuation.mark_many(current_prices)
+        return self.valuation.equity
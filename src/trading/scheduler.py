@@ -0,0 +1,217 @@
+"""
+Asyncio stage scheduler for the trading bot.
+"""
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from src.monitoring.event_log import EVENTS, FAILURE
+
+class BotScheduler:
+    """Runs the bot as independently timed stages joined by bounded queues.
+
+    - price stage: polls market data every ``price_interval`` seconds
+    - signal stage: reacts to each new snapshot; checks 2x profit-taking on
+      every snapshot and feeds the strategy once per ``bar_interval``;
+      the portfolio is valued (and metrics reported) on every snapshot
+    - risk stage: pre-scores tokens every ``risk_interval`` seconds so the
+      signal stage finds them cached
+    - execution stage: submits order batches and books the fills
+    - discovery stage (with ``discovery_interval``): screens the pair
+      listing in a worker thread, then applies the diff on the loop so
+      other stages never see the universe mid-change
+
+    When a ``feed`` (see src.market_data.price_feed) is given it replaces
+    price polling: every pushed update is written into the snapshot in
+    place and only the pairs changed since the signal stage last ran are
+    handed to it, so a push costs O(1) however large the universe. Bars
+    still read the whole snapshot.
+
+    Timed stages run on fixed deadlines measured from the start, so a slow
+    tick does not push later ticks back. A stage that raises logs the error
+    and waits for its next deadline.
+    """
+
+    def __init__(self, bot, price_interval: float = 5.0, bar_interval: float = 300.0,
+                 risk_interval: float = 600.0, queue_size: int = 4, feed=None,
+                 discovery_interval: Optional[float] = None):
+        self.bot = bot
+        self.feed = feed
+        self.price_interval = price_interval
+        self.bar_interval = bar_interval
+        self.risk_interval = risk_interval
+        self.discovery_interval = discovery_interval
+        self.queue_size = queue_size
+        self.dropped_snapshots = 0
+        self.missed_deadlines = 0
+
+        self._snapshots: Optional[asyncio.Queue] = None
+        self._orders: Optional[asyncio.Queue] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._latest_snapshot = {}
+        self._next_bar = 0.0
+        # Feed updates not yet seen by the signal stage, by pair address;
+        # one None in the snapshot queue stands for all of them
+        self._dirty = {}
+        self._dirty_queued = False
+
+    def stop(self):
+        """Ask all stages to finish."""
+        if self._stopping is not None:
+            self._stopping.set()
+
+    async def _sleep_until(self, deadline: float) -> bool:
+        """Sleep until the loop-clock deadline; False if stopping."""
+        delay = deadline - asyncio.get_running_loop().time()
+        try:
+            await asyncio.wait_for(self._stopping.wait(), timeout=max(delay, 0))
+            return False
+        except asyncio.TimeoutError:
+            return True
+
+    async def _every(self, name: str, interval: float, step: Callable[[], Awaitable[None]]):
+        """Run step on a fixed grid of deadlines."""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while not self._stopping.is_set():
+            try:
+                await step()
+            except Exception as e:
+                EVENTS.emit(FAILURE, f"{name} stage", str(e))
+
+            deadline += interval
+            now = loop.time()
+            if deadline < now:
+                # Overran: skip the missed slots but stay on the grid
+                missed = int((now - deadline) // interval) + 1
+                self.missed_deadlines += missed
+                deadline += missed * interval
+            if not await self._sleep_until(deadline):
+                break
+
+    async def _poll_prices(self):
+        snapshot, current_prices = await asyncio.to_thread(self.bot.poll_prices, self.price_interval)
+        self._latest_snapshot = snapshot
+
+        # Consumers only care about the newest prices: drop the oldest when full
+        if self._snapshots.full():
+            self._snapshots.get_nowait()
+            self.dropped_snapshots += 1
+        self._snapshots.put_nowait((snapshot, current_prices))
+
+    async def _feed_stage(self):
+        async for token_data in self.feed:
+            if token_data.pair_address not in self.bot.address_to_symbol:
+                continue
+
+            self.bot.market_provider.ingest([token_data])
+            if self.bot.venue is not None:
+                self.bot.venue.sync((token_data,))
+            self._latest_snapshot[token_data.pair_address] = token_data
+            self._dirty[token_data.pair_address] = token_data
+            if not self._dirty_queued:
+                self._dirty_queued = True
+                self._snapshots.put_nowait(None)
+
+    def _take_dirty(self):
+        """Feed updates since the last call, as (snapshot, prices by symbol)."""
+        dirty, self._dirty = self._dirty, {}
+        self._dirty_queued = False
+        return dirty, self._prices(dirty)
+
+    def _prices(self, snapshot: dict) -> dict:
+        address_to_symbol = self.bot.address_to_symbol
+        return {
+            address_to_symbol[address]: token_data.price_usd
+            for address, token_data in snapshot.items() if address in address_to_symbol
+        }
+
+    async def _refresh_risk(self):
+        addresses = [
+            token.base_token_address or token.pair_address
+            for token in self._latest_snapshot.values()
+        ]
+        if addresses:
+            await asyncio.to_thread(self.bot.bubblemaps_api.check_many, addresses)
+
+    async def _discover(self):
+        diff = await asyncio.to_thread(self.bot.screen_universe)
+        self.bot.apply_universe(diff)
+
+    async def _signal_stage(self):
+        loop = asyncio.get_running_loop()
+        while not self._stopping.is_set():
+            item = await self._snapshots.get()
+            snapshot, current_prices = item if item is not None else self._take_dirty()
+            try:
+                sell_orders = self.bot.portfolio_manager.check_profit_taking_opportunities(
+                    current_prices
+                )
+                buy_orders = []
+                if loop.time() >= self._next_bar:
+                    self._next_bar += self.bar_interval
+                    if self._next_bar < loop.time():
+                        self._next_bar = loop.time() + self.bar_interval
+                    if item is None:
+                        # Bars cover every pair, not just this push's
+                        snapshot = dict(self._latest_snapshot)
+                        current_prices = self._prices(snapshot)
+                    # Bars are written off the loop while signals are computed
+                    recording = loop.run_in_executor(None, self.bot.record_bar, snapshot)
+                    try:
+                        candidates = self.bot.buy_candidates(snapshot, current_prices)
+                    finally:
+                        await recording
+                    buy_orders = await asyncio.to_thread(self.bot.screen_risk, candidates)
+
+                if sell_orders or buy_orders:
+                    # Waits here when execution is backed up
+                    await self._orders.put((sell_orders, buy_orders))
+                # Every snapshot is valued, whether or not it produced orders
+                self.bot.report(current_prices)
+            except Exception as e:
+                EVENTS.emit(FAILURE, "signal stage", str(e))
+
+    async def _execution_stage(self):
+        while not self._stopping.is_set():
+            sell_orders, buy_orders = await self._orders.get()
+            try:
+                submitted = self.bot.submit_orders(sell_orders, buy_orders)
+                for kind, order, future in submitted:
+                    result = await asyncio.wrap_future(future)
+                    self.bot.apply_fill(kind, order, result)
+            except Exception as e:
+                EVENTS.emit(FAILURE, "execution stage", str(e))
+
+    async def run(self, duration_seconds: Optional[float] = None):
+        """Run all stages until stopped or duration_seconds have passed."""
+        loop = asyncio.get_running_loop()
+        self._snapshots = asyncio.Queue(maxsize=self.queue_size)
+        self._orders = asyncio.Queue(maxsize=self.queue_size)
+        self._stopping = asyncio.Event()
+        self._next_bar = loop.time()
+
+        if self.feed is not None:
+            price_stage = self._feed_stage()
+        else:
+            price_stage = self._every("price", self.price_interval, self._poll_prices)
+        tasks = [
+            asyncio.create_task(price_stage),
+            asyncio.create_task(self._every("risk", self.risk_interval, self._refresh_risk)),
+            asyncio.create_task(self._signal_stage()),
+            asyncio.create_task(self._execution_stage()),
+        ]
+        if self.discovery_interval is not None:
+            tasks.append(asyncio.create_task(
+                self._every("discovery", self.discovery_interval, self._discover)))
+        try:
+            if duration_seconds is None:
+                await self._stopping.wait()
+            else:
+                await self._sleep_until(loop.time() + duration_seconds)
+        finally:
+            self._stopping.set()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.feed is not None:
+                await self.feed.close()
@@ -1,9 +1,20 @@
 """
 Trading strategy implementation.
 """
-import pandas as pd
+import numpy as np
+from abc import ABC, abstractmethod
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from src.monitoring.metrics import METRICS
+from src.trading.indicators import IndicatorGraph, IndicatorKey, IndicatorSeries, RollingMean
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Signal codes used by array-backed batches
+HOLD, BUY, SELL = 0, 1, 2
+SIGNAL_TYPES = ('hold', 'buy', 'sell')
 
 @dataclass
 class Signal:
@@ -14,54 +25,454 @@ class Signal:
     stop_loss: float
     take_profit: float
 
-class SMACrossoverStrategy:
+@dataclass
+class SignalBatch:
+    """Array-backed signals for many symbols, one row per symbol."""
+    signal_codes: np.ndarray  # int8 HOLD / BUY / SELL
+    confidence: np.ndarray
+    entry_price: np.ndarray
+    stop_loss: np.ndarray
+    take_profit: np.ndarray
+    fast_sma: np.ndarray
+    slow_sma: np.ndarray
+
+    def __len__(self) -> int:
+        return len(self.signal_codes)
+
+    def __getitem__(self, index: int) -> Signal:
+        code = int(self.signal_codes[index])
+        if code == HOLD:
+            return Signal('hold', 0.0, None, None, None)
+        return Signal(
+            signal_type=SIGNAL_TYPES[code],
+            confidence=float(self.confidence[index]),
+            entry_price=float(self.entry_price[index]),
+            stop_loss=float(self.stop_loss[index]),
+            take_profit=float(self.take_profit[index])
+        )
+
+    @property
+    def signal_types(self) -> np.ndarray:
+        """Signal type names as a string array."""
+        return np.asarray(SIGNAL_TYPES)[self.signal_codes]
+
+    def mask(self, signal_type: str) -> np.ndarray:
+        """Boolean mask of rows carrying the given signal type."""
+        return self.signal_codes == SIGNAL_TYPES.index(signal_type)
+
+def entry_signal(signal_type: str, confidence: float, current_price: float) -> Signal:
+    """Buy or sell signal with the standard 5% stop and 10% target."""
+    if signal_type == 'buy':
+        return Signal('buy', confidence, current_price,
+                      current_price * 0.95, current_price * 1.10)
+    return Signal('sell', confidence, current_price,
+                  current_price * 1.05, current_price * 0.90)
+
+def crossover_signal(prev_fast: float, prev_slow: float, curr_fast: float,
+                     curr_slow: float, current_price: float) -> Optional[Signal]:
+    """Buy on a golden cross, sell on a death cross, None otherwise."""
+    if prev_fast <= prev_slow and curr_fast > curr_slow:
+        signal_type = 'buy'
+    elif prev_fast >= prev_slow and curr_fast < curr_slow:
+        signal_type = 'sell'
+    else:
+        return None
+    confidence = min(abs(curr_fast / curr_slow - 1.0) * 10, 1.0)
+    return entry_signal(signal_type, confidence, current_price)
+
+def rolling_sma(prices: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average along the last axis using cumulative sums.
+
+    Positions before the window fills are NaN, as with pandas' rolling mean.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    sma = np.full(prices.shape, np.nan)
+    if prices.shape[-1] < period:
+        return sma
+    csum = np.cumsum(prices, axis=-1)
+    sma[..., period - 1] = csum[..., period - 1]
+    sma[..., period:] = csum[..., period:] - csum[..., :-period]
+    sma[..., period - 1:] /= period
+    return sma
+
+def crossover_codes(prev_fast: np.ndarray, prev_slow: np.ndarray,
+                    curr_fast: np.ndarray, curr_slow: np.ndarray) -> np.ndarray:
+    """Vectorized crossover rule: golden cross is BUY, death cross is SELL."""
+    codes = np.zeros(np.shape(curr_fast), dtype=np.int8)
+    with np.errstate(invalid='ignore'):
+        buy = (prev_fast <= prev_slow) & (curr_fast > curr_slow)
+        sell = (prev_fast >= prev_slow) & (curr_fast < curr_slow)
+    codes[buy] = BUY
+    codes[sell & ~buy] = SELL
+    return codes
+
+class SMACrossoverState:
+    """Rolling SMA crossover state for one symbol.
+
+    Prices live in a ring buffer sized to the longer window and each window
+    keeps a running sum, so pushing a price costs O(1).
+    """
+
+    __slots__ = ('_buffer', '_index', 'count', '_fast', '_slow',
+                 'prev_fast', 'prev_slow', 'fast_sma', 'slow_sma')
+
+    def __init__(self, fast_period: int, slow_period: int):
+        self._buffer = [0.0] * max(fast_period, slow_period)
+        self._index = 0
+        self.count = 0
+        self._fast = RollingMean(fast_period)
+        self._slow = RollingMean(slow_period)
+        self.prev_fast = None
+        self.prev_slow = None
+        self.fast_sma = None
+        self.slow_sma = None
+
+    def push(self, price: float):
+        """Add one close and roll both windows forward."""
+        buffer = self._buffer
+        size = len(buffer)
+        index = self._index
+
+        for window in (self._fast, self._slow):
+            if self.count >= window.window:
+                window.remove(buffer[(index - window.window) % size])
+            window.add(price)
+
+        buffer[index] = price
+        self._index = (index + 1) % size
+        self.count += 1
+
+        self.prev_fast = self.fast_sma
+        self.prev_slow = self.slow_sma
+        self.fast_sma = self._fast.mean()
+        self.slow_sma = self._slow.mean()
+
+class Strategy(ABC):
+    """Strategy plugin for StrategyEngine.
+
+    A strategy names the indicators it reads and turns their memoized
+    values for one symbol into a Signal, or None when it has nothing to
+    say. It keeps no per-symbol state of its own, so any number of
+    strategies can share one IndicatorSeries.
+    """
+
+    @property
+    def name(self) -> str:
+        """Unique name of this configured strategy."""
+        return type(self).__name__
+
+    def indicators(self) -> Tuple[IndicatorKey, ...]:
+        """Indicator keys evaluate() reads."""
+        return ()
+
+    @abstractmethod
+    def evaluate(self, series: IndicatorSeries) -> Optional[Signal]:
+        """Buy or sell signal for the close just pushed onto ``series``, or None."""
+
+class SMACrossoverStrategy(Strategy):
     """SMA crossover trading strategy."""
-    
+
     def __init__(self, fast_period: int = 10, slow_period: int = 20):
         self.fast_period = fast_period
         self.slow_period = slow_period
-    
-    def generate_signal(self,  pd.DataFrame, current_price: float) -> Signal:
+        self._states: Dict[str, SMACrossoverState] = {}
+        self._keys = (('sma', fast_period), ('sma', slow_period))
+
+    @property
+    def name(self) -> str:
+        return f"sma_crossover({self.fast_period},{self.slow_period})"
+
+    def indicators(self) -> Tuple[IndicatorKey, ...]:
+        return self._keys
+
+    def evaluate(self, series: IndicatorSeries) -> Optional[Signal]:
+        fast, slow = series.nodes[self._keys[0]], series.nodes[self._keys[1]]
+        if fast.prev is None or slow.prev is None:
+            return None
+        return crossover_signal(fast.prev, slow.prev, fast.value, slow.value, series.close)
+
+    def _crossover_signal(self, prev_fast: float, prev_slow: float, curr_fast: float,
+                          curr_slow: float, current_price: float) -> Signal:
+        """Turn the last two fast/slow SMA values into a signal."""
+        return (crossover_signal(prev_fast, prev_slow, curr_fast, curr_slow, current_price)
+                or Signal('hold', 0.0, None, None, None))
+
+    @METRICS.timed("strategy.generate_signal")
+    def generate_signal(self, data: 'pd.DataFrame', current_price: float) -> Signal:
         """Generate trading signal based on SMA crossover."""
-        if len(data) < self.slow_period:
+        if data is None or len(data) < self.slow_period:
             return Signal('hold', 0.0, None, None, None)
-        
+
         # Calculate SMAs
         data_copy = data.copy()
         data_copy['fast_sma'] = data_copy['close'].rolling(self.fast_period).mean()
         data_copy['slow_sma'] = data_copy['close'].rolling(self.slow_period).mean()
-        
+
         # Get the last two periods
         recent = data_copy.tail(2)
-        
+
         # Check for crossover
         prev_fast = recent['fast_sma'].iloc[-2]
         curr_fast = recent['fast_sma'].iloc[-1]
         prev_slow = recent['slow_sma'].iloc[-2]
         curr_slow = recent['slow_sma'].iloc[-1]
-        
-        # Calculate confidence
-        sma_ratio = curr_fast / curr_slow
-        confidence = min(abs(sma_ratio - 1.0) * 10, 1.0)
-        
-        # Generate signal
-        if prev_fast <= prev_slow and curr_fast > curr_slow:
-            # Golden cross - buy signal
-            return Signal(
-                signal_type='buy',
-                confidence=confidence,
-                entry_price=current_price,
-                stop_loss=current_price * 0.95,
-                take_profit=current_price * 1.10
-            )
-        elif prev_fast >= prev_slow and curr_fast < curr_slow:
-            # Death cross - sell signal
-            return Signal(
-                signal_type='sell',
-                confidence=confidence,
-                entry_price=current_price,
-                stop_loss=current_price * 1.05,
-                take_profit=current_price * 0.90
-            )
-        else:
+
+        return self._crossover_signal(prev_fast, prev_slow, curr_fast, curr_slow, current_price)
+
+    @METRICS.timed("strategy.generate_signals")
+    def generate_signals(self, prices: np.ndarray) -> SignalBatch:
+        """Generate signals for every symbol in a (symbols x time) price matrix.
+
+        The last column is each symbol's current price. All symbols are
+        evaluated in one vectorized pass over the trailing window.
+        """
+        prices = np.atleast_2d(np.asarray(prices, dtype=np.float64))
+        n_symbols, n_bars = prices.shape
+        longest = max(self.fast_period, self.slow_period)
+        current = prices[:, -1] if n_bars else np.full(n_symbols, np.nan)
+
+        if n_bars < longest + 1:
+            nan = np.full(n_symbols, np.nan)
+            return SignalBatch(np.zeros(n_symbols, dtype=np.int8), np.zeros(n_symbols),
+                               nan, nan.copy(), nan.copy(), nan.copy(), nan.copy())
+
+        # Cumulative sums over the tail give the last two SMA values per row
+        tail = prices[:, -(longest + 1):]
+        csum = np.zeros((n_symbols, longest + 2))
+        np.cumsum(tail, axis=1, out=csum[:, 1:])
+        f, sl = self.fast_period, self.slow_period
+        curr_fast = (csum[:, -1] - csum[:, -1 - f]) / f
+        prev_fast = (csum[:, -2] - csum[:, -2 - f]) / f
+        curr_slow = (csum[:, -1] - csum[:, -1 - sl]) / sl
+        prev_slow = (csum[:, -2] - csum[:, -2 - sl]) / sl
+
+        codes = crossover_codes(prev_fast, prev_slow, curr_fast, curr_slow)
+        active = codes != HOLD
+        buy = codes == BUY
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            confidence = np.minimum(np.abs(curr_fast / curr_slow - 1.0) * 10, 1.0)
+        confidence = np.where(active, confidence, 0.0)
+        entry_price = np.where(active, current, np.nan)
+        stop_loss = np.where(buy, current * 0.95, current * 1.05)
+        take_profit = np.where(buy, current * 1.10, current * 0.90)
+
+        return SignalBatch(
+            signal_codes=codes,
+            confidence=confidence,
+            entry_price=entry_price,
+            stop_loss=np.where(active, stop_loss, np.nan),
+            take_profit=np.where(active, take_profit, np.nan),
+            fast_sma=curr_fast,
+            slow_sma=curr_slow
+        )
+
+    def warm_start(self, symbol: str, closes: Iterable[float]):
+        """Rebuild a symbol's streaming state from historical closes."""
+        state = SMACrossoverState(self.fast_period, self.slow_period)
+        for close in closes:
+            state.push(float(close))
+        self._states[symbol] = state
+
+    @METRICS.timed("strategy.update")
+    def update(self, symbol: str, price: float) -> Signal:
+        """Push one new price for a symbol and return the signal in O(1).
+
+        Equivalent to calling generate_signal on the full close history
+        with the new price appended.
+        """
+        state = self._states.get(symbol)
+        if state is None:
+            state = self._states[symbol] = SMACrossoverState(self.fast_period, self.slow_period)
+        state.push(price)
+
+        if state.prev_fast is None or state.prev_slow is None:
             return Signal('hold', 0.0, None, None, None)
+        return self._crossover_signal(
+            state.prev_fast, state.prev_slow, state.fast_sma, state.slow_sma, price
+        )
+
+    def reset(self, symbol: Optional[str] = None):
+        """Drop streaming state for one symbol, or for all of them."""
+        if symbol is None:
+            self._states.clear()
+        else:
+            self._states.pop(symbol, None)
+
+class EMACrossoverStrategy(Strategy):
+    """EMA crossover: the SMA crossover rule on exponential averages."""
+
+    def __init__(self, fast_period: int = 12, slow_period: int = 26):
+        self.fast_period = fast_period
+        self.slow_period = slow_period
+        self._keys = (('ema', fast_period), ('ema', slow_period))
+
+    @property
+    def name(self) -> str:
+        return f"ema_crossover({self.fast_period},{self.slow_period})"
+
+    def indicators(self) -> Tuple[IndicatorKey, ...]:
+        return self._keys
+
+    def evaluate(self, series: IndicatorSeries) -> Optional[Signal]:
+        fast, slow = series.nodes[self._keys[0]], series.nodes[self._keys[1]]
+        if fast.prev is None or slow.prev is None:
+            return None
+        return crossover_signal(fast.prev, slow.prev, fast.value, slow.value, series.close)
+
+class RSIStrategy(Strategy):
+    """Buy when RSI climbs back out of oversold, sell when it falls out of overbought.
+
+    Confidence grows with how far RSI had moved past the threshold.
+    """
+
+    def __init__(self, period: int = 14, oversold: float = 30.0, overbought: float = 70.0):
+        self.period = period
+        self.oversold = oversold
+        self.overbought = overbought
+        self._key = ('rsi', period)
+
+    @property
+    def name(self) -> str:
+        return f"rsi({self.period},{self.oversold:g},{self.overbought:g})"
+
+    def indicators(self) -> Tuple[IndicatorKey, ...]:
+        return (self._key,)
+
+    def evaluate(self, series: IndicatorSeries) -> Optional[Signal]:
+        rsi = series.nodes[self._key]
+        prev, curr = rsi.prev, rsi.value
+        if prev is None:
+            return None
+        if prev < self.oversold <= curr:
+            return entry_signal('buy', min((50.0 - prev) / 50.0, 1.0), series.close)
+        if prev > self.overbought >= curr:
+            return entry_signal('sell', min((prev - 50.0) / 50.0, 1.0), series.close)
+        return None
+
+class VolatilityBreakoutStrategy(Strategy):
+    """Trade closes that break out of a band of ``width`` rolling standard deviations.
+
+    Buys when the close crosses above SMA + width * std and sells when it
+    crosses below SMA - width * std; confidence is the distance past the
+    band in standard deviations.
+    """
+
+    def __init__(self, period: int = 20, width: float = 2.0):
+        self.period = period
+        self.width = width
+        self._key = ('zscore', period)
+
+    @property
+    def name(self) -> str:
+        return f"volatility_breakout({self.period},{self.width:g})"
+
+    def indicators(self) -> Tuple[IndicatorKey, ...]:
+        return (self._key,)
+
+    def evaluate(self, series: IndicatorSeries) -> Optional[Signal]:
+        zscore = series.nodes[self._key]
+        prev, curr = zscore.prev, zscore.value
+        if prev is None or curr is None:
+            return None
+        if prev <= self.width < curr:
+            return entry_signal('buy', min(curr - self.width, 1.0), series.close)
+        if prev >= -self.width > curr:
+            return entry_signal('sell', min(-self.width - curr, 1.0), series.close)
+        return None
+
+STRATEGIES = {
+    'sma_crossover': SMACrossoverStrategy,
+    'ema_crossover': EMACrossoverStrategy,
+    'rsi': RSIStrategy,
+    'volatility_breakout': VolatilityBreakoutStrategy,
+}
+
+def build_strategy(spec: Dict[str, Any]) -> Strategy:
+    """Strategy from a config entry such as ``{"type": "rsi", "period": 14}``."""
+    params = dict(spec)
+    strategy_type = params.pop('type')
+    if strategy_type not in STRATEGIES:
+        raise ValueError(f"Unknown strategy type {strategy_type!r}")
+    return STRATEGIES[strategy_type](**params)
+
+class StrategyEngine:
+    """Runs several strategies per symbol over one shared indicator graph.
+
+    Each new close updates every distinct indicator once. Strategies then
+    only read memoized values, so a strategy whose indicators are already
+    in the graph adds just its own evaluate() to each tick.
+
+    Has the warm_start/update/reset interface of SMACrossoverStrategy, so
+    it can stand in as TradingBot's signal generator.
+    """
+
+    def __init__(self, strategies: Iterable[Strategy] = ()):
+        self.strategies: List[Strategy] = []
+        self._names: List[str] = []
+        self.graph = IndicatorGraph()
+        self._series: Dict[str, IndicatorSeries] = {}
+        for strategy in strategies:
+            self.add_strategy(strategy)
+
+    def add_strategy(self, strategy: Strategy):
+        """Register a strategy and the indicators it needs.
+
+        New indicators have no history, so existing per-symbol state is
+        dropped; warm_start symbols again after adding strategies.
+        """
+        if strategy.name in self._names:
+            raise ValueError(f"Strategy {strategy.name} is already registered")
+        known = len(self.graph.order)
+        for key in strategy.indicators():
+            self.graph.require(key)
+        self.strategies.append(strategy)
+        self._names.append(strategy.name)
+        if len(self.graph.order) != known:
+            self._series.clear()
+
+    def warm_start(self, symbol: str, closes: Iterable[float]):
+        """Rebuild a symbol's indicators from historical closes."""
+        series = self.graph.series()
+        for close in closes:
+            series.push(float(close))
+        self._series[symbol] = series
+
+    def series(self, symbol: str) -> IndicatorSeries:
+        """A symbol's indicator state, created on first use."""
+        series = self._series.get(symbol)
+        if series is None:
+            series = self._series[symbol] = self.graph.series()
+        return series
+
+    @METRICS.timed("strategy.engine_update")
+    def update_all(self, symbol: str, price: float) -> Dict[str, Signal]:
+        """Push one new price and return every strategy's signal by name."""
+        series = self.series(symbol)
+        series.push(price)
+        return {
+            name: strategy.evaluate(series) or Signal('hold', 0.0, None, None, None)
+            for name, strategy in zip(self._names, self.strategies)
+        }
+
+    @METRICS.timed("strategy.engine_update")
+    def update(self, symbol: str, price: float) -> Signal:
+        """Push one new price and return the most confident buy or sell signal.
+
+        Returns hold when no strategy signals.
+        """
+        series = self.series(symbol)
+        series.push(price)
+        best = None
+        for strategy in self.strategies:
+            signal = strategy.evaluate(series)
+            if signal is not None and (best is None or signal.confidence > best.confidence):
+                best = signal
+        return best or Signal('hold', 0.0, None, None, None)
+
+    def reset(self, symbol: Optional[str] = None):
+        """Drop indicator state for one symbol, or for all of them."""
+        if symbol is None:
+            self._series.clear()
+        else:
+            self._series.pop(symbol, None)
@@ -0,0 +1,307 @@
+"""
+Sharded multi-process runner: one TradingBot per shard, one shared ledger.
+"""
+import argparse
+import bisect
+import hashlib
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing.connection import wait
+from multiprocessing.managers import BaseManager
+from typing import Dict, Iterable, List, Optional
+
+from src.monitoring.event_log import EVENTS, FAILURE, STATUS, WARN
+from src.trading.bootstrap import (DEFAULT_CONFIG, config_symbols, derive_key, load_config,
+                                   resolve_secret)
+from src.trading.portfolio_manager import PortfolioManager
+from src.trading.trade_journal import TradeJournal
+
+class HashRing:
+    """Consistent hash ring mapping keys onto shard indexes.
+
+    Each shard owns ``replicas`` points on the ring, so changing the shard
+    count only moves about 1/N of the keys.
+    """
+
+    def __init__(self, shards: int, replicas: int = 64):
+        if shards < 1:
+            raise ValueError("shards must be at least 1")
+        self.shards = shards
+        points = sorted(
+            (self._hash(f"shard-{shard}#{replica}"), shard)
+            for shard in range(shards)
+            for replica in range(replicas)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [shard for _, shard in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode('utf-8')).digest()[:8], 'big')
+
+    def shard_for(self, key: str) -> int:
+        """Shard index owning a key."""
+        index = bisect.bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._owners[index]
+
+    def partition(self, keys: Iterable[str]) -> List[List[str]]:
+        """Keys grouped by owning shard."""
+        shards = [[] for _ in range(self.shards)]
+        for key in keys:
+            shards[self.shard_for(key)].append(key)
+        return shards
+
+class LedgerPortfolio(PortfolioManager):
+    """PortfolioManager whose mutations are serialized by a lock.
+
+    Hosted in the coordinator process; workers reach it through a manager
+    proxy, and each proxy call runs in its own server thread, so the cash
+    check in update_position must not interleave.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._lock = threading.Lock()
+
+    def update_position(self, symbol: str, quantity: float, price: float, order_type: str) -> bool:
+        with self._lock:
+            return super().update_position(symbol, quantity, price, order_type)
+
+    def check_profit_taking_opportunities(self, current_prices: dict) -> list:
+        with self._lock:
+            return super().check_profit_taking_opportunities(current_prices)
+
+    def total_value(self, current_prices: dict) -> float:
+        with self._lock:
+            return super().total_value(current_prices)
+
+    def mark_to_market(self, current_prices: dict):
+        with self._lock:
+            return super().mark_to_market(current_prices)
+
+    def close_journal(self):
+        """Flush and close the trade journal."""
+        with self._lock:
+            if self.journal is not None:
+                self.journal.close()
+
+    def summary(self) -> dict:
+        """Cash, open positions at cost, and the latest valuation."""
+        with self._lock:
+            valuation = self.valuation.snapshot()
+            return {
+                'cash': self.cash,
+                'open_positions': len(self.positions),
+                'closed_positions': len(self.closed_positions),
+                'cost_basis': valuation.cost_basis,
+                'equity': valuation.equity,
+                'realized_pnl': valuation.realized_pnl,
+                'unrealized_pnl': valuation.unrealized_pnl,
+                'max_drawdown': valuation.max_drawdown,
+            }
+
+class ShardDirectory:
+    """Each shard's discovered symbols, kept by the coordinator.
+
+    Workers publish after every discovery change, so a restarted worker
+    resumes with the symbols its predecessor had discovered.
+    """
+
+    def __init__(self):
+        self._discovered: Dict[int, Dict[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, shard: int, discovered: Dict[str, str]):
+        with self._lock:
+            self._discovered[shard] = dict(discovered)
+
+    def discovered(self, shard: int) -> Dict[str, str]:
+        with self._lock:
+            return dict(self._discovered.get(shard, {}))
+
+_LEDGER: Optional[LedgerPortfolio] = None
+_DIRECTORY: Optional[ShardDirectory] = None
+
+def _init_ledger(initial_balance: float, partial_sell_ratio: float):
+    global _LEDGER, _DIRECTORY
+    _LEDGER = LedgerPortfolio(initial_balance=initial_balance,
+                              partial_sell_ratio=partial_sell_ratio,
+                              journal=TradeJournal())
+    _DIRECTORY = ShardDirectory()
+
+def _get_ledger() -> LedgerPortfolio:
+    return _LEDGER
+
+def _get_directory() -> ShardDirectory:
+    return _DIRECTORY
+
+class LedgerManager(BaseManager):
+    """Coordinator process serving the shared ledger and shard directory."""
+
+LedgerManager.register('portfolio', callable=_get_ledger)
+LedgerManager.register('directory', callable=_get_directory)
+
+def _worker_main(shard: int, shards: int, symbols: Dict[str, str], discovered: Dict[str, str],
+                 ledger_address, authkey: bytes, config_path: Optional[str], key: bytes,
+                 run_kwargs: dict):
+    """Entry point of a shard process."""
+    from src.trading.bootstrap import build_bot
+
+    manager = LedgerManager(address=ledger_address, authkey=authkey)
+    manager.connect()
+    bot = build_bot(config_path, key=key, portfolio_manager=manager.portfolio(), symbols=symbols,
+                    shard=shard)
+    # Discovered symbols go to the shard that would own them in the config
+    ring = HashRing(shards)
+    bot.universe.accept = lambda symbol: ring.shard_for(symbol) == shard
+    # Resume what an earlier run of this shard discovered, and keep it published
+    for symbol, pair_address in discovered.items():
+        bot.add_symbol(symbol, pair_address, discovered=True)
+    directory = manager.directory()
+    bot.on_universe_change = lambda universe: directory.publish(shard, universe.discovered())
+    EVENTS.emit(STATUS, f"shard {shard}",
+                f"Shard {shard} monitoring {len(bot.universe)} symbols")
+    bot.run(**run_kwargs)
+
+class ShardedRunner:
+    """Supervisor that shards symbols across worker processes.
+
+    Symbols are assigned by consistent hash, every worker runs its own
+    provider, filter and strategy, and all of them book trades against one
+    LedgerPortfolio in a coordinator process. A worker that dies is
+    restarted with the same shard plus the symbols it had discovered; the
+    ledger keeps its positions and add_symbol warm-starts its strategy
+    from stored history.
+
+    The storage key is derived once here and handed to the workers, so
+    neither they nor their restarts pay for PBKDF2.
+    """
+
+    def __init__(self, symbols: Dict[str, str], workers: int = None, password: str = "",
+                 initial_balance: float = 1000.0, partial_sell_ratio: float = 0.5,
+                 max_restarts: int = 5, restart_delay: float = 1.0,
+                 key: Optional[bytes] = None, config_path: Optional[str] = None,
+                 discovery: bool = False):
+        self.symbols = dict(symbols)
+        # With discovery every shard runs, even one with no configured symbols
+        self.discovery = discovery
+        self.workers = workers or os.cpu_count() or 1
+        self.password = password
+        self.key = key
+        self.config_path = config_path
+        self.initial_balance = initial_balance
+        self.partial_sell_ratio = partial_sell_ratio
+        self.max_restarts = max_restarts
+        self.restart_delay = restart_delay
+        self.restarts = [0] * self.workers
+
+        ring = HashRing(self.workers)
+        self.shards = [
+            {symbol: self.symbols[symbol] for symbol in keys}
+            for keys in ring.partition(self.symbols)
+        ]
+        self._context = multiprocessing.get_context('spawn')
+        self._authkey = os.urandom(32)
+        self._manager: Optional[LedgerManager] = None
+        self._processes: Dict[int, multiprocessing.Process] = {}
+        self._stopping = threading.Event()
+
+    def _spawn(self, shard: int, run_kwargs: dict):
+        process = self._context.Process(
+            target=_worker_main,
+            args=(shard, self.workers, self.shards[shard],
+                  self._manager.directory().discovered(shard), self._manager.address,
+                  self._authkey, self.config_path, self.key, run_kwargs),
+            name=f"bot-shard-{shard}",
+            daemon=True
+        )
+        process.start()
+        self._processes[shard] = process
+
+    def ledger(self):
+        """Proxy to the shared ledger (while running)."""
+        return self._manager.portfolio()
+
+    def stop(self):
+        """Stop supervising and terminate the workers."""
+        self._stopping.set()
+
+    def run(self, duration_hours: float = 24, **run_kwargs) -> dict:
+        """Run every shard until duration_hours elapses; returns the final ledger summary."""
+        run_kwargs['duration_hours'] = duration_hours
+        if self.key is None:
+            self.key = derive_key(self.password)
+        self._manager = LedgerManager(authkey=self._authkey, ctx=self._context)
+        self._manager.start(_init_ledger, (self.initial_balance, self.partial_sell_ratio))
+        EVENTS.emit(STATUS, 'supervisor',
+                    f"Starting {self.workers} shards for {len(self.symbols)} symbols")
+        try:
+            for shard, symbols in enumerate(self.shards):
+                if symbols or self.discovery:
+                    self._spawn(shard, run_kwargs)
+
+            deadline = time.monotonic() + duration_hours * 3600
+            while self._processes and not self._stopping.is_set():
+                by_sentinel = {p.sentinel: shard for shard, p in self._processes.items()}
+                for sentinel in wait(list(by_sentinel), timeout=1.0):
+                    shard = by_sentinel[sentinel]
+                    process = self._processes.pop(shard)
+                    process.join()
+                    if process.exitcode == 0:
+                        EVENTS.emit(STATUS, 'supervisor', f"Shard {shard} finished")
+                        continue
+                    if self.restarts[shard] >= self.max_restarts:
+                        EVENTS.emit(FAILURE, 'supervisor',
+                                    f"Shard {shard} exited with {process.exitcode}; "
+                                    f"giving up after {self.restarts[shard]} restarts")
+                        continue
+                    # Restart with its remaining run time
+                    remaining = (deadline - time.monotonic()) / 3600
+                    if remaining <= 0:
+                        continue
+                    self.restarts[shard] += 1
+                    EVENTS.emit(WARN, 'supervisor',
+                                f"Shard {shard} exited with {process.exitcode}; restarting "
+                                f"({self.restarts[shard]}/{self.max_restarts})")
+                    time.sleep(self.restart_delay)
+                    self._spawn(shard, dict(run_kwargs, duration_hours=remaining))
+        except KeyboardInterrupt:
+            EVENTS.emit(STATUS, 'supervisor', "Supervisor stopped by user")
+        finally:
+            for process in self._processes.values():
+                process.terminate()
+            for process in self._processes.values():
+                process.join()
+            self._processes.clear()
+            ledger = self.ledger()
+            summary = ledger.summary()
+            ledger.close_journal()
+            self._manager.shutdown()
+            self._manager = None
+        EVENTS.emit(STATUS, 'supervisor', f"Final ledger: {summary}")
+        EVENTS.flush()
+        return summary
+
+def run_from_config(config_path: str = DEFAULT_CONFIG, workers: Optional[int] = None,
+                    duration_hours: float = 24) -> dict:
+    """Shard the config's symbols across workers and run them."""
+    config = load_config(config_path)
+    password, key = resolve_secret(config)
+    runner = ShardedRunner(config_symbols(config), workers=workers, password=password or "",
+                           key=key, config_path=config_path,
+                           discovery=bool(config.get('discovery')),
+                           **config.get('portfolio_settings', {}))
+    return runner.run(duration_hours=duration_hours)
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the trading bot sharded across processes.")
+    parser.add_argument("--config", default=DEFAULT_CONFIG)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--hours", type=float, default=24)
+    args = parser.parse_args()
+    run_from_config(args.config, workers=args.workers, duration_hours=args.hours)
+
+if __name__ == "__main__":
+    main()
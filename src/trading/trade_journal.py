@@ -0,0 +1,176 @@
+"""
+Append-only trade journal with group-commit fsync and periodic snapshots.
+"""
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+from src.monitoring.event_log import EVENTS, FAILURE
+
+# Record kinds
+BUY = 'B'
+SELL = 'S'
+TRIGGER = 'T'
+
+SNAPSHOT_FILE = "snapshot.json"
+
+class TradeJournal:
+    """Write-ahead log of portfolio fills and profit-taking triggers.
+
+    Records are tab-separated lines ``seq kind symbol quantity price
+    timestamp`` appended to the current segment. Appends only touch an
+    in-memory buffer; a background thread writes and fsyncs the buffer
+    every ``sync_interval`` seconds, so one fsync covers every trade in that
+    window (``sync_interval=0`` fsyncs on each record instead).
+
+    Every ``snapshot_every`` records the portfolio is snapshotted and a new
+    segment started; older segments are deleted, so recovery loads the
+    snapshot and replays only the tail.
+    """
+
+    def __init__(self, directory: str = "data/journal", sync_interval: float = 0.01,
+                 snapshot_every: int = 10000):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.sync_interval = sync_interval
+        self.snapshot_every = snapshot_every
+        self.seq = 0
+        self.records_since_snapshot = 0
+
+        self._buffer: List[str] = []
+        self._lock = threading.Lock()
+        self._file = None
+        self._closed = threading.Event()
+        self._flusher = None
+
+    def _segment_path(self, first_seq: int) -> Path:
+        return self.directory / f"journal-{first_seq:012d}.log"
+
+    def _segments(self) -> List[Path]:
+        return sorted(self.directory.glob("journal-*.log"))
+
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self._segment_path(self.seq + 1), 'a', encoding='utf-8')
+
+    def _start(self):
+        """Open a segment for new records and start the group-commit thread."""
+        self._open_segment()
+        if self.sync_interval > 0:
+            self._flusher = threading.Thread(target=self._flush_loop, name="trade-journal",
+                                             daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while not self._closed.wait(self.sync_interval):
+            try:
+                self.flush()
+            except Exception as e:
+                EVENTS.emit(FAILURE, 'trade journal', f"flushing: {e}")
+
+    def _write_buffer(self):
+        """Write and fsync buffered records; caller holds the lock."""
+        if self._buffer:
+            self._file.write(''.join(self._buffer))
+            self._buffer.clear()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def flush(self):
+        """Make every record appended so far durable."""
+        with self._lock:
+            if self._file is not None:
+                self._write_buffer()
+
+    def record(self, kind: str, symbol: str, quantity: float, price: float,
+               timestamp: Optional[float] = None):
+        """Append one record."""
+        if timestamp is None:
+            timestamp = time.time()
+        with self._lock:
+            self.seq += 1
+            self.records_since_snapshot += 1
+            self._buffer.append(
+                f"{self.seq}\t{kind}\t{symbol}\t{quantity!r}\t{price!r}\t{timestamp!r}\n"
+            )
+            if self.sync_interval <= 0:
+                self._write_buffer()
+
+    @property
+    def snapshot_due(self) -> bool:
+        return self.records_since_snapshot >= self.snapshot_every
+
+    def snapshot(self, state: dict):
+        """Persist portfolio state as of the latest record and rotate segments."""
+        with self._lock:
+            self._write_buffer()
+            state = dict(state, seq=self.seq)
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(state, f, separators=(',', ':'))
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(tmp_path, self.directory / SNAPSHOT_FILE)
+            except BaseException:
+                if os.path.exists(tmp_path):
+                    os.unlink(tmp_path)
+                raise
+
+            current = Path(self._file.name)
+            self._open_segment()
+            for segment in self._segments():
+                if segment != Path(self._file.name) and segment <= current:
+                    segment.unlink()
+            self.records_since_snapshot = 0
+
+    def load(self) -> Tuple[Optional[dict], List[Tuple[int, str, str, float, float, float]]]:
+        """(snapshot or None, records after it), then open the journal for appends.
+
+        A torn final line left by a crash mid-write is truncated away.
+        """
+        snapshot = None
+        snapshot_path = self.directory / SNAPSHOT_FILE
+        if snapshot_path.exists():
+            with open(snapshot_path, encoding='utf-8') as f:
+                snapshot = json.load(f)
+        after = snapshot['seq'] if snapshot else 0
+        self.seq = after
+
+        records = []
+        for segment in self._segments():
+            with open(segment, 'rb') as f:
+                data = f.read()
+            complete = data[:data.rfind(b'\n') + 1]
+            if len(complete) != len(data):
+                with open(segment, 'r+b') as f:
+                    f.truncate(len(complete))
+            for line in complete.decode('utf-8').splitlines():
+                fields = line.split('\t')
+                seq = int(fields[0])
+                if seq <= after:
+                    continue
+                records.append((seq, fields[1], fields[2], float(fields[3]),
+                                float(fields[4]), float(fields[5])))
+        if records:
+            self.seq = records[-1][0]
+        self.records_since_snapshot = len(records)
+        self._start()
+        return snapshot, records
+
+    def close(self):
+        """Flush outstanding records and stop the group-commit thread."""
+        self._closed.set()
+        if self._flusher is not None:
+            self._flusher.join()
+            self._flusher = None
+        with self._lock:
+            if self._file is not None:
+                self._write_buffer()
+                self._file.close()
+                self._file = None
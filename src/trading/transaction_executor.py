@@ -3,8 +3,16 @@ Transaction executor for buy/sell operations.
 """
 import requests
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import datetime
+from typing import Optional
+
+from requests.adapters import HTTPAdapter
+
+from src.monitoring.event_log import EVENTS, ORDER
+from src.monitoring.metrics import METRICS
+from src.network.governor import EXECUTION, GOVERNOR, RequestGovernor
 
 @dataclass
 class ExecutionResult:
@@ -13,25 +21,83 @@ class ExecutionResult:
     transaction_id: str = None
     message: str = ""
     timestamp: float = 0.0
+    latency_ms: float = 0.0
+    filled_quantity: Optional[float] = None  # tokens bought or sold, when the venue reports it
+    fill_price: Optional[float] = None       # average USD per token
+    slippage: float = 0.0                    # fill price vs the pre-trade price, fees included
 
 class TransactionExecutor:
-    """Executes buy/sell transactions."""
-    
-    def __init__(self, private_key: str = "", wallet_address: str = ""):
+    """Executes buy/sell transactions.
+
+    Meant to live for the whole bot run: it owns a pooled HTTP session and a
+    worker pool, so independent orders can be submitted together and
+    awaited as futures. Orders go to ``venue`` (see src/trading/venues.py)
+    when one is given.
+    """
+
+    def __init__(self, private_key: str = "", wallet_address: str = "", max_workers: int = 8,
+                 governor: RequestGovernor = None, venue=None):
+        self.governor = governor or GOVERNOR
+        self.venue = venue
         self.private_key = private_key
         self.wallet_address = wallet_address
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=max_workers, pool_maxsize=max_workers)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
         self.session.headers.update({
             'Content-Type': 'application/json',
             'User-Agent': 'TradingBot/1.0'
         })
-    
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="executor")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _post(self, url: str, **kwargs) -> requests.Response:
+        """POST through the shared request governor ahead of data requests."""
+        return self.governor.request(self.session, 'POST', url, priority=EXECUTION, **kwargs)
+
+    def _timed(self, execute, *args) -> ExecutionResult:
+        """Run an order and add its wall-clock latency to any the venue simulated."""
+        started = time.perf_counter()
+        result = execute(*args)
+        result.latency_ms += (time.perf_counter() - started) * 1000.0
+        METRICS.observe(f"executor.{execute.__name__.rsplit('_', 1)[-1]}", result.latency_ms * 1000.0)
+        METRICS.count("executor.orders" if result.success else "executor.failures")
+        return result
+
     def execute_buy(self, token_address: str, amount_sol: float) -> ExecutionResult:
         """Execute a buy order."""
+        return self._timed(self._execute_buy, token_address, amount_sol)
+
+    def execute_sell(self, token_address: str, token_amount: float) -> ExecutionResult:
+        """Execute a sell order."""
+        return self._timed(self._execute_sell, token_address, token_amount)
+
+    def submit_buy(self, token_address: str, amount_sol: float) -> Future:
+        """Queue a buy order; the future resolves to an ExecutionResult."""
+        return self._pool.submit(self.execute_buy, token_address, amount_sol)
+
+    def submit_sell(self, token_address: str, token_amount: float) -> Future:
+        """Queue a sell order; the future resolves to an ExecutionResult."""
+        return self._pool.submit(self.execute_sell, token_address, token_amount)
+
+    def close(self):
+        """Wait for queued orders, then release the pool and session."""
+        self._pool.shutdown(wait=True)
+        self.session.close()
+
+    def _execute_buy(self, token_address: str, amount_sol: float) -> ExecutionResult:
         try:
-            print(f"Executing buy: {amount_sol} SOL for {token_address}")
+            if self.venue is not None:
+                return self.venue.buy(token_address, amount_sol)
+            EVENTS.emit(ORDER, 'buy', token_address, amount_sol)
             time.sleep(0.1)  # Simulate network delay
-            
+
             return ExecutionResult(
                 success=True,
                 transaction_id=f"tx_{int(time.time())}_{token_address[:8]}",
@@ -44,13 +110,14 @@ class TransactionExecutor:
                 message=f"Error executing buy: {str(e)}",
                 timestamp=time.time()
             )
-    
-    def execute_sell(self, token_address: str, token_amount: float) -> ExecutionResult:
-        """Execute a sell order."""
+
+    def _execute_sell(self, token_address: str, token_amount: float) -> ExecutionResult:
         try:
-            print(f"Executing sell: {token_amount} tokens {token_address}")
+            if self.venue is not None:
+                return self.venue.sell(token_address, token_amount)
+            EVENTS.emit(ORDER, 'sell', token_address, token_amount)
             time.sleep(0.1)  # Simulate network delay
-            
+
             return ExecutionResult(
                 success=True,
                 transaction_id=f"tx_{int(time.time())}_{token_address[:8]}",
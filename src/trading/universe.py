@@ -0,0 +1,233 @@
+"""
+Indexed symbol universe and incremental discovery of new pairs.
+"""
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.market_data.columnar import PairColumns
+
+@dataclass
+class DiscoverySettings:
+    """Where and how often the bot looks for new pairs."""
+    listing_url: Optional[str] = None  # DexScreener-style {"pairs": [...]} listing
+    interval_minutes: float = 10.0
+    max_symbols: int = 1000
+    check_risk: bool = True
+    evict_after: int = 3  # refreshes a pair may be missing from the listing
+
+@dataclass
+class UniverseDiff:
+    """What one listing changes in the universe."""
+    added: List[Tuple[str, str]] = field(default_factory=list)    # (symbol, pair address)
+    removed: List[Tuple[str, str]] = field(default_factory=list)
+    screened: int = 0   # new or changed pairs run through the filter
+    unchanged: int = 0
+
+class TokenUniverse:
+    """Monitored pairs, indexed by symbol and by pair address.
+
+    Every listed pair is remembered with a fingerprint of what screening
+    depends on: its symbol, name and token address, and which of the
+    filter's numeric thresholds it clears (not the raw numbers, which move
+    on every pull). diff() only screens pairs that are new or whose
+    fingerprint moved, so a refresh costs one dict lookup per listed pair
+    plus filter and risk work proportional to what changed.
+
+    A pair missing from ``evict_after`` consecutive listings is forgotten,
+    and dropped if it was discovered. Pairs added by hand stay until
+    removed by hand; only discovered pairs are dropped by diff().
+    """
+
+    def __init__(self, max_symbols: Optional[int] = None,
+                 accept: Optional[Callable[[str], bool]] = None, evict_after: int = 3):
+        self.symbols: Dict[str, str] = {}  # symbol -> pair address
+        self.pairs: Dict[str, str] = {}    # pair address -> symbol
+        self.max_symbols = max_symbols
+        # Optional symbol predicate, e.g. "owned by this shard"
+        self.accept = accept
+        self._discovered: Set[str] = set()
+        self._fingerprints: Dict[str, tuple] = {}
+        # Pairs that passed screening but found no room or a taken symbol:
+        # pair address -> symbol, admitted first when room frees up
+        self._waiting: Dict[str, str] = {}
+        # Listing refreshes seen, and each pair's last sighting both ways
+        self.evict_after = evict_after
+        self._refresh = 0
+        self._last_seen: Dict[str, int] = {}
+        self._seen_in: Dict[int, Set[str]] = {}
+        self._screened_with = None
+
+    def add(self, symbol: str, pair_address: str, discovered: bool = False) -> bool:
+        """Index a pair under a symbol; False if either is already taken."""
+        if symbol in self.symbols or pair_address in self.pairs:
+            return False
+        self.symbols[symbol] = pair_address
+        self.pairs[pair_address] = symbol
+        if discovered:
+            self._discovered.add(pair_address)
+        return True
+
+    def remove(self, symbol: str) -> Optional[str]:
+        """Drop a symbol; returns its pair address."""
+        pair_address = self.symbols.pop(symbol, None)
+        if pair_address is not None:
+            del self.pairs[pair_address]
+            self._discovered.discard(pair_address)
+        return pair_address
+
+    def discovered(self) -> Dict[str, str]:
+        """Members added by discovery, symbol -> pair address."""
+        return {self.pairs[address]: address for address in self._discovered}
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.symbols
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def diff(self, listing: PairColumns, token_filter,
+             check_risk: Optional[Callable] = None) -> UniverseDiff:
+        """Screen a listing's new and changed pairs against the universe.
+
+        Changed pairs go through ``token_filter.filter_batch`` as one
+        columnar batch; those not yet monitored are then risk-checked with
+        ``check_risk`` (e.g. BubblemapsAPI.check_many), which must map
+        token addresses to RugPullRisk. Membership is not modified; apply
+        the diff with add() and remove().
+        """
+        diff = UniverseDiff()
+        size = listing.size
+        addresses = listing.pair_address
+        symbols = listing.base_token_symbol
+        names = listing.base_token_name
+        tokens = listing.base_token_address
+        outcomes = token_filter.numeric_outcomes(listing.liquidity_usd[:size],
+                                                 listing.volume_h24[:size],
+                                                 listing.price_change_h24[:size]).tolist()
+
+        fingerprints = self._fingerprints
+        if token_filter.compiled is not self._screened_with:
+            # New filter rules: every pair's outcome may have changed
+            fingerprints.clear()
+            self._screened_with = token_filter.compiled
+
+        self._refresh += 1
+        refresh = self._refresh
+        last_seen, seen_in = self._last_seen, self._seen_in
+        sightings = seen_in.setdefault(refresh, set())
+        changed = []
+        for row in listing.index.values():
+            address = addresses[row]
+            previous = last_seen.get(address)
+            if previous != refresh:
+                if previous is not None:
+                    seen_in[previous].discard(address)
+                last_seen[address] = refresh
+                sightings.add(address)
+            fingerprint = (symbols[row], names[row], tokens[row], outcomes[row])
+            if fingerprints.get(address) != fingerprint:
+                changed.append((row, fingerprint))
+        self._evict(diff)
+        diff.unchanged = len(listing.index) - len(changed)
+        diff.screened = len(changed)
+        passed, candidates, rejected = [], [], set()
+        if changed:
+            passed, candidates, rejected = self._screen(listing, changed, token_filter, check_risk)
+
+        # Re-screened pairs leave the waiting list and re-enter below if they
+        # still pass; waiting pairs go ahead of newly passing ones
+        waiting = self._waiting
+        for row, _ in changed:
+            waiting.pop(addresses[row], None)
+        admissible = list(waiting.items())
+        queued = len(admissible)
+        admissible.extend((addresses[row], symbols[row]) for row in candidates
+                          if row not in rejected)
+
+        room = None if self.max_symbols is None else self.max_symbols - len(self.symbols)
+        claimed = set()
+        for index, (address, symbol) in enumerate(admissible):
+            if room is not None and len(diff.added) >= room:
+                waiting.update(admissible[max(index, queued):])
+                break
+            if address in self.pairs:
+                waiting.pop(address, None)
+            elif symbol in self.symbols or symbol in claimed:
+                # Another pair already trades under this symbol
+                waiting[address] = symbol
+            else:
+                claimed.add(symbol)
+                waiting.pop(address, None)
+                diff.added.append((symbol, address))
+
+        for (row, fingerprint), ok in zip(changed, passed):
+            if row in rejected:
+                # Risk may clear later, so these are screened again next time
+                continue
+            address = addresses[row]
+            fingerprints[address] = fingerprint
+            if not ok and address in self._discovered:
+                diff.removed.append((self.pairs[address], address))
+        return diff
+
+    def _evict(self, diff: UniverseDiff):
+        """Forget pairs last listed ``evict_after`` refreshes ago.
+
+        Discovered members are reported in ``diff.removed``; those still
+        monitored after the diff is applied (say, for an open position) are
+        proposed again ``evict_after`` refreshes later.
+        """
+        expired = self._seen_in.pop(self._refresh - self.evict_after, None)
+        if not expired:
+            return
+        sightings = self._seen_in[self._refresh]
+        for address in expired:
+            if address in self._discovered:
+                diff.removed.append((self.pairs[address], address))
+                self._last_seen[address] = self._refresh
+                sightings.add(address)
+            else:
+                del self._last_seen[address]
+            self._fingerprints.pop(address, None)
+            self._waiting.pop(address, None)
+
+    def _screen(self, listing: PairColumns, changed: list, token_filter,
+                check_risk: Optional[Callable]) -> tuple:
+        """Filter mask of the changed rows, rows to admit and rows risk held back.
+
+        With ``check_risk``, a candidate is held back when its risk is
+        critical or could not be scored.
+        """
+        addresses = listing.pair_address
+        symbols = listing.base_token_symbol
+        names = listing.base_token_name
+        tokens = listing.base_token_address
+
+        rows = np.fromiter((row for row, _ in changed), dtype=np.intp, count=len(changed))
+        passed = token_filter.filter_batch({
+            'liquidity_usd': listing.liquidity_usd[rows],
+            'volume_h24': listing.volume_h24[rows],
+            'price_change_h24': listing.price_change_h24[rows],
+            'base_token_name': [names[row] for row in rows],
+            'base_token_symbol': [symbols[row] for row in rows],
+        }).mask
+
+        accept = self.accept
+        candidates = [
+            row for row, ok in zip(rows.tolist(), passed)
+            if ok and addresses[row] not in self.pairs
+            and (accept is None or accept(symbols[row]))
+        ]
+        rejected = set()
+        if check_risk is not None and candidates:
+            risks = check_risk(tokens[row] or addresses[row] for row in candidates)
+            for row in candidates:
+                risk = risks.get(tokens[row] or addresses[row])
+                if risk is None or risk.risk_level == "critical":
+                    rejected.add(row)
+        return passed, candidates, rejected
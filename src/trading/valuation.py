@@ -0,0 +1,210 @@
+"""
+Incremental mark-to-market valuation and P&L ledger.
+"""
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional
+
+from src.monitoring.metrics import METRICS
+
+@dataclass
+class ValuationSnapshot:
+    """Portfolio valuation as of the latest marks."""
+    cash: float
+    market_value: float
+    equity: float
+    cost_basis: float
+    realized_pnl: float
+    unrealized_pnl: float
+    high_water_mark: float
+    drawdown: float  # fraction below the high-water mark
+    max_drawdown: float
+    open_positions: int
+
+@dataclass
+class PositionValuation:
+    """One open position at its latest mark."""
+    symbol: str
+    quantity: float
+    mark: float
+    market_value: float
+    cost_basis: float
+    unrealized_pnl: float
+
+class _Holding:
+    __slots__ = ('quantity', 'cost', 'mark')
+
+    def __init__(self, quantity: float, cost: float, mark: float):
+        self.quantity = quantity
+        self.cost = cost
+        self.mark = mark
+
+class ValuationLedger:
+    """Running equity, P&L and drawdown, updated by deltas.
+
+    Fills and price marks adjust the totals by the change they cause, so
+    marking a symbol costs O(1) whatever the size of the book and reading
+    a snapshot costs O(1). Every fill also marks its symbol at the fill
+    price. High-water mark and drawdown are taken after each batch of marks.
+
+    The running sums can collect float rounding over very long runs;
+    revalue() recomputes them exactly from the holdings.
+    """
+
+    def __init__(self, cash: float = 0.0):
+        self.cash = cash
+        self.market_value = 0.0
+        self.cost_basis = 0.0
+        self.realized_pnl = 0.0
+        self.high_water_mark = cash
+        self.max_drawdown = 0.0
+        self._holdings: Dict[str, _Holding] = {}
+
+    @property
+    def equity(self) -> float:
+        return self.cash + self.market_value
+
+    @property
+    def drawdown(self) -> float:
+        if self.high_water_mark <= 0:
+            return 0.0
+        return max(1.0 - self.equity / self.high_water_mark, 0.0)
+
+    def _mark(self, holding: _Holding, price: float):
+        self.market_value += holding.quantity * (price - holding.mark)
+        holding.mark = price
+
+    def _update_drawdown(self):
+        equity = self.equity
+        if equity > self.high_water_mark:
+            self.high_water_mark = equity
+        elif self.high_water_mark > 0:
+            drawdown = 1.0 - equity / self.high_water_mark
+            if drawdown > self.max_drawdown:
+                self.max_drawdown = drawdown
+
+    def buy(self, symbol: str, quantity: float, price: float):
+        """Book a buy fill."""
+        cost = quantity * price
+        holding = self._holdings.get(symbol)
+        if holding is None:
+            holding = self._holdings[symbol] = _Holding(0.0, 0.0, price)
+        else:
+            self._mark(holding, price)
+        holding.quantity += quantity
+        holding.cost += cost
+        self.cost_basis += cost
+        self.market_value += cost
+        self.cash -= cost
+        self._update_drawdown()
+
+    def sell(self, symbol: str, quantity: float, price: float) -> float:
+        """Book a sell fill at the average cost; returns the realized P&L."""
+        holding = self._holdings.get(symbol)
+        if holding is None:
+            return 0.0
+        self._mark(holding, price)
+        quantity = min(quantity, holding.quantity)
+        cost = holding.cost if quantity == holding.quantity else holding.cost * quantity / holding.quantity
+        proceeds = quantity * price
+        realized = proceeds - cost
+
+        holding.quantity -= quantity
+        holding.cost -= cost
+        self.cost_basis -= cost
+        self.market_value -= proceeds
+        self.cash += proceeds
+        self.realized_pnl += realized
+        if holding.quantity == 0:
+            del self._holdings[symbol]
+        self._update_drawdown()
+        return realized
+
+    def mark(self, symbol: str, price: float):
+        """Move one symbol to a new price."""
+        holding = self._holdings.get(symbol)
+        if holding is not None:
+            self._mark(holding, price)
+            self._update_drawdown()
+
+    @METRICS.timed("valuation.mark_many")
+    def mark_many(self, prices: Dict[str, float]):
+        """Apply a batch of prices; only held symbols are touched.
+
+        Walks whichever is smaller, the batch or the book, so a full-market
+        price dict against a small book stays cheap.
+        """
+        holdings = self._holdings
+        if len(prices) <= len(holdings):
+            pairs = ((holdings.get(symbol), price) for symbol, price in prices.items())
+        else:
+            pairs = ((holding, prices.get(symbol)) for symbol, holding in holdings.items())
+        delta = 0.0
+        for holding, price in pairs:
+            if holding is not None and price is not None and price != holding.mark:
+                delta += holding.quantity * (price - holding.mark)
+                holding.mark = price
+        self.market_value += delta
+        self._update_drawdown()
+
+    def revalue(self):
+        """Recompute market value and cost basis exactly from the holdings."""
+        holdings = self._holdings.values()
+        self.market_value = math.fsum(h.quantity * h.mark for h in holdings)
+        self.cost_basis = math.fsum(h.cost for h in holdings)
+
+    def snapshot(self) -> ValuationSnapshot:
+        """Current totals and risk numbers in O(1)."""
+        return ValuationSnapshot(
+            cash=self.cash,
+            market_value=self.market_value,
+            equity=self.equity,
+            cost_basis=self.cost_basis,
+            realized_pnl=self.realized_pnl,
+            unrealized_pnl=self.market_value - self.cost_basis,
+            high_water_mark=self.high_water_mark,
+            drawdown=self.drawdown,
+            max_drawdown=self.max_drawdown,
+            open_positions=len(self._holdings)
+        )
+
+    def position(self, symbol: str) -> Optional[PositionValuation]:
+        """One open position's mark and unrealized P&L."""
+        holding = self._holdings.get(symbol)
+        if holding is None:
+            return None
+        market_value = holding.quantity * holding.mark
+        return PositionValuation(symbol, holding.quantity, holding.mark, market_value,
+                                 holding.cost, market_value - holding.cost)
+
+    def exposures(self) -> Dict[str, float]:
+        """Market value per open position."""
+        return {symbol: h.quantity * h.mark for symbol, h in self._holdings.items()}
+
+    def state(self) -> dict:
+        """Running P&L and drawdown state that cannot be rebuilt from positions."""
+        return {
+            'realized_pnl': self.realized_pnl,
+            'high_water_mark': self.high_water_mark,
+            'max_drawdown': self.max_drawdown,
+            'marks': {symbol: h.mark for symbol, h in self._holdings.items()},
+        }
+
+    def reset(self, cash: float, positions: Iterable, state: Optional[dict] = None):
+        """Rebuild from cash and open positions, e.g. after journal recovery.
+
+        Positions are marked at their last saved mark, or at entry price.
+        """
+        state = state or {}
+        marks = state.get('marks', {})
+        self.cash = cash
+        self._holdings = {
+            p.symbol: _Holding(p.quantity, p.quantity * p.entry_price,
+                               marks.get(p.symbol, p.entry_price))
+            for p in positions
+        }
+        self.revalue()
+        self.realized_pnl = state.get('realized_pnl', 0.0)
+        self.high_water_mark = state.get('high_water_mark', self.equity)
+        self.max_drawdown = state.get('max_drawdown', 0.0)
+        self._update_drawdown()
@@ -0,0 +1,200 @@
+"""
+Execution venues that TransactionExecutor can route orders to.
+"""
+import itertools
+import math
+import random
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from src.trading.transaction_executor import ExecutionResult
+
+class Venue(ABC):
+    """Fills buy and sell orders.
+
+    Buys spend ``amount_sol`` and sells give up ``token_amount`` of the
+    token traded on the pair ``token_address``. Both return an
+    ExecutionResult; a fill reports ``filled_quantity`` and ``fill_price``.
+    """
+
+    @abstractmethod
+    def buy(self, token_address: str, amount_sol: float) -> ExecutionResult:
+        """Spend ``amount_sol`` on the pair's token."""
+
+    @abstractmethod
+    def sell(self, token_address: str, token_amount: float) -> ExecutionResult:
+        """Sell ``token_amount`` of the pair's token."""
+
+    def sync(self, tokens: Iterable):
+        """Take fresh market data (TokenData or TokenView); a no-op by default."""
+
+class _Pool:
+    __slots__ = ('base', 'quote')
+
+    def __init__(self, base: float, quote: float):
+        self.base = base    # token reserve
+        self.quote = quote  # USD reserve
+
+def lognormal_latency(median_ms: float, sigma: float) -> Callable[[random.Random], float]:
+    """Latency sampler with the given median and log-space spread."""
+    def sample(rng: random.Random) -> float:
+        return median_ms * math.exp(sigma * rng.gauss(0.0, 1.0)) if sigma else median_ms
+    return sample
+
+class SimulatedAMMVenue(Venue):
+    """In-process constant-product DEX for paper trading and load tests.
+
+    Each pair is an x*y=k pool seeded by sync() from its TokenData: half of
+    ``liquidity_usd`` on each side at ``price_usd``. Orders move their pool
+    along the curve until the next sync() resets it, so orders between
+    syncs see each other's price impact. Nothing touches the network.
+
+    - ``fee`` is taken from the input amount, as the pool's LP fee
+    - an order whose average price would be more than ``max_slippage`` off
+      the pool price is filled only up to that price; when the fee alone
+      exceeds it the order is rejected
+    - ``reject_rate`` and ``partial_fill_rate`` are per-order probabilities
+      of a dropped transaction and of filling only a random fraction
+      (at least ``min_fill_ratio``)
+    - latency is drawn from ``latency(rng) -> ms``, by default lognormal
+      around ``latency_median_ms``. With ``realtime`` the order waits it
+      out; otherwise it is only reported on the result, so load tests run
+      at CPU speed.
+    """
+
+    def __init__(self, sol_price_usd: float = 150.0, fee: float = 0.0025,
+                 max_slippage: float = 0.05, latency_median_ms: float = 0.0,
+                 latency_sigma: float = 0.0,
+                 latency: Optional[Callable[[random.Random], float]] = None,
+                 reject_rate: float = 0.0, partial_fill_rate: float = 0.0,
+                 min_fill_ratio: float = 0.1, realtime: bool = False,
+                 seed: Optional[int] = None):
+        self.sol_price_usd = sol_price_usd
+        self.fee = fee
+        self.max_slippage = max_slippage
+        self.latency = latency or lognormal_latency(latency_median_ms, latency_sigma)
+        self.reject_rate = reject_rate
+        self.partial_fill_rate = partial_fill_rate
+        self.min_fill_ratio = min_fill_ratio
+        self.realtime = realtime
+
+        self._pools: Dict[str, _Pool] = {}
+        self._rng = random.Random(seed)
+        self._ids = itertools.count(1)
+        # Fills take microseconds, so one lock serialises them cheaply
+        self._lock = threading.Lock()
+
+    def sync(self, tokens: Iterable):
+        """Reset each token's pool to its reported price and liquidity."""
+        with self._lock:
+            pools = self._pools
+            for token in tokens:
+                price, liquidity = token.price_usd, token.liquidity_usd
+                if not (price > 0 and liquidity > 0):
+                    continue
+                quote = liquidity / 2
+                pool = pools.get(token.pair_address)
+                if pool is None:
+                    pools[token.pair_address] = _Pool(quote / price, quote)
+                else:
+                    pool.base, pool.quote = quote / price, quote
+
+    def price(self, token_address: str) -> Optional[float]:
+        """Current pool price in USD per token."""
+        pool = self._pools.get(token_address)
+        return None if pool is None else pool.quote / pool.base
+
+    def buy(self, token_address: str, amount_sol: float) -> ExecutionResult:
+        return self._fill(token_address, 'buy', amount_sol * self.sol_price_usd)
+
+    def sell(self, token_address: str, token_amount: float) -> ExecutionResult:
+        return self._fill(token_address, 'sell', token_amount)
+
+    def _fill(self, token_address: str, side: str, amount: float) -> ExecutionResult:
+        with self._lock:
+            rng = self._rng
+            latency_ms = self.latency(rng)
+            pool = self._pools.get(token_address)
+            if pool is None:
+                result = self._rejected(f"No pool for {token_address}")
+            elif amount <= 0:
+                result = self._rejected(f"Nothing to {side}")
+            elif self.reject_rate and rng.random() < self.reject_rate:
+                result = self._rejected("Simulated reject: transaction dropped")
+            else:
+                fill_ratio = 1.0
+                if self.partial_fill_rate and rng.random() < self.partial_fill_rate:
+                    fill_ratio = rng.uniform(self.min_fill_ratio, 1.0)
+                result = self._swap(pool, side, amount, fill_ratio)
+
+        if self.realtime:
+            time.sleep(latency_ms / 1000.0)
+        else:
+            result.latency_ms = latency_ms
+        return result
+
+    def _swap(self, pool: _Pool, side: str, amount: float,
+              fill_ratio: float = 1.0) -> ExecutionResult:
+        """Trade up to ``amount * fill_ratio`` against the pool.
+
+        ``amount`` is USD in for buys and tokens in for sells.
+
+        Input is capped where the average price, fee included, reaches
+        max_slippage: for a buy that is where (R + in) / (R * (1 - fee)) hits
+        1 + max_slippage, R being the USD reserve; sells mirror it on the
+        token side.
+        """
+        keep = 1.0 - self.fee
+        mid = pool.quote / pool.base
+        if side == 'buy':
+            headroom = (1.0 + self.max_slippage) * keep - 1.0
+            reserve_in, reserve_out = pool.quote, pool.base
+        else:
+            headroom = keep / (1.0 - self.max_slippage) - 1.0 if self.max_slippage < 1 else math.inf
+            reserve_in, reserve_out = pool.base, pool.quote
+        if headroom <= 0:
+            return self._rejected("Fee exceeds the slippage tolerance")
+
+        filled = min(amount * fill_ratio, reserve_in * headroom / keep)
+        net = filled * keep
+        out = reserve_out * net / (reserve_in + net)
+        if side == 'buy':
+            pool.quote += filled
+            pool.base -= out
+            quantity, price = out, filled / out
+            slippage = price / mid - 1.0
+        else:
+            pool.base += filled
+            pool.quote -= out
+            quantity, price = filled, out / filled
+            slippage = 1.0 - price / mid
+
+        partial = filled < amount
+        return ExecutionResult(
+            success=True,
+            transaction_id=f"sim_{next(self._ids)}",
+            message=(f"{'Partial ' + side if partial else side.capitalize()} filled: "
+                     f"{quantity:.6g} tokens at ${price:.6g}"),
+            timestamp=time.time(),
+            filled_quantity=quantity,
+            fill_price=price,
+            slippage=slippage
+        )
+
+    @staticmethod
+    def _rejected(message: str) -> ExecutionResult:
+        return ExecutionResult(success=False, message=message, timestamp=time.time())
+
+VENUES = {
+    'simulated_amm': SimulatedAMMVenue,
+}
+
+def build_venue(spec: Dict[str, Any]) -> Venue:
+    """Venue from a config entry such as ``{"type": "simulated_amm", "fee": 0.003}``."""
+    params = dict(spec)
+    venue_type = params.pop('type')
+    if venue_type not in VENUES:
+        raise ValueError(f"Unknown venue type {venue_type!r}")
+    return VENUES[venue_type](**params)
@@ -0,0 +1,217 @@
+"""
+RequestGovernor with a fake clock, sleep, random source and session.
+"""
+import random
+import threading
+import time
+
+import pytest
+import requests
+
+from src.network.governor import (EXECUTION, MARKET_DATA, RISK, RateLimitTimeout,
+                                  RequestGovernor)
+
+HOST = 'api.example.com'
+URL = f"https://{HOST}/pairs"
+
+class FakeClock:
+    # Rates and steps are powers of two so refills come out exact
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+class FakeSession:
+    """Answers from a script of status codes or exceptions, then 200."""
+
+    def __init__(self, script=(), retry_after=None, gate=None):
+        self.script = list(script)
+        self.retry_after = retry_after
+        self.gate = gate  # threading.Event the request blocks on
+        self.calls = []
+        self.entered = threading.Event()
+
+    def request(self, method, url, **kwargs):
+        self.calls.append((method, url, kwargs.get('params')))
+        self.entered.set()
+        if self.gate is not None:
+            self.gate.wait(5.0)
+        outcome = self.script.pop(0) if self.script else 200
+        if isinstance(outcome, BaseException):
+            raise outcome
+        response = requests.Response()
+        response.status_code = outcome
+        if self.retry_after is not None:
+            response.headers['Retry-After'] = self.retry_after
+        return response
+
+def _governor(**kwargs):
+    clock = FakeClock()
+    sleeps = []
+    kwargs.setdefault('limits', {HOST: (8.0, 2)})
+    governor = RequestGovernor(clock=clock, sleep=sleeps.append,
+                               rng=random.Random(7), **kwargs)
+    return governor, clock, sleeps
+
+def _wait_until(predicate, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.001)
+
+def _start(target, *args) -> threading.Thread:
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+def test_token_bucket_allows_burst_then_refills():
+    governor, clock, _ = _governor()
+    session = FakeSession()
+
+    for _ in range(2):
+        governor.get(session, URL, max_wait=0)
+    with pytest.raises(RateLimitTimeout):
+        governor.get(session, URL, max_wait=0)
+
+    clock.now += 0.125
+    governor.get(session, URL, max_wait=0)
+    with pytest.raises(RateLimitTimeout):
+        governor.get(session, URL, max_wait=0)
+
+    # Refills stop at the burst size
+    clock.now += 60.0
+    for _ in range(2):
+        governor.get(session, URL, max_wait=0)
+    with pytest.raises(RateLimitTimeout):
+        governor.get(session, URL, max_wait=0)
+    assert len(session.calls) == 5
+
+def test_unlisted_hosts_are_not_limited():
+    governor, _, _ = _governor()
+    session = FakeSession()
+    for _ in range(50):
+        governor.get(session, 'https://other.example.com/x', max_wait=0)
+    assert len(session.calls) == 50
+
+def test_saturated_host_serves_higher_priorities_first():
+    governor, clock, _ = _governor(limits={HOST: (8.0, 1)})
+    session = FakeSession()
+    governor.get(session, URL, max_wait=0)
+
+    served = []
+
+    def send(priority):
+        governor.request(session, 'POST', URL, priority=priority)
+        served.append(priority)
+
+    threads = []
+    for waiting, priority in enumerate((RISK, MARKET_DATA, EXECUTION, RISK), 1):
+        threads.append(_start(send, priority))
+        _wait_until(lambda: governor.stats()[HOST]['waiting'] == waiting)
+
+    for remaining in (3, 2, 1, 0):
+        clock.now += 0.125
+        _wait_until(lambda: len(served) == 4 - remaining)
+        assert governor.stats()[HOST]['waiting'] == remaining
+    assert served == [EXECUTION, MARKET_DATA, RISK, RISK]
+    for thread in threads:
+        thread.join(5.0)
+
+def test_identical_gets_in_flight_are_coalesced():
+    governor, _, _ = _governor(limits={})
+    release = threading.Event()
+    session = FakeSession(gate=release)
+    responses = []
+
+    leader = _start(lambda: responses.append(governor.get(session, URL, params={'q': 1})))
+    _wait_until(session.entered.is_set)
+    follower = _start(lambda: responses.append(governor.get(session, URL, params={'q': 1})))
+    follower.join(0.1)
+    assert follower.is_alive() and len(session.calls) == 1
+
+    release.set()
+    leader.join(5.0)
+    follower.join(5.0)
+    assert len(session.calls) == 1
+    assert len(responses) == 2 and responses[0] is responses[1]
+
+    # Nothing is in flight any more, and other params are separate requests
+    governor.get(session, URL, params={'q': 1})
+    governor.get(session, URL, params={'q': 2})
+    assert len(session.calls) == 3
+
+def test_posts_are_never_coalesced():
+    governor, _, _ = _governor(limits={})
+    release = threading.Event()
+    session = FakeSession(gate=release)
+    threads = [_start(governor.request, session, 'POST', URL) for _ in range(2)]
+    _wait_until(lambda: len(session.calls) == 2)
+    release.set()
+    for thread in threads:
+        thread.join(5.0)
+
+def test_retries_use_full_jitter_backoff():
+    governor, _, sleeps = _governor(limits={}, backoff_base=0.5, backoff_max=1.5)
+    session = FakeSession([503, 502, 500])
+
+    response = governor.get(session, URL)
+    assert response.status_code == 200
+    expected = random.Random(7)
+    assert sleeps == [expected.uniform(0, 0.5), expected.uniform(0, 1.0),
+                      expected.uniform(0, 1.5)]
+
+def test_retry_after_outlasts_the_backoff():
+    governor, _, sleeps = _governor(limits={})
+    session = FakeSession([503], retry_after='5')
+    assert governor.get(session, URL).status_code == 200
+    assert sleeps == [5.0]
+
+def test_failure_surviving_every_retry_is_returned():
+    governor, _, sleeps = _governor(limits={}, max_retries=2)
+    session = FakeSession([500, 500, 500, 500])
+    assert governor.get(session, URL).status_code == 500
+    assert len(session.calls) == 3 and len(sleeps) == 2
+
+def test_non_idempotent_requests_retry_only_when_refused():
+    governor, _, _ = _governor(limits={})
+
+    session = FakeSession([500])
+    assert governor.request(session, 'POST', URL).status_code == 500
+    assert len(session.calls) == 1
+
+    session = FakeSession([503])
+    assert governor.request(session, 'POST', URL).status_code == 200
+    assert len(session.calls) == 2
+
+    session = FakeSession([requests.ConnectionError()])
+    with pytest.raises(requests.ConnectionError):
+        governor.request(session, 'POST', URL)
+    assert len(session.calls) == 1
+
+    session = FakeSession([requests.ConnectTimeout()])
+    assert governor.request(session, 'POST', URL).status_code == 200
+
+    session = FakeSession([requests.ConnectionError()])
+    assert governor.get(session, URL).status_code == 200
+    assert len(session.calls) == 2
+
+def test_429_pauses_the_host_and_lowers_its_rate():
+    governor, clock, sleeps = _governor(limits={HOST: (8.0, 5)})
+    session = FakeSession([429], retry_after='0.25')
+    responses = []
+
+    thread = _start(lambda: responses.append(governor.get(session, URL)))
+    _wait_until(lambda: governor.stats()[HOST]['waiting'] == 1)
+    assert governor.stats()[HOST]['rate'] == pytest.approx(5.6)
+    assert sleeps == []  # the gate holds the retry, not a sleep
+
+    clock.now += 0.125
+    thread.join(0.1)
+    assert thread.is_alive()
+
+    clock.now += 0.125
+    thread.join(5.0)
+    assert responses[0].status_code == 200 and len(session.calls) == 2
+    # Each success wins back 2% of the configured rate
+    assert governor.stats()[HOST]['rate'] == pytest.approx(5.76)
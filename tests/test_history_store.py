@@ -0,0 +1,58 @@
+"""
+PairHistory must recover a consistent history after a torn append.
+"""
+import numpy as np
+
+from src.market_data.history_store import BAR_COLUMNS, PairHistory
+
+def _bars(start: int, count: int) -> dict:
+    timestamps = np.arange(start, start + count, dtype='<i8')
+    prices = timestamps.astype('<f8')
+    return {'timestamp': timestamps, 'open': prices, 'high': prices,
+            'low': prices, 'close': prices, 'volume': prices * 10}
+
+def test_reopen_reads_flushed_bars(tmp_path):
+    history = PairHistory(tmp_path)
+    history.append_many(_bars(0, 3))
+    history.append(3, 3.0, 3.0, 3.0, 3.0, 30.0)
+    history.flush()
+
+    reopened = PairHistory(tmp_path)
+    assert len(reopened) == 4
+    assert reopened.last_timestamp == 3
+    np.testing.assert_array_equal(reopened.slice()['close'], [0.0, 1.0, 2.0, 3.0])
+
+def test_torn_append_is_truncated_before_next_append(tmp_path):
+    history = PairHistory(tmp_path)
+    history.append_many(_bars(0, 3))
+
+    # A crash mid-append: only the first columns got the new bar, the last
+    # got half a record
+    torn = _bars(3, 1)
+    names = [name for name, _ in BAR_COLUMNS]
+    for name in names[:3]:
+        with open(tmp_path / f"{name}.col", 'ab') as f:
+            f.write(torn[name].tobytes())
+    with open(tmp_path / f"{names[-1]}.col", 'ab') as f:
+        f.write(torn[names[-1]].tobytes()[:4])
+
+    reopened = PairHistory(tmp_path)
+    assert len(reopened) == 3
+    for name, dtype in BAR_COLUMNS:
+        assert (tmp_path / f"{name}.col").stat().st_size == 3 * dtype.itemsize
+
+    reopened.append_many(_bars(3, 2))
+    columns = PairHistory(tmp_path).slice()
+    for name, _ in BAR_COLUMNS:
+        np.testing.assert_array_equal(columns[name], _bars(0, 5)[name])
+
+def test_missing_column_drops_every_bar(tmp_path):
+    history = PairHistory(tmp_path)
+    history.append_many(_bars(0, 2))
+    (tmp_path / 'volume.col').unlink()
+
+    reopened = PairHistory(tmp_path)
+    assert len(reopened) == 0
+    assert reopened.last_timestamp is None
+    reopened.append_many(_bars(5, 1))
+    assert PairHistory(tmp_path).slice()['timestamp'].tolist() == [5]
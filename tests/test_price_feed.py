@@ -0,0 +1,58 @@
+"""
+TickRecorder resume and config-built feeds.
+"""
+import pytest
+
+from src.market_data.market_provider import TokenData
+from src.market_data.price_feed import (PollingPriceFeed, ReplayPriceFeed, TickRecorder,
+                                        build_feed, load_ticks)
+
+def _token(n: int) -> TokenData:
+    return TokenData(f"pair{n}", f"Token {n}", f"T{n}", float(n), 1.0, 1.0, 0.0)
+
+def _record(path, first: int, count: int):
+    recorder = TickRecorder(str(path))
+    for n in range(first, first + count):
+        recorder.record(_token(n), timestamp=float(n))
+    recorder.close()
+
+def test_recorder_continues_sequence_numbers(tmp_path):
+    path = tmp_path / 'ticks.jsonl'
+    _record(path, 0, 3)
+    _record(path, 3, 2)
+    assert [seq for _, seq, _ in load_ticks(str(path))] == [1, 2, 3, 4, 5]
+
+def test_recorder_drops_a_torn_last_line(tmp_path):
+    path = tmp_path / 'ticks.jsonl'
+    _record(path, 0, 2)
+    with open(path, 'a') as f:
+        f.write('{"t":2.0,"seq":3,"pair_addr')
+    _record(path, 2, 1)
+    assert [seq for _, seq, _ in load_ticks(str(path))] == [1, 2, 3]
+
+def test_recorder_resumes_past_long_lines(tmp_path):
+    path = tmp_path / 'ticks.jsonl'
+    recorder = TickRecorder(str(path))
+    for n in range(3):
+        token = _token(n)
+        token.base_token_name = 'x' * 10000
+        recorder.record(token)
+    recorder.close()
+    _record(path, 3, 1)
+    assert load_ticks(str(path))[-1][1] == 4
+
+def test_build_feed(tmp_path):
+    path = tmp_path / 'ticks.jsonl'
+    _record(path, 0, 2)
+    feed = build_feed({'type': 'replay', 'path': str(path), 'speed': None})
+    assert isinstance(feed, ReplayPriceFeed) and len(feed.ticks) == 2
+
+    pairs = {'pair0': 'T0'}
+    feed = build_feed({'type': 'polling', 'interval': 1.0}, provider=object(),
+                      pair_addresses=pairs)
+    assert isinstance(feed, PollingPriceFeed) and feed.interval == 1.0
+    pairs['pair1'] = 'T1'
+    assert list(feed.pair_addresses) == ['pair0', 'pair1']
+
+    with pytest.raises(ValueError):
+        build_feed({'type': 'websocket'})
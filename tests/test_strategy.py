@@ -0,0 +1,62 @@
+"""
+Streaming SMACrossoverStrategy.update must match the batch generate_signal.
+"""
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.trading.strategy import SMACrossoverStrategy
+
+def _random_walk(seed: int, length: int = 300) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return 1.0 * np.cumprod(1.0 + rng.normal(0.0, 0.03, length))
+
+def _flat_runs() -> np.ndarray:
+    # Flat stretches leave the SMAs equal, the edge of both <= and >=
+    return np.concatenate([np.full(40, 1.0), np.full(30, 2.0), np.full(30, 2.0),
+                           np.full(40, 0.5), np.full(25, 0.5)])
+
+def _exact_crossovers() -> np.ndarray:
+    # Dyadic prices keep the sums exact, so the SMAs touch and cross exactly
+    return np.array([1.0, 2.0, 1.0, 2.0] * 20 + [1.5] * 30 + [1.0, 2.0] * 20
+                    + [0.25, 4.0, 0.5, 2.0] * 15)
+
+CASES = {
+    'random_walk_0': _random_walk(0),
+    'random_walk_1': _random_walk(1),
+    'random_walk_small_moves': 100.0 + np.cumsum(
+        np.random.default_rng(2).normal(0.0, 1e-6, 300)),
+    'flat_runs': _flat_runs(),
+    'exact_crossovers': _exact_crossovers(),
+}
+
+@pytest.mark.parametrize('periods', [(10, 20), (3, 7), (5, 5)])
+@pytest.mark.parametrize('warm', [0, 1, 19, 60])
+@pytest.mark.parametrize('case', sorted(CASES))
+def test_update_matches_generate_signal(case, warm, periods):
+    prices = CASES[case]
+    streaming = SMACrossoverStrategy(*periods)
+    batch = SMACrossoverStrategy(*periods)
+    streaming.warm_start('SYM', prices[:warm])
+
+    for i in range(warm, len(prices)):
+        price = float(prices[i])
+        expected = batch.generate_signal(pd.DataFrame({'close': prices[:i + 1]}), price)
+        assert streaming.update('SYM', price) == expected, f"tick {i}"
+
+def test_exact_crossovers_produce_signals():
+    # Guards the fixture: the parity test above must see both signal types
+    strategy = SMACrossoverStrategy(3, 7)
+    types = {strategy.update('SYM', float(price)).signal_type
+             for price in _exact_crossovers()}
+    assert {'buy', 'sell', 'hold'} <= types
+
+def test_warm_start_replaces_state():
+    prices = _random_walk(3)
+    warmed = SMACrossoverStrategy()
+    warmed.update('SYM', 1000.0)
+    warmed.warm_start('SYM', prices[:100])
+    fresh = SMACrossoverStrategy()
+    fresh.warm_start('SYM', prices[:100])
+    for price in prices[100:]:
+        assert warmed.update('SYM', float(price)) == fresh.update('SYM', float(price))
@@ -0,0 +1,83 @@
+"""
+passes_filters must agree with filter_batch, and both must follow settings changes.
+"""
+import math
+
+import numpy as np
+import pytest
+
+from src.filters.token_filter import FILTER_RULES, FilterSettings, TokenFilter
+from src.market_data.market_provider import TokenData
+
+NAN = math.nan
+INF = math.inf
+
+def _token(symbol='AAA', name='Token', liquidity=20000.0, volume=60000.0, change=5.0):
+    return TokenData(pair_address=f"pair-{symbol}", base_token_name=name,
+                     base_token_symbol=symbol, price_usd=1.0, volume_h24=volume,
+                     liquidity_usd=liquidity, price_change_h24=change)
+
+def _tokens():
+    rng = np.random.default_rng(7)
+    tokens = []
+    for i in range(200):
+        tokens.append(_token(
+            symbol=f"S{i % 13}",
+            name='Meme Coin' if i % 11 == 0 else f"Token {i}",
+            liquidity=float(rng.choice([0.0, 9999.0, 10000.0, 50000.0, NAN, INF])),
+            volume=float(rng.choice([0.0, 49999.0, 50000.0, 1e6, NAN, -INF])),
+            change=float(rng.choice([-100.0, -99.0, 0.0, 1000.0, 1000.5, NAN, INF])),
+        ))
+    return tokens
+
+SETTINGS = {
+    'default': FilterSettings(),
+    'meme': FilterSettings(exclude_meme_coins=True),
+    'blocked': FilterSettings(blocked_tokens=['S1', 'S2']),
+    'allowed': FilterSettings(allowed_tokens=['S3', 'S4', 'S5']),
+    'everything': FilterSettings(min_liquidity_usd=0.0, min_volume_h24_usd=0.0,
+                                 exclude_meme_coins=True, blocked_tokens=['S0'],
+                                 allowed_tokens=['S0', 'S6', 'S7']),
+}
+
+@pytest.mark.parametrize('name', sorted(SETTINGS))
+def test_passes_filters_matches_filter_batch(name):
+    token_filter = TokenFilter(SETTINGS[name])
+    tokens = _tokens()
+    result = token_filter.filter_batch(tokens)
+
+    assert [token_filter.passes_filters(t) for t in tokens] == result.mask.tolist()
+    failures = [token_filter.compiled.first_failure(t) for t in tokens]
+    assert {rule: failures.count(rule) for rule in FILTER_RULES} == result.rejections
+
+@pytest.mark.parametrize('field', ['liquidity', 'volume', 'change'])
+def test_nan_is_rejected(field):
+    token_filter = TokenFilter()
+    token = _token(**{field: NAN})
+    assert not token_filter.passes_filters(token)
+    assert not token_filter.filter_batch([token]).mask[0]
+
+def test_assigning_settings_recompiles():
+    token_filter = TokenFilter()
+    compiled = token_filter.compiled
+    token_filter.settings = FilterSettings(min_liquidity_usd=30000.0)
+
+    assert token_filter.compiled is not compiled
+    assert not token_filter.passes_filters(_token(liquidity=20000.0))
+
+def test_in_place_changes_are_picked_up():
+    token_filter = TokenFilter()
+    token = _token(symbol='BAD')
+    assert token_filter.passes_filters(token)
+    compiled = token_filter.compiled
+    assert token_filter.compiled is compiled
+
+    token_filter.settings.blocked_tokens.append('BAD')
+    assert not token_filter.passes_filters(token)
+    assert token_filter.filter_batch([token]).rejections['blocked'] == 1
+    assert token_filter.compiled is not compiled
+
+    token_filter.settings.blocked_tokens.clear()
+    token_filter.settings.min_volume_h24_usd = 100000.0
+    assert token_filter.filter_batch([token]).rejections['volume'] == 1
+    assert token_filter.numeric_outcomes([20000.0], [60000.0], [5.0]).tolist() == [0b101]
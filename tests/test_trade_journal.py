@@ -0,0 +1,131 @@
+"""
+TradeJournal recovery and group-commit fsync.
+"""
+import os
+import time
+
+import pytest
+
+from src.trading.trade_journal import BUY, SELL, TRIGGER, TradeJournal
+
+def _journal(path, **kwargs) -> TradeJournal:
+    journal = TradeJournal(str(path), **kwargs)
+    journal.load()
+    return journal
+
+def _records(path) -> list:
+    journal = TradeJournal(str(path))
+    _, records = journal.load()
+    journal.close()
+    return records
+
+def test_recovery_without_snapshot(tmp_path):
+    journal = _journal(tmp_path)
+    journal.record(BUY, 'AAA', 10.0, 1.5, timestamp=100.0)
+    journal.record(SELL, 'AAA', 4.0, 3.0, timestamp=101.0)
+    journal.record(TRIGGER, 'AAA', 0.0, 3.0, timestamp=101.0)
+    journal.close()
+
+    recovered = TradeJournal(str(tmp_path))
+    snapshot, records = recovered.load()
+    assert snapshot is None
+    assert records == [(1, BUY, 'AAA', 10.0, 1.5, 100.0),
+                       (2, SELL, 'AAA', 4.0, 3.0, 101.0),
+                       (3, TRIGGER, 'AAA', 0.0, 3.0, 101.0)]
+    recovered.record(BUY, 'BBB', 1.0, 2.0)
+    assert recovered.seq == 4
+    recovered.close()
+
+def test_recovery_replays_only_records_after_the_snapshot(tmp_path):
+    journal = _journal(tmp_path, snapshot_every=2)
+    journal.record(BUY, 'AAA', 10.0, 1.0, timestamp=1.0)
+    journal.record(BUY, 'BBB', 5.0, 2.0, timestamp=2.0)
+    assert journal.snapshot_due
+    journal.snapshot({'cash': 980.0})
+    assert not journal.snapshot_due
+    journal.record(SELL, 'AAA', 10.0, 2.0, timestamp=3.0)
+    journal.close()
+
+    # The segment the snapshot covers is gone
+    assert len(list(tmp_path.glob('journal-*.log'))) == 1
+
+    recovered = TradeJournal(str(tmp_path))
+    snapshot, records = recovered.load()
+    assert snapshot == {'cash': 980.0, 'seq': 2}
+    assert records == [(3, SELL, 'AAA', 10.0, 2.0, 3.0)]
+    assert recovered.records_since_snapshot == 1
+    recovered.close()
+
+def test_snapshot_with_empty_tail(tmp_path):
+    journal = _journal(tmp_path)
+    journal.record(BUY, 'AAA', 1.0, 1.0)
+    journal.snapshot({'cash': 999.0})
+    journal.close()
+
+    recovered = TradeJournal(str(tmp_path))
+    snapshot, records = recovered.load()
+    assert snapshot['seq'] == 1 and records == []
+    assert recovered.seq == 1
+    recovered.close()
+
+def test_torn_last_record_is_truncated(tmp_path):
+    journal = _journal(tmp_path)
+    journal.record(BUY, 'AAA', 10.0, 1.0, timestamp=1.0)
+    journal.record(BUY, 'BBB', 5.0, 2.0, timestamp=2.0)
+    journal.close()
+
+    segment, = tmp_path.glob('journal-*.log')
+    with open(segment, 'ab') as f:
+        f.write(b'3\tS\tAAA\t10.0')
+
+    recovered = TradeJournal(str(tmp_path))
+    snapshot, records = recovered.load()
+    assert [record[0] for record in records] == [1, 2]
+    assert segment.read_bytes().endswith(b'\n')
+
+    # The next record lands on a line of its own
+    recovered.record(SELL, 'AAA', 10.0, 3.0, timestamp=3.0)
+    recovered.close()
+    assert _records(tmp_path)[-1] == (3, SELL, 'AAA', 10.0, 3.0, 3.0)
+
+@pytest.fixture
+def fsyncs(monkeypatch):
+    calls = []
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        calls.append(fd)
+        real_fsync(fd)
+    monkeypatch.setattr(os, 'fsync', fsync)
+    return calls
+
+def test_buffered_records_share_one_fsync(tmp_path, fsyncs):
+    # A long interval keeps the background thread out of the way
+    journal = _journal(tmp_path, sync_interval=60.0)
+    for i in range(50):
+        journal.record(BUY, f"T{i}", 1.0, 1.0)
+    assert fsyncs == []
+    journal.flush()
+    assert len(fsyncs) == 1
+    journal.flush()
+    assert len(fsyncs) == 1
+    journal.close()
+    assert len(_records(tmp_path)) == 50
+
+def test_zero_interval_fsyncs_every_record(tmp_path, fsyncs):
+    journal = _journal(tmp_path, sync_interval=0)
+    for i in range(5):
+        journal.record(BUY, f"T{i}", 1.0, 1.0)
+    assert len(fsyncs) == 5
+    journal.close()
+    assert len(fsyncs) == 5
+
+def test_background_thread_flushes(tmp_path, fsyncs):
+    journal = _journal(tmp_path, sync_interval=0.01)
+    journal.record(BUY, 'AAA', 1.0, 1.0)
+    deadline = time.monotonic() + 5.0
+    while not fsyncs and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert len(fsyncs) == 1
+    journal.close()
+    assert len(fsyncs) == 1
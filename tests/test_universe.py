@@ -0,0 +1,155 @@
+"""
+TokenUniverse.diff: waiting list, eviction, filter changes and risk screening.
+"""
+from src.analysis.bubblemaps_api import RugPullRisk
+from src.filters.token_filter import FilterSettings, TokenFilter
+from src.market_data.columnar import PairColumns
+from src.trading.universe import TokenUniverse
+
+def _pair(n: int, symbol: str = None, liquidity: float = 20000.0) -> dict:
+    return {
+        'pairAddress': f"pair{n}",
+        'baseToken': {'name': f"Token {n}", 'symbol': symbol or f"T{n}", 'address': f"token{n}"},
+        'priceUsd': '1.0',
+        'volumeH24': 60000.0 + n,
+        'liquidity': {'usd': liquidity},
+        'priceChange': {'h24': 1.0},
+    }
+
+def _listing(pairs) -> PairColumns:
+    columns = PairColumns(len(pairs))
+    columns.append_pairs(pairs)
+    return columns
+
+def _apply(universe: TokenUniverse, diff):
+    for symbol, _ in diff.removed:
+        universe.remove(symbol)
+    for symbol, address in diff.added:
+        universe.add(symbol, address, discovered=True)
+
+def _risks(levels: dict):
+    """check_risk stub: token address -> risk level, None for unscored."""
+    calls = []
+
+    def check_risk(tokens):
+        tokens = list(tokens)
+        calls.append(tokens)
+        return {token: None if levels.get(token) is None
+                else RugPullRisk(token, 0.0, levels[token], [])
+                for token in tokens if token in levels}
+    check_risk.calls = calls
+    return check_risk
+
+def test_unchanged_listing_is_not_rescreened():
+    universe = TokenUniverse()
+    token_filter = TokenFilter()
+    pairs = [_pair(n) for n in range(5)]
+
+    diff = universe.diff(_listing(pairs), token_filter)
+    assert (diff.screened, diff.unchanged) == (5, 0)
+    _apply(universe, diff)
+
+    # Raw numbers move, threshold outcomes do not
+    for pair in pairs:
+        pair['volumeH24'] += 1000.0
+    diff = universe.diff(_listing(pairs), token_filter)
+    assert (diff.screened, diff.unchanged) == (0, 5)
+    assert diff.added == [] and diff.removed == []
+
+def test_full_universe_queues_pairs_until_room_frees_up():
+    universe = TokenUniverse(max_symbols=2)
+    token_filter = TokenFilter()
+    listing = _listing([_pair(n) for n in range(4)])
+
+    diff = universe.diff(listing, token_filter)
+    assert diff.added == [('T0', 'pair0'), ('T1', 'pair1')]
+    _apply(universe, diff)
+
+    universe.remove('T0')
+    diff = universe.diff(listing, token_filter)
+    assert diff.screened == 0
+    assert diff.added == [('T2', 'pair2')]
+
+def test_symbol_conflict_waits_for_the_symbol():
+    universe = TokenUniverse()
+    token_filter = TokenFilter()
+    universe.add('T0', 'manual')
+    listing = _listing([_pair(0), _pair(1, symbol='T1'), _pair(2, symbol='T1')])
+
+    diff = universe.diff(listing, token_filter)
+    assert diff.added == [('T1', 'pair1')]
+    _apply(universe, diff)
+
+    universe.remove('T0')
+    universe.remove('T1')
+    diff = universe.diff(listing, token_filter)
+    assert diff.screened == 0
+    assert sorted(diff.added) == [('T0', 'pair0'), ('T1', 'pair2')]
+
+def test_missing_pairs_are_evicted():
+    universe = TokenUniverse(evict_after=2)
+    token_filter = TokenFilter()
+    universe.add('MANUAL', 'pair1')
+    diff = universe.diff(_listing([_pair(0), _pair(1)]), token_filter)
+    _apply(universe, diff)
+    assert 'T0' in universe
+
+    # pair0 and the hand-added pair1 stop being listed
+    diff = universe.diff(_listing([_pair(2)]), token_filter)
+    assert diff.removed == []
+    _apply(universe, diff)
+    diff = universe.diff(_listing([_pair(2)]), token_filter)
+    assert diff.removed == [('T0', 'pair0')]
+    _apply(universe, diff)
+    assert 'T0' not in universe and 'MANUAL' in universe
+
+    # A forgotten pair is screened afresh when it comes back
+    diff = universe.diff(_listing([_pair(0), _pair(2)]), token_filter)
+    assert (diff.screened, diff.added) == (1, [('T0', 'pair0')])
+
+def test_filter_rule_change_rescreens_every_pair():
+    universe = TokenUniverse()
+    token_filter = TokenFilter()
+    listing = _listing([_pair(0, liquidity=15000.0), _pair(1, liquidity=30000.0)])
+    _apply(universe, universe.diff(listing, token_filter))
+
+    token_filter.settings.min_liquidity_usd = 20000.0
+    diff = universe.diff(listing, token_filter)
+    assert diff.screened == 2
+    assert diff.removed == [('T0', 'pair0')]
+
+    token_filter.settings.blocked_tokens.append('T1')
+    diff = universe.diff(listing, token_filter)
+    assert diff.screened == 2
+    assert diff.removed == [('T0', 'pair0'), ('T1', 'pair1')]
+
+def test_critical_and_unscored_pairs_are_held_back_and_rescreened():
+    universe = TokenUniverse()
+    token_filter = TokenFilter()
+    listing = _listing([_pair(n) for n in range(4)])
+    # token3 is missing from the results altogether
+    levels = {'token0': 'low', 'token1': 'critical', 'token2': None}
+    check_risk = _risks(levels)
+
+    diff = universe.diff(listing, token_filter, check_risk)
+    assert diff.added == [('T0', 'pair0')]
+    _apply(universe, diff)
+
+    # Only the held-back pairs are checked again
+    diff = universe.diff(listing, token_filter, check_risk)
+    assert diff.screened == 3
+    assert check_risk.calls[-1] == ['token1', 'token2', 'token3']
+    assert diff.added == []
+
+    levels.update(token1='medium', token2='low', token3='high')
+    diff = universe.diff(listing, token_filter, check_risk)
+    assert sorted(diff.added) == [('T1', 'pair1'), ('T2', 'pair2'), ('T3', 'pair3')]
+    _apply(universe, diff)
+
+    diff = universe.diff(listing, token_filter, check_risk)
+    assert diff.screened == 0 and len(check_risk.calls) == 3
+
+def test_without_check_risk_every_passing_pair_is_admitted():
+    universe = TokenUniverse()
+    diff = universe.diff(_listing([_pair(0), _pair(1)]), TokenFilter())
+    assert sorted(diff.added) == [('T0', 'pair0'), ('T1', 'pair1')]